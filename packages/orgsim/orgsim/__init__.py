@@ -1,9 +1,27 @@
+import importlib
 import pathlib
+import types
 import typing
 
+import numpy as np
 import pydantic
 
-from . import common, framework, metrics, models, v1
+from . import common, framework, metrics, models
+from .framework import events as events_
+
+if typing.TYPE_CHECKING:
+    from . import cache as cache_, v1
+
+# Submodules that simulations do not need are only imported on first access, which keeps the
+# startup of workers that just simulate short.
+_LAZY_SUBMODULES = ("aggregate", "cache", "history", "replicates", "sweep", "v1")
+
+
+def __getattr__(name: str) -> types.ModuleType:
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 T = typing.TypeVar("T", bound=pydantic.BaseModel)
 
@@ -13,11 +31,9 @@ def run_world(
     seed: framework.WorldSeed[T],
     strategy: framework.WorldStrategy[T],
     periods: int = 200,
+    events: typing.Optional[events_.EventLog] = None,
 ) -> None:
-    w = framework.create_world(
-        seed=seed,
-        strategy=strategy,
-    )
+    w = framework.create_world(seed=seed, strategy=strategy, events=events)
 
     for i in range(periods):
         w.run_period()
@@ -27,14 +43,107 @@ def run_world(
             break
 
 
+def run_experiment(
+    *,
+    seed: framework.WorldSeed[models.person.PersonSeed],
+    strategy: models.DefaultWorldStrategy,
+    periods: int = 200,
+    rng_seed: typing.Optional[int] = None,
+    cache: typing.Optional["cache_.ResultCache"] = None,
+) -> metrics.Metrics:
+    """Run a world to completion and return the metrics collected by the strategy.
+
+    When a cache is given, the run is looked up by its seed, strategy, RNG seed and periods
+    first, and only simulated (then stored) on a miss. Caching requires an explicit `rng_seed`,
+    since the results are not reproducible otherwise.
+    """
+
+    from . import cache as cache_
+
+    key = None
+    if cache is not None:
+        if rng_seed is None:
+            raise Exception("Cached experiments need an explicit rng_seed")
+        key = cache_.key_for(
+            seed=seed, strategy=strategy, rng_seed=rng_seed, periods=periods
+        )
+        data = cache.get(key)
+        if data is not None:
+            strategy.metrics = metrics.Metrics(data)
+            return strategy.metrics
+
+    if rng_seed is not None:
+        np.random.seed(rng_seed)
+    run_world(seed=seed, strategy=strategy, periods=periods)
+
+    if cache is not None and key is not None:
+        cache.put(key, strategy.metrics.data)
+
+    return strategy.metrics
+
+
+def replay_world(
+    *,
+    events: events_.EventLog,
+    strategy: models.DefaultWorldStrategy,
+) -> framework.World[models.person.PersonSeed]:
+    """Re-run a recorded world with a fresh `strategy`, e.g. one that logs extra metrics.
+
+    The seed and the RNG state are taken from the log, and the strategy has to be configured
+    like the recorded one (including a fresh identity generator). The replay is checked against
+    the log and raises if it diverges.
+    """
+
+    if events.header.get("engine") == "world.v1":
+        raise Exception(
+            "world.v1 event logs are replayed by `world.v1.models.v1.replay_model`"
+        )
+    if events.header.get("engine") != "framework":
+        raise Exception(f"Cannot replay a {events.header.get('engine')} event log")
+
+    seed = framework.WorldSeed[models.person.PersonSeed].model_validate_json(
+        events.header["seed"]
+    )
+    # Sets do not keep their iteration order through serialization, so the initial people are
+    # put back in the order they were born in, matching them by their traits.
+    traits = events.traits
+    by_traits = {
+        tuple(events_.flatten_traits(p)[k] for k in traits): p
+        for p in seed.initial_people
+    }
+    initial_people = [
+        by_traits[tuple(float(v[i]) for v in traits.values())]
+        for i in range(len(seed.initial_people))
+    ]
+
+    np.random.set_state(events.rng_state())
+    replay = events_.EventLog()
+    w = framework.create_world(
+        seed=seed, strategy=strategy, events=replay, initial_people=initial_people
+    )
+    for _ in range(events.completed_periods()):
+        if w.is_empty():
+            break
+        w.run_period()
+
+    if not replay.equals(events):
+        raise Exception("The replay diverged from the event log")
+
+    return w
+
+
 def do_experiment(
     *,
     title: str,
     seed: framework.WorldSeed[models.person.PersonSeed],
     strategy: models.DefaultWorldStrategy,
     periods: int = 200,
+    rng_seed: typing.Optional[int] = None,
+    cache: typing.Optional["cache_.ResultCache"] = None,
 ) -> metrics.Metrics:
-    run_world(seed=seed, strategy=strategy, periods=periods)
+    run_experiment(
+        seed=seed, strategy=strategy, periods=periods, rng_seed=rng_seed, cache=cache
+    )
     root = pathlib.Path(".", title)
     root.mkdir(parents=True, exist_ok=True)
 
@@ -47,4 +156,14 @@ def do_experiment(
     return strategy.metrics
 
 
-__all__ = ["common", "framework", "models", "run_world", "v1"]
+__all__ = [
+    "cache",
+    "common",
+    "do_experiment",
+    "framework",
+    "models",
+    "replay_world",
+    "run_experiment",
+    "run_world",
+    "v1",
+]
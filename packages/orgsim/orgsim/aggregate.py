@@ -0,0 +1,200 @@
+import typing
+
+import numpy as np
+import numpy.typing as npt
+import pydantic
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+FloatArray: typing.TypeAlias = npt.NDArray[np.float64]
+
+
+class Bands(pydantic.BaseModel):
+    on: str
+    index: list[int]
+    count: list[int]
+    mean: list[float]
+    std: list[float]
+    quantiles: dict[float, list[float]]
+
+
+class BandAggregator:
+    """Aggregates one series per replicate into per-time-point moments and quantiles.
+
+    Replicates are consumed one at a time and only summaries are kept: running moments
+    (Welford) and, per time point, a mergeable quantile sketch made of compactors. Every
+    compactor holds up to `capacity` values of weight 2**level; when one fills up, it is sorted
+    and every other value is promoted to the next level. Quantiles are therefore exact until
+    `capacity` replicates have been added and approximate (rank error in the order of
+    1/capacity) afterwards. Missing time points (e.g. after an extinction) are NaN and are not
+    counted.
+    """
+
+    def __init__(
+        self,
+        *,
+        on: str = "period",
+        quantiles: typing.Sequence[float] = (0.05, 0.5, 0.95),
+        capacity: int = 128,
+    ) -> None:
+        if capacity < 2 or capacity % 2:
+            raise Exception("Capacity has to be an even number of at least 2")
+
+        self._on = on
+        self._quantiles = list(quantiles)
+        self._capacity = capacity
+
+        self._start = 0
+        self._count: npt.NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+        self._mean: FloatArray = np.zeros(0)
+        self._m2: FloatArray = np.zeros(0)
+        self._levels: list[FloatArray] = []
+        self._filled: list[int] = []
+        self._compactions = 0
+
+    def __len__(self) -> int:
+        return len(self._count)
+
+    def add_frame(self, frame: "pd.DataFrame") -> None:
+        """Add a replicate given as a (date, period, value) frame, aligned on `on`."""
+
+        import pandas as pd
+
+        self.add_series(pd.Series(frame["value"].to_numpy(), index=frame[self._on]))
+
+    def add_series(self, series: "pd.Series[float]") -> None:
+        """Add a replicate. Repeated time points (e.g. daily samples in one period) keep the last."""
+
+        if series.empty:
+            return
+        series = series.groupby(level=0).last()
+        index = series.index.to_numpy(dtype=np.int64)
+        self._ensure_range(int(index.min()), int(index.max()) + 1)
+
+        values = np.full(len(self), np.nan)
+        values[index - self._start] = series.to_numpy(dtype=np.float64)
+
+        present = ~np.isnan(values)
+        self._count += present
+        delta = np.where(present, values - self._mean, 0.0)
+        self._mean += np.where(present, delta / np.maximum(self._count, 1), 0.0)
+        self._m2 += np.where(present, delta * (values - self._mean), 0.0)
+
+        self._push(0, values[:, np.newaxis])
+
+    def merge(self, other: "BandAggregator") -> None:
+        """Fold in an aggregator that consumed other replicates (e.g. in another worker)."""
+
+        if len(other) == 0:
+            return
+        if other._on != self._on or other._capacity != self._capacity:
+            raise Exception(
+                "Only aggregators with the same alignment and capacity merge"
+            )
+
+        self._ensure_range(other._start, other._start + len(other))
+        lo = other._start - self._start
+        hi = lo + len(other)
+
+        na = self._count[lo:hi]
+        nb = other._count
+        n = na + nb
+        delta = other._mean - self._mean[lo:hi]
+        safe_n = np.maximum(n, 1)
+        self._m2[lo:hi] += other._m2 + delta**2 * na * nb / safe_n
+        self._mean[lo:hi] += delta * nb / safe_n
+        self._count[lo:hi] = n
+
+        for level, (buffer, filled) in enumerate(zip(other._levels, other._filled)):
+            if filled == 0:
+                continue
+            values = np.full((len(self), filled), np.nan)
+            values[lo:hi] = buffer[:, :filled]
+            self._push(level, values)
+
+    def bands(self) -> Bands:
+        index = list(range(self._start, self._start + len(self)))
+        count = self._count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, self._mean, np.nan)
+            std = np.where(count > 1, np.sqrt(self._m2 / (count - 1)), np.nan)
+
+        return Bands(
+            on=self._on,
+            index=index,
+            count=count.tolist(),
+            mean=mean.tolist(),
+            std=std.tolist(),
+            quantiles={q: self._quantile(q).tolist() for q in self._quantiles},
+        )
+
+    def _quantile(self, q: float) -> FloatArray:
+        parts = [b[:, :f] for b, f in zip(self._levels, self._filled) if f]
+        if not parts:
+            return np.full(len(self), np.nan)
+
+        values = np.concatenate(parts, axis=1)
+        weights = np.concatenate(
+            [np.full(f, 2.0**level) for level, f in enumerate(self._filled) if f]
+        )
+
+        order = np.argsort(values, axis=1)
+        values = np.take_along_axis(values, order, axis=1)
+        w = np.where(np.isnan(values), 0.0, weights[order])
+        cumulative = np.cumsum(w, axis=1)
+        total = cumulative[:, -1]
+
+        rank = np.argmax(cumulative >= q * total[:, np.newaxis] - 1e-9, axis=1)
+        result = values[np.arange(len(values)), rank]
+        return np.where(total > 0, result, np.nan)
+
+    def _ensure_range(self, start: int, stop: int) -> None:
+        if len(self) == 0:
+            self._start = start
+            self._resize(0, stop - start)
+            return
+
+        new_start = min(self._start, start)
+        new_stop = max(self._start + len(self), stop)
+        if new_start == self._start and new_stop == self._start + len(self):
+            return
+        self._resize(self._start - new_start, new_stop - new_start)
+        self._start = new_start
+
+    def _resize(self, offset: int, size: int) -> None:
+        n = len(self)
+
+        def grow(a: npt.NDArray[typing.Any], fill: float) -> npt.NDArray[typing.Any]:
+            result = np.full((size,) + a.shape[1:], fill, dtype=a.dtype)
+            result[offset : offset + n] = a
+            return result
+
+        self._count = grow(self._count, 0)
+        self._mean = grow(self._mean, 0.0)
+        self._m2 = grow(self._m2, 0.0)
+        self._levels = [grow(b, np.nan) for b in self._levels]
+
+    def _push(self, level: int, values: FloatArray) -> None:
+        while values.shape[1] > 0:
+            if level == len(self._levels):
+                self._levels.append(np.full((len(self), self._capacity), np.nan))
+                self._filled.append(0)
+
+            filled = self._filled[level]
+            take = min(self._capacity - filled, values.shape[1])
+            self._levels[level][:, filled : filled + take] = values[:, :take]
+            self._filled[level] += take
+            values = values[:, take:]
+
+            if self._filled[level] == self._capacity:
+                self._compact(level)
+
+    def _compact(self, level: int) -> None:
+        buffer = np.sort(self._levels[level], axis=1)
+        offset = self._compactions % 2
+        self._compactions += 1
+
+        self._levels[level][:] = np.nan
+        self._filled[level] = 0
+        self._push(level + 1, buffer[:, offset::2])
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import time
+import types
+import typing
+
+import numpy as np
+import pydantic
+
+from orgsim import metrics
+
+
+def package_version() -> str:
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version("orgsim")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def describe(obj: object) -> typing.Any:
+    """Build a canonical, JSON-serializable description of a (strategy) object.
+
+    Plain objects are described by their type and their attributes, so two strategies built
+    with the same parameters get the same description, unless they have a `cache_description`
+    method, whose result describes them instead. Collected metrics are outputs rather than
+    parameters and are left out. Anything else that cannot be described the same way in every
+    process (closures, objects without attributes) is refused, rather than keyed by a `repr`
+    that may hold a memory address.
+    """
+
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, pydantic.BaseModel):
+        return {"type": _type_name(obj), "data": obj.model_dump(mode="json")}
+    if isinstance(obj, metrics.Metrics):
+        return None
+    if isinstance(obj, type):
+        return {"class": _qualified_name(obj)}
+    if isinstance(obj, (types.FunctionType, types.BuiltinFunctionType)):
+        if "<" in obj.__qualname__:
+            raise Exception(f"Cannot describe {obj!r} for a cache key")
+        return {"function": _qualified_name(obj)}
+    description = getattr(obj, "cache_description", None)
+    if callable(description):
+        return {"type": _type_name(obj), "description": describe(description())}
+    if isinstance(obj, (list, tuple)):
+        return [describe(x) for x in obj]
+    if isinstance(obj, dict):
+        return {str(k): describe(v) for k, v in sorted(obj.items())}
+    if isinstance(obj, (set, frozenset)):
+        return sorted((describe(x) for x in obj), key=json.dumps)
+    if isinstance(obj, np.generic):
+        return describe(obj.item())
+    if isinstance(obj, np.ndarray):
+        return {
+            "type": _type_name(obj),
+            "dtype": obj.dtype.str,
+            "shape": list(obj.shape),
+            "sha256": hashlib.sha256(np.ascontiguousarray(obj).tobytes()).hexdigest(),
+        }
+    if hasattr(obj, "__dict__") and not isinstance(obj, types.ModuleType):
+        return {
+            "type": _type_name(obj),
+            "params": {
+                k.lstrip("_"): describe(v) for k, v in sorted(vars(obj).items())
+            },
+        }
+    raise Exception(
+        f"Cannot describe a {_type_name(obj)} for a cache key; "
+        "give it a `cache_description` method"
+    )
+
+
+def _qualified_name(obj: typing.Any) -> str:
+    return f"{obj.__module__}.{obj.__qualname__}"
+
+
+def _type_name(obj: object) -> str:
+    return f"{type(obj).__module__}.{type(obj).__qualname__}"
+
+
+def key_for(
+    *, seed: pydantic.BaseModel, strategy: object, rng_seed: int, periods: int
+) -> str:
+    material = json.dumps(
+        {
+            "seed": json.loads(seed.model_dump_json()),
+            "strategy": describe(strategy),
+            "rng_seed": rng_seed,
+            "periods": periods,
+            "version": package_version(),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class ResultCache:
+    """A directory of experiment metrics addressed by `key_for`, trimmed to `max_bytes`.
+
+    Entries are written to a temporary file and renamed into place, so concurrent workers
+    storing the same key never expose a partial entry. Reads refresh the entry's mtime, which
+    is what the least-recently-used eviction goes by.
+    """
+
+    def __init__(self, root: str | pathlib.Path, max_bytes: int = 1 << 30) -> None:
+        self._root = pathlib.Path(root)
+        self._max_bytes = max_bytes
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def _path_of(self, key: str) -> pathlib.Path:
+        return self._root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> typing.Optional[metrics.MetricsData]:
+        path = self._path_of(key)
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            self._touch(path)
+        except FileNotFoundError:
+            # Evicted by another worker since it was read, which does not make it a miss.
+            pass
+        return metrics.parse_metrics_data(raw)
+
+    def put(self, key: str, data: metrics.MetricsData) -> None:
+        path = self._path_of(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode="w") as f:
+                f.write(data.model_dump_json())
+            os.replace(tmp, path)
+            self._touch(path)
+        except BaseException:
+            pathlib.Path(tmp).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def _touch(self, path: pathlib.Path) -> None:
+        # File systems stamp writes with a coarse clock, which is not enough to order entries
+        # touched in quick succession.
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def invalidate(self, key: str) -> bool:
+        try:
+            self._path_of(key).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def clear(self) -> None:
+        for path in self._root.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+
+    def keys(self) -> list[str]:
+        return [path.stem for path in self._root.glob("*/*.json")]
+
+    def _evict(self) -> None:
+        entries: list[tuple[int, int, pathlib.Path]] = []
+        for path in self._root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -1,4 +1,9 @@
 import abc
+import os
+import pickle
+import sys
+import traceback
+import typing
 
 
 class IdentityGenerator(abc.ABC):
@@ -9,8 +14,99 @@ class IdentityGenerator(abc.ABC):
 
 class SequentialIdentityGenerator(IdentityGenerator):
     def __init__(self, initial: int = 0) -> None:
+        self._initial = initial
         self._state: int = initial
 
+    def cache_description(self) -> dict[str, int]:
+        # The counter moves as the generator is used; a run is keyed by where it started.
+        return {"initial": self._initial}
+
     def generate(self) -> str:
         self._state += 1
         return str(self._state)
+
+
+R = typing.TypeVar("R")
+
+
+def run_forked(
+    n: int,
+    target: typing.Callable[[int], R],
+    max_workers: typing.Optional[int] = None,
+) -> list[R]:
+    """Run `target(i)` for every i in range(n), each in a child created by `os.fork`.
+
+    Children share the parent's memory copy-on-write, so whatever the parent has built up is
+    neither serialized nor copied up front, and nothing a child does is visible to the parent.
+    Results are pickled back over a pipe; a failing child raises in the parent.
+
+    Only the calling thread is carried over into a child, so a lock that another thread holds at
+    the time stays locked in it forever. Python warns about forking a multi-threaded process
+    (a DeprecationWarning since 3.12); call this before starting threads, or while they are
+    idle outside of any lock (as the server threads of `v1.game.remote` are between calls).
+    """
+
+    if not hasattr(os, "fork"):
+        raise Exception("Forking is not supported on this platform")
+
+    workers = max_workers or os.cpu_count() or 1
+    results: list[R] = []
+    for start in range(0, n, workers):
+        children: list[tuple[int, int]] = []
+        payloads: list[tuple[int, bytes]] = []
+        try:
+            for i in range(start, min(start + workers, n)):
+                children.append(_fork_child(i, target))
+            for pid, fd in children:
+                payloads.append((pid, _read_all(fd)))
+        finally:
+            # Every child is reaped, even if the parent stops reading; closing its pipe first
+            # makes a child that is still writing fail instead of blocking forever.
+            for pid, fd in children:
+                os.close(fd)
+                os.waitpid(pid, 0)
+
+        for pid, payload in payloads:
+            if not payload:
+                raise Exception(f"Forked child {pid} exited without a result")
+            ok, value = pickle.loads(payload)
+            if not ok:
+                raise Exception(f"Forked child {pid} failed:\n{value}")
+            results.append(value)
+    return results
+
+
+def _read_all(fd: int) -> bytes:
+    chunks = []
+    while chunk := os.read(fd, 1 << 16):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _fork_child(i: int, target: typing.Callable[[int], R]) -> tuple[int, int]:
+    r, w = os.pipe()
+    # Whatever is buffered would otherwise be written again by the child.
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid != 0:
+        os.close(w)
+        return pid, r
+
+    status = 1
+    try:
+        os.close(r)
+        try:
+            payload = pickle.dumps((True, target(i)))
+            status = 0
+        except BaseException:
+            payload = pickle.dumps((False, traceback.format_exc()))
+        with os.fdopen(w, "wb") as f:
+            f.write(payload)
+    finally:
+        # `os._exit` skips the interpreter's cleanup, including flushing stdio.
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(status)
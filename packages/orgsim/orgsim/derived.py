@@ -0,0 +1,346 @@
+"""Derived metrics: series computed from the logged ones when they are first queried.
+
+A derived metric is an expression (see `orgsim.expr`) whose names are either logged series
+(their unlabelled series) or groups: all the series of a class whose labels match a filter
+(one per person, say), reduced at every date to a single value. With `person_bonus` logged for
+every person and `population` once a period:
+
+    metrics.derive(
+        "bonus_per_capita",
+        "bonus / population",
+        groups={"bonus": derived.Group(series="person_bonus", reduce="sum")},
+    )
+
+A derived series has a value at every date at which all of its inputs have one (the first one
+logged at that date, if there are several). It is computed on first query and cached. Samples
+logged after that invalidate the cache, and the next query only reads the new ones and
+evaluates the expression on the rows they complete. Expressions with aggregates, such as
+`population / max(population)`, depend on the whole series, and are evaluated again in full.
+
+The value of a group at its latest date is provisional, since more members may log at that
+date, and is recomputed on every query until a member logs at a later date. Every member of a
+group counts once, whatever its labels say it stands for.
+
+Inputs that only retain their latest entries (see `orgsim.world.v1.base.SeriesConfig.retain`)
+must be queried before they have logged more than they retain: the entries they dropped in the
+meantime are lost to derived series, which raise rather than skip them.
+
+Metrics stores get `derive` and the derived side of their queries from `DerivedSeries`.
+"""
+
+import typing
+
+import numpy as np
+import numpy.typing as npt
+import pydantic
+
+from orgsim import expr
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+Labels: typing.TypeAlias = dict[str, str]
+
+TimeSeriesEntry: typing.TypeAlias = tuple[int, int, float]
+
+Read: typing.TypeAlias = typing.Callable[
+    [str, Labels],
+    typing.Iterable[tuple[Labels, typing.Sequence[TimeSeriesEntry], int]],
+]
+"""The series of a class whose labels match a filter, each with its labels, the entries it
+retains and the number of entries ever logged in it (which can be more, if it is bounded)."""
+
+_Key: typing.TypeAlias = tuple[int, int]
+
+
+def gini(x: npt.NDArray[np.float64]) -> float:
+    if len(x) == 0:
+        return float("nan")
+    total = float(x.sum())
+    if total == 0:
+        return 0.0
+    ranks = np.arange(1, len(x) + 1)
+    return float(
+        2 * np.dot(ranks, np.sort(x)) / (len(x) * total) - (len(x) + 1) / len(x)
+    )
+
+
+def _nan_if_empty(
+    f: typing.Callable[[npt.NDArray[np.float64]], typing.Any],
+) -> typing.Callable[[npt.NDArray[np.float64]], float]:
+    return lambda x: float(f(x)) if len(x) else float("nan")
+
+
+REDUCTIONS: dict[str, typing.Callable[[npt.NDArray[np.float64]], float]] = {
+    "sum": lambda x: float(x.sum()),
+    "count": lambda x: float(len(x)),
+    "mean": _nan_if_empty(np.mean),
+    "median": _nan_if_empty(np.median),
+    "min": _nan_if_empty(np.min),
+    "max": _nan_if_empty(np.max),
+    "gini": gini,
+}
+
+
+class Group(pydantic.BaseModel):
+    series: str
+    reduce: str = "sum"
+    filter_labels: Labels = {}
+
+    @pydantic.model_validator(mode="after")
+    def _check(self) -> typing.Self:
+        if self.reduce not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction: {self.reduce}")
+        return self
+
+
+class _Derived:
+    def __init__(
+        self, expression: expr.Expression, groups: typing.Mapping[str, Group]
+    ) -> None:
+        self.expression = expression
+        self.groups = dict(groups)
+        self.series = sorted(expression.names - self.groups.keys())
+
+        self._seen: dict[tuple[str, frozenset[tuple[str, str]]], tuple[int, _Key]] = {}
+        # The values of the rows that are not complete yet.
+        self._pending: dict[str, dict[_Key, float]] = {n: {} for n in self.series}
+        self._members: dict[str, dict[_Key, list[float]]] = {a: {} for a in self.groups}
+        self._latest: dict[str, _Key] = {}
+        self._done: _Key = (-1, -1)
+        # The complete rows, in order, and the entries of those evaluated so far.
+        self._keys: list[_Key] = []
+        self._columns: dict[str, list[float]] = {n: [] for n in expression.names}
+        self._final: list[TimeSeriesEntry] = []
+        self._output: typing.Optional[list[TimeSeriesEntry]] = None
+
+    def _tail(
+        self,
+        name: str,
+        labels: Labels,
+        entries: typing.Sequence[TimeSeriesEntry],
+        count: int,
+    ) -> typing.Iterator[tuple[_Key, float]]:
+        """The entries logged in a series since the last update, but one per date."""
+
+        k = (name, frozenset(labels.items()))
+        seen, last = self._seen.get(k, (0, self._done))
+        if count == seen:
+            return
+        if (
+            count - seen > len(entries)
+            and entries
+            and (entries[0][0], entries[0][1]) > last
+        ):
+            raise Exception(
+                f"Series {name} {labels} dropped {count - seen - len(entries)} entries before "
+                f"a derived series read them; query it more often or retain more"
+            )
+        for date, period, value in entries[max(0, len(entries) - (count - seen)) :]:
+            if (date, period) > last:
+                last = (date, period)
+                yield last, value
+        self._seen[k] = (count, last)
+
+    def update(self, read: Read) -> None:
+        changed = False
+        for name in self.series:
+            pending = self._pending[name]
+            for labels, entries, count in read(name, {}):
+                if labels:
+                    continue
+                for key, value in self._tail(name, labels, entries, count):
+                    pending[key] = value
+                    self._latest[name] = key
+                    changed = True
+        for alias, group in self.groups.items():
+            members = self._members[alias]
+            for labels, entries, count in read(group.series, group.filter_labels):
+                for key, value in self._tail(alias, labels, entries, count):
+                    members.setdefault(key, []).append(value)
+                    self._latest[alias] = max(self._latest.get(alias, key), key)
+                    changed = True
+        if changed:
+            self._output = None
+
+    def entries(self) -> list[TimeSeriesEntry]:
+        if self._output is not None:
+            return self._output
+
+        keys: typing.Optional[set[_Key]] = None
+        for pending in self._rows():
+            keys = set(pending) if keys is None else keys & pending.keys()
+        complete = sorted(keys or ())
+        # A group is only complete at a date once a member has logged at a later one.
+        final = [k for k in complete if all(k < self._latest[a] for a in self.groups)]
+        provisional = complete[len(final) :]
+
+        for k in final:
+            self._keys.append(k)
+            for name in self.series:
+                self._columns[name].append(self._pending[name].pop(k))
+            for alias, group in self.groups.items():
+                x = np.array(self._members[alias].pop(k), dtype=np.float64)
+                self._columns[alias].append(REDUCTIONS[group.reduce](x))
+        if final:
+            self._done = final[-1]
+        self._prune()
+
+        tail: dict[str, list[float]] = {n: [] for n in self._columns}
+        for k in provisional:
+            for name in self.series:
+                tail[name].append(self._pending[name][k])
+            for alias, group in self.groups.items():
+                x = np.array(self._members[alias][k], dtype=np.float64)
+                tail[alias].append(REDUCTIONS[group.reduce](x))
+
+        if self.expression.has_aggregates:
+            columns = {n: c + tail[n] for n, c in self._columns.items()}
+            values = self._evaluate(columns, 0, len(self._keys) + len(provisional))
+            self._output = [
+                (d, p, v) for (d, p), v in zip(self._keys + provisional, values)
+            ]
+            return self._output
+
+        start = len(self._final)
+        values = self._evaluate(self._columns, start, len(self._keys))
+        self._final.extend((d, p, v) for (d, p), v in zip(self._keys[start:], values))
+        values = self._evaluate(tail, 0, len(provisional))
+        self._output = self._final + [
+            (d, p, v) for (d, p), v in zip(provisional, values)
+        ]
+        return self._output
+
+    def _rows(self) -> list[dict[_Key, typing.Any]]:
+        return [*self._pending.values(), *self._members.values()]
+
+    def _prune(self) -> None:
+        # Rows that some input has gone past without logging will never be complete.
+        inputs = [*self.series, *self.groups]
+        if any(n not in self._latest for n in inputs):
+            return
+        floor = min(self._latest[n] for n in inputs)
+        for pending in self._rows():
+            for k in [k for k in pending if k < floor or k <= self._done]:
+                del pending[k]
+
+    def _evaluate(
+        self, columns: typing.Mapping[str, list[float]], start: int, stop: int
+    ) -> list[float]:
+        if start == stop:
+            return []
+        variables = {
+            n: np.array(c[start:stop], dtype=np.float64) for n, c in columns.items()
+        }
+        values = np.asarray(self.expression(variables), dtype=np.float64)
+        result: list[float] = np.broadcast_to(values, (stop - start,)).tolist()
+        return result
+
+
+class DerivedMetrics:
+    """The derived metrics of a store, which reads its logged series through `read`."""
+
+    def __init__(self, read: Read) -> None:
+        self._read = read
+        self._derived: dict[str, _Derived] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._derived
+
+    def names(self) -> list[str]:
+        return list(self._derived)
+
+    def define(
+        self,
+        name: str,
+        expression: str,
+        *,
+        groups: typing.Mapping[str, Group] = {},
+        definitions: typing.Mapping[str, str] = {},
+    ) -> None:
+        """Define `name` as `expression` over logged series and `groups` (see the module)."""
+
+        compiled = expr.Expression(expression, definitions=definitions)
+        if groups.keys() - compiled.names:
+            raise Exception(
+                f"Groups not used in {expression}: {sorted(groups.keys() - compiled.names)}"
+            )
+        inputs = compiled.names | {g.series for g in groups.values()}
+        if inputs & self._derived.keys() or name in inputs:
+            raise Exception(f"Derived metrics can only use logged series: {expression}")
+        self._derived[name] = _Derived(compiled, groups)
+
+    def entries(self, name: str) -> list[TimeSeriesEntry]:
+        derived = self._derived[name]
+        derived.update(self._read)
+        return derived.entries()
+
+
+class _SeriesClass(typing.Protocol):
+    label_mapping: dict[int, Labels]
+    series: dict[int, list[TimeSeriesEntry]]
+
+
+class DerivedSeries:
+    """`derive`, and the derived side of the queries, for a store of logged series.
+
+    A store calls `_init_derived` when it is created, provides its series classes, and overrides
+    `_retained` if the entries of a series are not all in its class.
+    """
+
+    def _init_derived(self) -> None:
+        self._derived = DerivedMetrics(self._read)
+
+    def _logged_classes(self) -> typing.Mapping[str, _SeriesClass]:
+        raise NotImplementedError()
+
+    def _retained(
+        self, name: str, lid: int
+    ) -> tuple[typing.Sequence[TimeSeriesEntry], int]:
+        series = self._logged_classes()[name].series[lid]
+        return series, len(series)
+
+    def derive(
+        self,
+        name: str,
+        expression: str,
+        *,
+        groups: typing.Mapping[str, Group] = {},
+        definitions: typing.Mapping[str, str] = {},
+    ) -> None:
+        """Define a derived series, computed when queried (see `orgsim.derived`)."""
+
+        if name in self._logged_classes():
+            raise Exception(f"Series {name} is already logged")
+        self._derived.define(name, expression, groups=groups, definitions=definitions)
+
+    def _read(
+        self, name: str, filter_labels: Labels
+    ) -> typing.Iterator[tuple[Labels, typing.Sequence[TimeSeriesEntry], int]]:
+        sc = self._logged_classes().get(name)
+        if sc is None:
+            return
+        for lid, labels in sc.label_mapping.items():
+            if all(labels.get(k) == v for k, v in filter_labels.items()):
+                entries, count = self._retained(name, lid)
+                yield labels, entries, count
+
+    def _derived_fiscal_series(self, name: str) -> "pd.Series[float]":
+        import pandas as pd
+
+        entries = self._derived.entries(name)
+        return pd.Series([s[2] for s in entries], index=[s[1] for s in entries])
+
+    def _derived_series_in_class(
+        self, name: str, filter_labels: typing.Optional[Labels]
+    ) -> "typing.Iterator[tuple[pd.DataFrame, Labels]]":
+        import pandas as pd
+
+        # Derived series have no labels.
+        if not filter_labels:
+            yield (
+                pd.DataFrame(
+                    self._derived.entries(name), columns=["date", "period", "value"]
+                ),
+                {},
+            )
@@ -0,0 +1,283 @@
+"""Expressions over named fields, evaluated with NumPy over a whole population at once.
+
+An expression is a Python expression restricted to arithmetic, comparisons (`&`, `|` and `~`
+combine them), conditionals (`a if test else b`), numbers, names and a few functions:
+
+    (1 - selfishness) * clip((c - c * qol) / qol, 0, 1)
+
+Names are looked up in the variables given to `Expression.__call__`, which can be arrays (one
+value per person) or scalars, so the same expression works on one person or on everybody.
+`definitions` name intermediate expressions, each of which can use the ones before it. The
+aggregates `sum`, `mean`, `min`, `max` and `count` reduce an expression of variables (not of
+definitions or other aggregates) over the population, with optional weights, and are computed
+separately by `Expression.aggregate` so that engines can take them at the right time.
+"""
+
+import ast
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+Value: typing.TypeAlias = typing.Union[float, npt.NDArray[np.float64]]
+
+FUNCTIONS: dict[str, typing.Callable[..., typing.Any]] = {
+    "abs": np.abs,
+    "ceil": np.ceil,
+    "clip": np.clip,
+    "exp": np.exp,
+    "floor": np.floor,
+    "log": np.log,
+    "log1p": np.log1p,
+    "maximum": np.maximum,
+    "minimum": np.minimum,
+    "sign": np.sign,
+    "sqrt": np.sqrt,
+    "tanh": np.tanh,
+    "where": np.where,
+}
+
+
+def _weighted_sum(x: npt.NDArray[np.float64], w: npt.NDArray[np.float64]) -> float:
+    return float(np.dot(x, w))
+
+
+def _weighted_mean(x: npt.NDArray[np.float64], w: npt.NDArray[np.float64]) -> float:
+    return float(np.dot(x, w) / w.sum()) if len(x) else float("nan")
+
+
+def _min(x: npt.NDArray[np.float64], w: npt.NDArray[np.float64]) -> float:
+    return float(x.min()) if len(x) else float("nan")
+
+
+def _max(x: npt.NDArray[np.float64], w: npt.NDArray[np.float64]) -> float:
+    return float(x.max()) if len(x) else float("nan")
+
+
+def _count(x: npt.NDArray[np.float64], w: npt.NDArray[np.float64]) -> float:
+    return float(np.dot(x != 0, w))
+
+
+AGGREGATES: dict[
+    str,
+    typing.Callable[[npt.NDArray[np.float64], npt.NDArray[np.float64]], float],
+] = {
+    "sum": _weighted_sum,
+    "mean": _weighted_mean,
+    "min": _min,
+    "max": _max,
+    "count": _count,
+}
+
+_OPERATORS = (
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.BitAnd,
+    ast.BitOr,
+    ast.USub,
+    ast.UAdd,
+    ast.Invert,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.Eq,
+    ast.NotEq,
+)
+
+_GLOBALS: dict[str, typing.Any] = {"__builtins__": {}, **FUNCTIONS}
+
+
+class _Aggregate(typing.NamedTuple):
+    key: str
+    function: str
+    code: typing.Any
+    names: frozenset[str]
+
+
+class _Compiler(ast.NodeTransformer):
+    def __init__(self, source: str, first_aggregate: int) -> None:
+        self.source = source
+        self.names: set[str] = set()
+        self.aggregates: list[_Aggregate] = []
+        self._first_aggregate = first_aggregate
+        self._in_aggregate = False
+
+    def fail(self, message: str) -> typing.NoReturn:
+        raise Exception(f"{message} in expression: {self.source}")
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        allowed = (
+            ast.Expression,
+            ast.BinOp,
+            ast.UnaryOp,
+            ast.Compare,
+            ast.IfExp,
+            ast.Call,
+            ast.Name,
+            ast.Constant,
+            ast.Load,
+            *_OPERATORS,
+        )
+        if not isinstance(node, allowed):
+            self.fail(f"{type(node).__name__} is not allowed")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if type(node.value) not in (int, float, bool):
+            self.fail(f"Constant {node.value!r} is not a number")
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id.startswith("_") or node.id in FUNCTIONS or node.id in AGGREGATES:
+            self.fail(f"{node.id} cannot be used as a name")
+        self.names.add(node.id)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        if len(node.ops) != 1:
+            self.fail("Chained comparisons are not supported")
+        return self.generic_visit(node)
+
+    def visit_IfExp(self, node: ast.IfExp) -> ast.AST:
+        # `a if test else b` works on arrays as `where(test, a, b)`.
+        call = ast.Call(
+            func=ast.Name(id="where", ctx=ast.Load()),
+            args=[node.test, node.body, node.orelse],
+            keywords=[],
+        )
+        result: ast.AST = self.visit(ast.copy_location(call, node))
+        return result
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            self.fail("Only plain calls of known functions are allowed")
+        name = node.func.id
+        if name in AGGREGATES:
+            return self._aggregate(name, node)
+        if name not in FUNCTIONS:
+            self.fail(f"Unknown function {name}")
+        node.args = [self.visit(a) for a in node.args]
+        return node
+
+    def _aggregate(self, name: str, node: ast.Call) -> ast.AST:
+        if self._in_aggregate or len(node.args) != 1:
+            self.fail(f"{name} takes one argument, which cannot be an aggregate")
+
+        outer, self.names = self.names, set()
+        self._in_aggregate = True
+        arg = self.visit(node.args[0])
+        self._in_aggregate = False
+        names, self.names = self.names, outer | self.names
+
+        key = f"__{self._first_aggregate + len(self.aggregates)}"
+        code = compile(
+            ast.fix_missing_locations(ast.Expression(body=arg)),
+            f"<{self.source}>",
+            "eval",
+        )
+        self.aggregates.append(_Aggregate(key, name, code, frozenset(names)))
+        return ast.copy_location(ast.Name(id=key, ctx=ast.Load()), node)
+
+    def compile(self) -> typing.Any:
+        try:
+            tree = ast.parse(self.source.strip(), mode="eval")
+        except SyntaxError as e:
+            self.fail(f"Invalid syntax ({e.msg})")
+        tree = self.visit(tree)
+        return compile(ast.fix_missing_locations(tree), f"<{self.source}>", "eval")
+
+
+class Expression:
+    def __init__(
+        self, source: str, *, definitions: typing.Mapping[str, str] = {}
+    ) -> None:
+        self.source = source
+        self._definitions = dict(definitions)
+        self._steps: list[tuple[str, typing.Any]] = []
+        self._aggregates: list[_Aggregate] = []
+
+        defined: set[str] = set()
+        names: set[str] = set()
+        for target, definition in [*definitions.items(), ("", source)]:
+            if target in FUNCTIONS or target in AGGREGATES or target.startswith("_"):
+                raise Exception(f"{target} cannot be defined")
+            compiler = _Compiler(definition, len(self._aggregates))
+            code = compiler.compile()
+            for a in compiler.aggregates:
+                if a.names & defined:
+                    raise Exception(
+                        f"Aggregates cannot use definitions: {sorted(a.names & defined)}"
+                    )
+            names |= compiler.names - defined
+            self._aggregates.extend(compiler.aggregates)
+            self._steps.append((target, code))
+            defined.add(target)
+
+        self.names: frozenset[str] = frozenset(names)
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+    def cache_description(self) -> dict[str, typing.Any]:
+        """What the expression is compiled from (see `orgsim.cache.describe`)."""
+
+        return {"source": self.source, "definitions": self._definitions}
+
+    @property
+    def has_aggregates(self) -> bool:
+        return bool(self._aggregates)
+
+    def aggregate(
+        self,
+        population: typing.Mapping[str, Value],
+        weights: typing.Optional[npt.NDArray[np.float64]] = None,
+    ) -> dict[str, float]:
+        """The aggregates of the expression over `population` (arrays of one value per person,
+        or scalars), to be passed back to `__call__`."""
+
+        if not self._aggregates:
+            return {}
+        n = max((np.size(v) for v in population.values()), default=0)
+        w = weights if weights is not None else np.ones(n)
+        result = {}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for a in self._aggregates:
+                x = np.broadcast_to(
+                    np.asarray(self._eval(a.code, population), dtype=np.float64), (n,)
+                )
+                result[a.key] = AGGREGATES[a.function](x, w)
+        return result
+
+    def __call__(
+        self,
+        variables: typing.Mapping[str, Value],
+        *,
+        aggregates: typing.Optional[typing.Mapping[str, float]] = None,
+    ) -> typing.Any:
+        """Evaluate the expression; without `aggregates`, they are taken over `variables`."""
+
+        namespace: dict[str, typing.Any] = dict(variables)
+        if self._aggregates:
+            namespace.update(
+                aggregates if aggregates is not None else self.aggregate(variables)
+            )
+        value: typing.Any = None
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for target, code in self._steps:
+                value = self._eval(code, namespace)
+                namespace[target] = value
+        return value
+
+    def _eval(
+        self, code: typing.Any, namespace: typing.Mapping[str, typing.Any]
+    ) -> typing.Any:
+        try:
+            return eval(code, _GLOBALS, namespace)
+        except NameError as e:
+            raise Exception(f"Unknown name {e.name} in expression: {self.source}")
@@ -3,7 +3,28 @@ import typing
 
 import pydantic
 
+from orgsim import common
+from orgsim.framework import events as events_
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+    from orgsim.framework import approx
+
 T = typing.TypeVar("T", bound=pydantic.BaseModel)
+R = typing.TypeVar("R")
+F = typing.TypeVar("F", bound=typing.Callable[..., typing.Any])
+
+
+def noop(hook: F) -> F:
+    """Mark a strategy hook as doing nothing, so that the World does not call it at all."""
+
+    setattr(hook, "__orgsim_noop__", True)
+    return hook
+
+
+def is_noop(hook: typing.Callable[..., typing.Any]) -> bool:
+    return bool(getattr(getattr(hook, "__func__", hook), "__orgsim_noop__", False))
 
 
 class PersonState(pydantic.BaseModel, typing.Generic[T]):
@@ -12,6 +33,13 @@ class PersonState(pydantic.BaseModel, typing.Generic[T]):
     age: int = 0
     wealth: float = 0.0
     contributions: float = 0
+    # How many people this record stands for (see `approx`); wealth and contributions are
+    # per person.
+    weight: float = 1.0
+    # The members of a merged record are spread evenly over wealth +- wealth_spread and
+    # age +- age_spread (see `approx`).
+    wealth_spread: float = 0.0
+    age_spread: float = 0.0
 
 
 class WorldSeed(pydantic.BaseModel, typing.Generic[T]):
@@ -65,17 +93,26 @@ class WorldStrategy(abc.ABC, typing.Generic[T]):
     ) -> typing.Iterable[T]:
         raise NotImplementedError()
 
-    @abc.abstractmethod
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        """A key (other than None) if the strategy treats people with identical states alike,
+        counting `PersonState.weight`, so a World can play them as one cohort (see `cohorts`).
+        Strategies that draw random numbers per person, or read the totals of the day as they
+        run, must not have one."""
+
+        return None
+
+    # The per-day hooks are optional: the World skips the ones left as they are here.
+    @noop
     def on_before_person_acts(self, *, state: WorldState[T], identity: str) -> None:
-        raise NotImplementedError()
+        pass
 
-    @abc.abstractmethod
+    @noop
     def on_after_person_acts(self, *, state: WorldState[T], identity: str) -> None:
-        raise NotImplementedError()
+        pass
 
-    @abc.abstractmethod
+    @noop
     def on_end_of_day(self, *, state: WorldState[T]) -> None:
-        raise NotImplementedError()
+        pass
 
     @abc.abstractmethod
     def on_end_of_period(self, *, state: WorldState[T]) -> None:
@@ -83,13 +120,88 @@ class WorldStrategy(abc.ABC, typing.Generic[T]):
 
 
 class World(typing.Generic[T]):
-    def __init__(self, *, state: WorldState[T], strategy: WorldStrategy[T]) -> None:
+    def __init__(
+        self,
+        *,
+        state: WorldState[T],
+        strategy: WorldStrategy[T],
+        events: typing.Optional[events_.EventLog] = None,
+        population_cap: typing.Optional["approx.PopulationCap"] = None,
+        cohorts: bool = False,
+    ) -> None:
+        """With a `population_cap`, the world merges similar people into weighted records
+        whenever there are more of them than the cap (see `approx`). With `cohorts`, it merges
+        identical people, which is exact for the strategies that declare a `cohort_key` and
+        refused for the others (see `cohorts`)."""
+
+        if population_cap is not None and events is not None:
+            raise Exception("A capped population cannot be recorded into an event log")
+        if cohorts and events is not None:
+            raise Exception("Cohorts cannot be recorded into an event log")
+        if cohorts and strategy.cohort_key() is None:
+            raise Exception(
+                f"{type(strategy).__name__} does not declare that it treats identical people"
+                " alike (see `WorldStrategy.cohort_key`)"
+            )
+
         self._state = state
         self._strategy = strategy
+        self._events = events
+        self._population_cap = population_cap
+        self._cohorts = cohorts
+        if cohorts:
+            from orgsim.framework import cohorts as cohorts_
+
+            state.people_states = cohorts_.merge_identical(state.people_states)
+        self._cap_rng: typing.Optional["np.random.Generator"] = None
+        if population_cap is not None:
+            import numpy as np
+
+            self._cap_rng = np.random.default_rng(population_cap.seed)
+
+    @property
+    def state(self) -> WorldState[T]:
+        return self._state
+
+    @property
+    def strategy(self) -> WorldStrategy[T]:
+        return self._strategy
+
+    @property
+    def events(self) -> typing.Optional[events_.EventLog]:
+        return self._events
 
     def is_empty(self) -> bool:
         return len(self._state.people_states) == 0
 
+    def fork(
+        self,
+        n: int,
+        *,
+        periods: int,
+        collect: typing.Callable[["World[T]"], R],
+        mutate: typing.Optional[typing.Callable[["World[T]", int], None]] = None,
+        max_workers: typing.Optional[int] = None,
+    ) -> list[R]:
+        """Branch the world into `n` children and run each of them for `periods` more periods.
+
+        Every child starts from the current state (shared copy-on-write), is passed to
+        `mutate` along with its branch number, and is reduced to a picklable value by `collect`
+        once it is done. The children also continue the parent's RNG state, so the branches
+        see the same random draws unless `mutate` reseeds them. This world is left untouched.
+        """
+
+        def branch(i: int) -> R:
+            if mutate is not None:
+                mutate(self, i)
+            for _ in range(periods):
+                if self.is_empty():
+                    break
+                self.run_period()
+            return collect(self)
+
+        return common.run_forked(n, branch, max_workers=max_workers)
+
     def run_period(self) -> None:
         for i in range(self._state.seed.fiscal_length):
             if self.is_empty():
@@ -99,63 +211,224 @@ class World(typing.Generic[T]):
         if self.is_empty():
             return
 
+        if self._events is not None:
+            self._events.reward(
+                date=self._state.time.date,
+                period=self._state.time.fiscal_period,
+                value=self._state.total_reward,
+            )
+        people = list(self._state.people_states.values())
         self._strategy.distribute_rewards(state=self._state)
         self._recruit_people()
         self._strategy.on_end_of_period(state=self._state)
+        if self._cohorts:
+            from orgsim.framework import cohorts as cohorts_
+
+            self._state.people_states = cohorts_.merge_identical(
+                self._state.people_states
+            )
+        if self._population_cap is not None and self._cap_rng is not None:
+            from orgsim.framework import approx
+
+            self._state.people_states = approx.merge_people(
+                self._state.people_states,
+                cap=self._population_cap,
+                rng=self._cap_rng,
+            )
+        if self._events is not None:
+            self._record_deaths(self._events, people)
+            self._events.period_end(
+                date=self._state.time.date,
+                period=self._state.time.fiscal_period,
+                population=len(self._state.people_states),
+            )
 
         self._state.time.fiscal_period += 1
 
     def run_day(self) -> None:
-        for state in list(self._state.people_states.values()):
-            self._person_act(state)
-        self._strategy.on_end_of_day(state=self._state)
+        people = list(self._state.people_states.values())
+        self._act(people)
+        end_of_day = self._strategy.on_end_of_day
+        if not is_noop(end_of_day):
+            end_of_day(state=self._state)
+        if self._events is not None:
+            self._record_deaths(self._events, people)
         self._state.time.date += 1
 
-    def _person_act(self, pstate: PersonState[T]) -> None:
-        self._strategy.on_before_person_acts(
-            state=self._state, identity=pstate.identity
-        )
-
-        contribution = self._strategy.person_act(
-            state=self._state, identity=pstate.identity
-        )
+    def _record_deaths(
+        self, events: events_.EventLog, people: typing.Iterable[PersonState[T]]
+    ) -> None:
+        for pstate in people:
+            if pstate.identity in self._state.people_states:
+                continue
+            events.death(
+                date=self._state.time.date,
+                period=self._state.time.fiscal_period,
+                identity=pstate.identity,
+                cause=events_.Cause.AGE
+                if pstate.age >= self._state.seed.max_age
+                else events_.Cause.WEALTH,
+            )
 
-        pstate.wealth += self._state.seed.daily_salary
-        pstate.contributions += contribution
-        self._state.total_reward += (
-            contribution * self._state.seed.productivity * self._state.seed.daily_salary
-        )
+    def _act(self, people: list[PersonState[T]]) -> None:
+        """Everybody acts for a day, calling only the hooks that do something.
+
+        The hooks, and the seed's salary and productivity, are looked up at the start of every
+        day, so that replacing them between days (e.g. in `fork`'s `mutate`) takes effect.
+        """
+
+        state = self._state
+        strategy = self._strategy
+        act = strategy.person_act
+        before = strategy.on_before_person_acts
+        after = strategy.on_after_person_acts
+        call_before = not is_noop(before)
+        call_after = not is_noop(after)
+        if not call_before and not call_after:
+            salary = state.seed.daily_salary
+            productivity = state.seed.productivity
+            for pstate in people:
+                contribution = act(state=state, identity=pstate.identity)
+                pstate.wealth += salary
+                pstate.contributions += contribution
+                state.total_reward += (
+                    contribution * productivity * salary * pstate.weight
+                )
+            return
 
-        self._strategy.on_after_person_acts(state=self._state, identity=pstate.identity)
+        for pstate in people:
+            if call_before:
+                before(state=state, identity=pstate.identity)
+            contribution = act(state=state, identity=pstate.identity)
+            pstate.wealth += state.seed.daily_salary
+            pstate.contributions += contribution
+            state.total_reward += (
+                contribution
+                * state.seed.productivity
+                * state.seed.daily_salary
+                * pstate.weight
+            )
+            if call_after:
+                after(state=state, identity=pstate.identity)
 
     def _recruit_people(self) -> None:
         role_models = [
-            self._state.people_states[i].seed
+            self._state.people_states[i]
             for i in self._strategy.pick_role_models(state=self._state)
         ]
-        for seed in self._strategy.generate_recruits(
-            seed=self._state.seed, role_models=role_models
-        ):
-            identity = self._strategy.generate_identity()
-            self._state.people_states[identity] = PersonState(
-                seed=seed,
-                identity=identity,
-                age=0,
+        if self._cap_rng is not None and any(p.weight != 1 for p in role_models):
+            from orgsim.framework import approx
+
+            role_models = approx.resample_by_weight(
+                role_models, [p.weight for p in role_models], rng=self._cap_rng
+            )
+        seeds = [p.seed for p in role_models]
+        if self._cohorts and any(p.weight != 1 for p in role_models):
+            from orgsim.framework import cohorts as cohorts_
+
+            seeds = cohorts_.expand(role_models)
+        self.recruit(
+            list(
+                self._strategy.generate_recruits(
+                    seed=self._state.seed, role_models=seeds
+                )
+            )
+        )
+
+    def recruit(self, seeds: typing.Sequence[T]) -> list[str]:
+        """Add a person for each of the (already validated) seeds and return their identities."""
+
+        identities = [self._strategy.generate_identity() for _ in seeds]
+        self._state.people_states.update(
+            create_people(
+                seeds=seeds,
+                identities=identities,
                 wealth=self._state.seed.initial_individual_wealth,
-                contributions=0,
             )
+        )
+        if self._events is not None:
+            record_births(
+                self._events, seeds=seeds, identities=identities, time=self._state.time
+            )
+        return identities
+
+
+def record_births(
+    events: events_.EventLog,
+    *,
+    seeds: typing.Sequence[pydantic.BaseModel],
+    identities: typing.Sequence[str],
+    time: WorldTime,
+) -> None:
+    for p, i in zip(seeds, identities):
+        events.birth(
+            date=time.date,
+            period=time.fiscal_period,
+            identity=i,
+            traits=events_.flatten_traits(p),
+        )
 
 
-def create_world(seed: WorldSeed[T], strategy: WorldStrategy[T]) -> World[T]:
-    identities = [strategy.generate_identity() for _ in range(len(seed.initial_people))]
-    state = WorldState(
+def create_people(
+    *, seeds: typing.Sequence[T], identities: typing.Sequence[str], wealth: float
+) -> dict[str, PersonState[T]]:
+    """Build the states of new people without validating them again.
+
+    Seeds are validated where they enter the simulation (the WorldSeed, or the strategy that
+    generates them), so everything here is known to be well-formed.
+    """
+
+    return {
+        i: PersonState[T].model_construct(
+            seed=p,
+            identity=i,
+            age=0,
+            wealth=wealth,
+            contributions=0.0,
+            weight=1.0,
+            wealth_spread=0.0,
+            age_spread=0.0,
+        )
+        for p, i in zip(seeds, identities)
+    }
+
+
+def create_world(
+    seed: WorldSeed[T],
+    strategy: WorldStrategy[T],
+    events: typing.Optional[events_.EventLog] = None,
+    initial_people: typing.Optional[typing.Sequence[T]] = None,
+    population_cap: typing.Optional["approx.PopulationCap"] = None,
+    cohorts: bool = False,
+) -> World[T]:
+    """Create a world from its seed, recording it into `events` when given.
+
+    The event log captures the seed and the current state of the global NumPy RNG, which the
+    strategies draw from, so the run can later be replayed (see `orgsim.replay_world`).
+    `initial_people` fixes the order in which the seed's people are created (and act), which
+    otherwise follows the iteration order of the set.
+    """
+
+    if events is not None:
+        events.begin(engine="framework", seed=seed)
+
+    people = list(initial_people if initial_people is not None else seed.initial_people)
+    identities = [strategy.generate_identity() for _ in range(len(people))]
+    state = WorldState[T].model_construct(
         seed=seed,
-        people_states={
-            i: PersonState(seed=p, identity=i, wealth=seed.initial_individual_wealth)
-            for p, i in zip(seed.initial_people, identities)
-        },
-        total_reward=0,
+        people_states=create_people(
+            seeds=people, identities=identities, wealth=seed.initial_individual_wealth
+        ),
+        total_reward=0.0,
         time=WorldTime(date=0, fiscal_period=0),
     )
-
-    return World(state=state, strategy=strategy)
+    if events is not None:
+        record_births(events, seeds=people, identities=identities, time=state.time)
+
+    return World(
+        state=state,
+        strategy=strategy,
+        events=events,
+        population_cap=population_cap,
+        cohorts=cohorts,
+    )
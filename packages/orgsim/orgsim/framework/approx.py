@@ -0,0 +1,210 @@
+"""Approximate execution of a World with a bounded number of person records.
+
+Once a population outgrows its cap, people with similar traits and state are merged into
+weighted super-individuals: everybody is binned on the quantiles of their numeric traits, age
+and wealth, and every bin becomes a single `PersonState` whose `weight` is the number of people
+it stands for. The World scales their contributions by weight, and weight-aware strategies
+scale rewards and statistics.
+
+Members of a record are not all alike, and must not die all on the same day. Besides the mean
+age and wealth, a record keeps how far its members are spread around them (`age_spread` and
+`wealth_spread`), taking them to be spread evenly over those ranges, with the variance of the
+people merged into it. Everything the World and the default strategies do moves the members of
+a record together, so the ranges only shift, until a death threshold cuts into them: then
+`cull` takes the share of the members that are past it out of the record (and out of its range)
+instead of killing the whole record or none of it.
+
+What is preserved, and what is not:
+- The population (the sum of weights) and the total wealth and contributions are conserved
+  exactly by a merge, and so are the mean and variance of age and wealth.
+- Traits are not averaged, which would shrink their spread: the merged record takes the traits
+  of one member, drawn with probability proportional to weight, so the trait distribution is
+  preserved in expectation (with a sampling error of about 1/sqrt(records) on its moments).
+- Within a record, the actual distribution of ages and wealth is replaced by an even one with
+  the same mean and variance, so deaths are spread over time as they would be, but not exactly
+  on the same days. Age and wealth are taken to be independent within a record.
+- Strategies see records, not people. The World makes up for it in recruitment, where role
+  models are resampled in proportion to their weights; other strategies have to look at
+  `PersonState.weight` (and kill people through `cull`) themselves.
+
+See the tests for the remaining error against the exact engine, which is within its own
+run-to-run noise.
+"""
+
+import math
+import typing
+
+import numpy as np
+import numpy.typing as npt
+import pydantic
+
+from orgsim import framework
+from orgsim.framework import events as events_
+
+T = typing.TypeVar("T", bound=pydantic.BaseModel)
+
+
+class PopulationCap(pydantic.BaseModel):
+    max_records: int = pydantic.Field(ge=1)
+    bins: int = pydantic.Field(default=16, ge=1)
+    seed: int = 0
+
+
+def _quantile_bins(values: npt.NDArray[np.float64], bins: int) -> npt.NDArray[np.int64]:
+    ranks = np.argsort(np.argsort(values, kind="stable"), kind="stable")
+    result: npt.NDArray[np.int64] = ranks * bins // len(values)
+    return result
+
+
+def _age_variance(spread: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    # Ages are whole days: a record spread by t covers 2t + 1 of them.
+    result: npt.NDArray[np.float64] = spread * (spread + 1) / 3
+    return result
+
+
+def _age_spread(variance: float) -> float:
+    return (math.sqrt(1 + 12 * variance) - 1) / 2
+
+
+def merge_people(
+    people: typing.Mapping[str, framework.PersonState[T]],
+    *,
+    cap: PopulationCap,
+    rng: np.random.Generator,
+) -> dict[str, framework.PersonState[T]]:
+    """Merge similar people until there are at most `cap.max_records` records.
+
+    The bins are made coarser, one quantile at a time, until there are few enough of them.
+    Records that are merged are replaced by a copy of one of them; `people` is left as it is.
+    """
+
+    if len(people) <= cap.max_records:
+        return dict(people)
+
+    states = list(people.values())
+    traits = [events_.flatten_traits(p.seed) for p in states]
+    columns = [
+        np.array([t[k] for t in traits], dtype=np.float64) for k in sorted(traits[0])
+    ]
+    ages = np.array([p.age for p in states], dtype=np.float64)
+    wealth = np.array([p.wealth for p in states], dtype=np.float64)
+    columns.append(ages)
+    columns.append(wealth)
+
+    # Age is the clock people die by, so people of different ages are only merged when there
+    # are more ages than records.
+    distinct_ages = len(np.unique(ages)) <= cap.max_records
+
+    bins = cap.bins
+    while True:
+        keys = np.stack(
+            [
+                ages.astype(np.int64)
+                if c is ages and distinct_ages
+                else _quantile_bins(c, bins)
+                for c in columns
+            ],
+            axis=1,
+        )
+        _, cells = np.unique(keys, axis=0, return_inverse=True)
+        cells = cells.reshape(-1)
+        n_cells = int(cells.max()) + 1
+        if n_cells <= cap.max_records or bins == 1:
+            break
+        bins -= 1
+
+    weights = np.array([p.weight for p in states])
+    age_variance = _age_variance(np.array([p.age_spread for p in states]))
+    wealth_variance = np.array([p.wealth_spread for p in states]) ** 2 / 3
+    result: dict[str, framework.PersonState[T]] = {}
+    order = np.argsort(cells, kind="stable")
+    for members in np.split(order, np.cumsum(np.bincount(cells))[:-1]):
+        if len(members) == 1:
+            p = states[members[0]]
+            result[p.identity] = p
+            continue
+
+        w = weights[members]
+        total = float(w.sum())
+        representative = states[int(rng.choice(members, p=w / total))].model_copy()
+        representative.weight = total
+        representative.contributions = float(
+            np.dot(w, [states[m].contributions for m in members]) / total
+        )
+
+        # Within and between the merged records.
+        mean_age = float(np.dot(w, ages[members]) / total)
+        variance = float(
+            np.dot(w, age_variance[members] + (ages[members] - mean_age) ** 2) / total
+        )
+        representative.age = int(round(mean_age))
+        representative.age_spread = min(
+            _age_spread(variance), float(representative.age)
+        )
+
+        mean_wealth = float(np.dot(w, wealth[members]) / total)
+        variance = float(
+            np.dot(w, wealth_variance[members] + (wealth[members] - mean_wealth) ** 2)
+            / total
+        )
+        representative.wealth = mean_wealth
+        representative.wealth_spread = min(
+            math.sqrt(3 * variance), max(mean_wealth, 0.0)
+        )
+        result[representative.identity] = representative
+
+    return result
+
+
+def resample_by_weight(
+    items: typing.Sequence[T],
+    weights: typing.Sequence[float],
+    *,
+    rng: np.random.Generator,
+    max_factor: int = 16,
+) -> list[T]:
+    """Systematic resample of `items` in proportion to `weights`, of about the total weight
+    (but at most `max_factor` times as many items), so that unweighted statistics over the
+    result match the weighted ones over `items`."""
+
+    w = np.asarray(weights, dtype=np.float64)
+    total = float(w.sum())
+    size = max(1, min(int(round(total)), max_factor * len(items)))
+    positions = (rng.random() + np.arange(size)) * (total / size)
+    indices = np.searchsorted(np.cumsum(w), positions, side="right")
+    return [items[i] for i in np.minimum(indices, len(items) - 1).tolist()]
+
+
+def cull(pstate: framework.PersonState[T], *, max_age: int) -> None:
+    """Take the members of a record who are past the age limit or out of wealth out of it.
+
+    Members die when they reach `max_age`, or when their wealth is no longer positive; what is
+    left of the record is the rest of its ranges, with its weight scaled down accordingly (to
+    0 if nobody is left). A record without spread lives or dies as a whole, like a person.
+    """
+
+    alive = 1.0
+
+    # Members take up one day of age each, from age - t to age + t.
+    width = 2 * pstate.age_spread + 1
+    oldest = pstate.age + pstate.age_spread
+    dying = min(max(oldest - max_age + 1, 0.0), width)
+    if dying > 0:
+        alive *= 1 - dying / width
+        youngest = pstate.age - pstate.age_spread
+        if alive > 0:
+            # The survivors are the youngest up to max_age - 1. Ages are whole numbers, so
+            # the range is off by half a day either way, which evens out from day to day.
+            pstate.age_spread = (max_age - 1 - youngest) / 2
+            pstate.age = int(round(youngest + pstate.age_spread))
+
+    low = pstate.wealth - pstate.wealth_spread
+    if low <= 0:
+        high = pstate.wealth + pstate.wealth_spread
+        if high <= 0:
+            alive = 0.0
+        else:
+            alive *= high / (high - low)
+            pstate.wealth = pstate.wealth_spread = high / 2
+
+    pstate.weight *= alive
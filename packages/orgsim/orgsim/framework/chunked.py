@@ -0,0 +1,303 @@
+"""Array-backed execution of a World, with the daily work split across a thread pool.
+
+People live in columns (one NumPy array per attribute) instead of `PersonState` objects. Every
+day the population is cut into contiguous chunks which are advanced concurrently on views of
+those columns: acting, salary, living cost, aging and death detection. Population-wide
+reductions are taken over the full columns at the day barrier, and all randomness comes from a
+`CounterRNG` addressed by (person, day), so the outcome does not depend on the chunk count.
+
+Unlike `World`, strategies see the population totals as of the start of the day, rather than
+the running totals left by whoever acted before them.
+"""
+
+import abc
+import concurrent.futures
+import typing
+
+import numpy as np
+import numpy.typing as npt
+import pydantic
+
+from orgsim import framework
+from orgsim.framework import rng as rng_
+
+T = typing.TypeVar("T", bound=pydantic.BaseModel)
+
+
+class Population:
+    def __init__(
+        self,
+        *,
+        ids: npt.NDArray[np.int64],
+        age: npt.NDArray[np.int64],
+        wealth: npt.NDArray[np.float64],
+        contributions: npt.NDArray[np.float64],
+        traits: dict[str, npt.NDArray[np.float64]],
+    ) -> None:
+        self.ids = ids
+        self.age = age
+        self.wealth = wealth
+        self.contributions = contributions
+        self.traits = traits
+
+    @classmethod
+    def from_traits(
+        cls,
+        *,
+        ids: npt.NDArray[np.int64],
+        traits: dict[str, npt.NDArray[np.float64]],
+        wealth: float,
+    ) -> typing.Self:
+        n = len(ids)
+        return cls(
+            ids=ids,
+            age=np.zeros(n, dtype=np.int64),
+            wealth=np.full(n, wealth, dtype=np.float64),
+            contributions=np.zeros(n, dtype=np.float64),
+            traits={k: np.asarray(v, dtype=np.float64) for k, v in traits.items()},
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def view(self, lo: int, hi: int) -> "Population":
+        return Population(
+            ids=self.ids[lo:hi],
+            age=self.age[lo:hi],
+            wealth=self.wealth[lo:hi],
+            contributions=self.contributions[lo:hi],
+            traits={k: v[lo:hi] for k, v in self.traits.items()},
+        )
+
+    def select(self, mask: npt.NDArray[np.bool_]) -> "Population":
+        return Population(
+            ids=self.ids[mask],
+            age=self.age[mask],
+            wealth=self.wealth[mask],
+            contributions=self.contributions[mask],
+            traits={k: v[mask] for k, v in self.traits.items()},
+        )
+
+    def extend(self, other: "Population") -> "Population":
+        return Population(
+            ids=np.concatenate([self.ids, other.ids]),
+            age=np.concatenate([self.age, other.age]),
+            wealth=np.concatenate([self.wealth, other.wealth]),
+            contributions=np.concatenate([self.contributions, other.contributions]),
+            traits={
+                k: np.concatenate([v, other.traits[k]]) for k, v in self.traits.items()
+            },
+        )
+
+
+class ChunkedWorldState(typing.Generic[T]):
+    def __init__(
+        self,
+        *,
+        seed: framework.WorldSeed[T],
+        population: Population,
+        total_reward: float,
+        time: framework.WorldTime,
+        next_id: int,
+    ) -> None:
+        self.seed = seed
+        self.population = population
+        self.total_reward = total_reward
+        self.total_contributions = 0.0
+        self.time = time
+        self.next_id = next_id
+
+
+class BatchWorldStrategy(abc.ABC, typing.Generic[T]):
+    @abc.abstractmethod
+    def person_act(
+        self,
+        *,
+        state: ChunkedWorldState[T],
+        population: Population,
+        rng: rng_.CounterRNG,
+    ) -> npt.NDArray[np.float64]:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def distribute_rewards(self, *, state: ChunkedWorldState[T]) -> None:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def generate_recruits(
+        self,
+        *,
+        state: ChunkedWorldState[T],
+        ids: npt.NDArray[np.int64],
+        rng: rng_.CounterRNG,
+    ) -> dict[str, npt.NDArray[np.float64]]:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def on_end_of_period(self, *, state: ChunkedWorldState[T]) -> None:
+        raise NotImplementedError()
+
+    @framework.noop
+    def on_start_of_day(self, *, state: ChunkedWorldState[T]) -> None:
+        """Called before the chunks act, with the population as of the start of the day."""
+
+        pass
+
+
+class ChunkedWorld(typing.Generic[T]):
+    def __init__(
+        self,
+        *,
+        state: ChunkedWorldState[T],
+        strategy: BatchWorldStrategy[T],
+        rng: rng_.CounterRNG,
+        chunks: int = 1,
+        executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None,
+    ) -> None:
+        self._state = state
+        self._strategy = strategy
+        self._rng = rng
+        self._chunks = max(chunks, 1)
+        self._start_of_day = (
+            None
+            if framework.is_noop(strategy.on_start_of_day)
+            else strategy.on_start_of_day
+        )
+        self._owns_executor = executor is None and self._chunks > 1
+        self._executor = (
+            concurrent.futures.ThreadPoolExecutor(max_workers=self._chunks)
+            if self._owns_executor
+            else executor
+        )
+
+    @property
+    def state(self) -> ChunkedWorldState[T]:
+        return self._state
+
+    def close(self) -> None:
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def is_empty(self) -> bool:
+        return len(self._state.population) == 0
+
+    def run_period(self) -> None:
+        for _ in range(self._state.seed.fiscal_length):
+            if self.is_empty():
+                return
+            self.run_day()
+
+        if self.is_empty():
+            return
+
+        self._strategy.distribute_rewards(state=self._state)
+        self._recruit_people()
+        self._strategy.on_end_of_period(state=self._state)
+
+        self._state.time.fiscal_period += 1
+
+    def run_day(self) -> None:
+        s = self._state
+        n = len(s.population)
+        s.total_contributions = float(s.population.contributions.sum())
+        if self._start_of_day is not None:
+            self._start_of_day(state=s)
+
+        contributions = np.empty(n, dtype=np.float64)
+        dead = np.empty(n, dtype=np.bool_)
+        bounds = np.linspace(0, n, min(self._chunks, n) + 1).astype(np.int64)
+        chunks = list(zip(bounds[:-1], bounds[1:]))
+
+        if self._executor is None or len(chunks) == 1:
+            for lo, hi in chunks:
+                self._run_chunk(int(lo), int(hi), contributions, dead)
+        else:
+            futures = [
+                self._executor.submit(
+                    self._run_chunk, int(lo), int(hi), contributions, dead
+                )
+                for lo, hi in chunks
+            ]
+            for f in futures:
+                f.result()
+
+        s.total_reward += (
+            float(contributions.sum()) * s.seed.productivity * s.seed.daily_salary
+        )
+        if dead.any():
+            s.population = s.population.select(~dead)
+        s.time.date += 1
+
+    def _run_chunk(
+        self,
+        lo: int,
+        hi: int,
+        contributions: npt.NDArray[np.float64],
+        dead: npt.NDArray[np.bool_],
+    ) -> None:
+        seed = self._state.seed
+        chunk = self._state.population.view(lo, hi)
+
+        contribution = self._strategy.person_act(
+            state=self._state, population=chunk, rng=self._rng
+        )
+        chunk.wealth += seed.daily_salary
+        chunk.contributions += contribution
+        contributions[lo:hi] = contribution
+
+        chunk.age += 1
+        old = chunk.age == seed.max_age
+        chunk.wealth -= np.where(old, 0.0, seed.daily_living_cost)
+        dead[lo:hi] = old | (chunk.wealth <= 0)
+
+    def _recruit_people(self) -> None:
+        s = self._state
+        ids = np.arange(
+            s.next_id, s.next_id + s.seed.periodic_recruit_count, dtype=np.int64
+        )
+        traits = self._strategy.generate_recruits(state=s, ids=ids, rng=self._rng)
+        s.next_id += len(ids)
+        s.population = s.population.extend(
+            Population.from_traits(
+                ids=ids, traits=traits, wealth=s.seed.initial_individual_wealth
+            )
+        )
+
+
+def create_chunked_world(
+    *,
+    seed: framework.WorldSeed[T],
+    strategy: BatchWorldStrategy[T],
+    rng_seed: int,
+    chunks: int = 1,
+    executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None,
+) -> ChunkedWorld[T]:
+    people = [p.model_dump() for p in seed.initial_people]
+    fields = list(people[0].keys()) if people else []
+    state = ChunkedWorldState(
+        seed=seed,
+        population=Population.from_traits(
+            ids=np.arange(len(people), dtype=np.int64),
+            traits={
+                k: np.array([p[k] for p in people], dtype=np.float64) for k in fields
+            },
+            wealth=seed.initial_individual_wealth,
+        ),
+        total_reward=0,
+        time=framework.WorldTime(date=0, fiscal_period=0),
+        next_id=len(people),
+    )
+    return ChunkedWorld(
+        state=state,
+        strategy=strategy,
+        rng=rng_.CounterRNG(rng_seed),
+        chunks=chunks,
+        executor=executor,
+    )
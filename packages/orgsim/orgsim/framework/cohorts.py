@@ -0,0 +1,48 @@
+"""Exact execution of a World in which many people are the same person.
+
+People with the same seed, age, wealth and contributions are in the same state, and a strategy
+that treats such people alike keeps them in the same state: they act alike, are paid alike and
+die on the same day. A World with cohorts keeps a single `PersonState` for each group of them,
+whose `weight` counts its members, and the strategy treats the record as that many people.
+
+This is only exact for strategies that say so with a `WorldStrategy.cohort_key`, and the World
+refuses the others rather than approximate them. Members of a cohort never diverge under such a
+strategy, so cohorts never have to be split. Strategies that draw random numbers per person,
+read the totals of the day as they run (`StrategicSelfishness`) or rank people with a cut that
+can fall within a cohort (`AverageOfTopContributors`) have no key.
+
+Recruitment sees the members one by one: the World repeats every role model by its weight
+before handing their seeds to the strategy.
+"""
+
+import typing
+
+import pydantic
+
+from orgsim import framework
+
+T = typing.TypeVar("T", bound=pydantic.BaseModel)
+
+
+def merge_identical(
+    people: typing.Mapping[str, framework.PersonState[T]],
+) -> dict[str, framework.PersonState[T]]:
+    """Merge people whose states are identical into the first of them (in iteration order)."""
+
+    result: dict[str, framework.PersonState[T]] = {}
+    cohort_of: dict[typing.Hashable, framework.PersonState[T]] = {}
+    for p in people.values():
+        key = (p.seed, p.age, p.wealth, p.contributions)
+        cohort = cohort_of.get(key)
+        if cohort is None:
+            cohort_of[key] = p
+            result[p.identity] = p
+        else:
+            cohort.weight += p.weight
+    return result
+
+
+def expand(people: typing.Iterable[framework.PersonState[T]]) -> list[T]:
+    """The seeds of every member of `people`, in order."""
+
+    return [p.seed for p in people for _ in range(int(p.weight))]
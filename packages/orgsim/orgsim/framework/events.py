@@ -0,0 +1,249 @@
+"""Compact, binary record of everything that changes the composition of a world.
+
+Instead of dense per-day, per-person series, an engine can append a few fixed-size records per
+state-changing event: births (with the traits of the newcomer), deaths (with their cause),
+period rewards and period ends. Together with the seed and the RNG state captured when the world
+was created, this is enough to replay the run deterministically, so any metric can be
+regenerated later by replaying with the needed instrumentation. Simple aggregates (population,
+births and deaths per period) are computed from the log directly.
+"""
+
+import enum
+import json
+import typing
+
+import numpy as np
+import numpy.typing as npt
+import pydantic
+
+FORMAT_VERSION = 1
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("kind", np.uint8),
+        ("cause", np.uint8),
+        ("date", np.uint32),
+        ("period", np.uint32),
+        ("person", np.uint32),
+        ("value", np.float64),
+    ]
+)
+
+# Records that are not about a person.
+NOBODY = 0xFFFFFFFF
+
+
+class Kind(enum.IntEnum):
+    BIRTH = 0
+    DEATH = 1
+    REWARD = 2
+    PERIOD_END = 3
+
+
+class Cause(enum.IntEnum):
+    NONE = 0
+    AGE = 1
+    WEALTH = 2
+    SUICIDE = 3
+    KILLED = 4
+
+
+def flatten_traits(model: pydantic.BaseModel) -> dict[str, float]:
+    """The numeric fields of a model (nested ones joined with dots), as stored for births."""
+
+    result: dict[str, float] = {}
+
+    def visit(prefix: str, value: typing.Any) -> None:
+        if isinstance(value, dict):
+            for k, v in value.items():
+                visit(f"{prefix}{k}.", v)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            result[prefix[:-1]] = float(value)
+
+    visit("", model.model_dump())
+    return result
+
+
+class EventLog:
+    def __init__(self, initial_capacity: int = 1024) -> None:
+        self.header: dict[str, typing.Any] = {}
+        self._rng_keys: typing.Optional[npt.NDArray[np.uint32]] = None
+        self._records = np.zeros(initial_capacity, dtype=RECORD_DTYPE)
+        self._size = 0
+        self._identities: list[str] = []
+        self._numbers: dict[str, int] = {}
+        self._traits: dict[str, list[float]] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def records(self) -> npt.NDArray[np.void]:
+        return self._records[: self._size]
+
+    @property
+    def identities(self) -> list[str]:
+        return self._identities
+
+    @property
+    def traits(self) -> dict[str, npt.NDArray[np.float64]]:
+        """Trait columns, indexed by person number (the `person` field of the records)."""
+
+        n = len(self._identities)
+        return {
+            k: np.array(v + [np.nan] * (n - len(v))) for k, v in self._traits.items()
+        }
+
+    def begin(
+        self,
+        *,
+        engine: str,
+        seed: pydantic.BaseModel,
+        rng_state: typing.Optional[tuple[typing.Any, ...]] = None,
+    ) -> None:
+        """Store what a replay starts from: the seed and the state of the global NumPy RNG."""
+
+        name, keys, pos, has_gauss, cached_gaussian = (
+            rng_state if rng_state is not None else np.random.get_state()
+        )
+        self._rng_keys = np.asarray(keys, dtype=np.uint32).copy()
+        self.header = {
+            "format": FORMAT_VERSION,
+            "engine": engine,
+            "seed": seed.model_dump_json(),
+            "rng": {
+                "name": name,
+                "pos": int(pos),
+                "has_gauss": int(has_gauss),
+                "cached_gaussian": float(cached_gaussian),
+            },
+        }
+
+    def rng_state(self) -> tuple[typing.Any, ...]:
+        """The global NumPy RNG state at `begin`, as accepted by `np.random.set_state`."""
+
+        if self._rng_keys is None:
+            raise Exception("The event log has not been started")
+        rng = self.header["rng"]
+        return (
+            rng["name"],
+            self._rng_keys,
+            rng["pos"],
+            rng["has_gauss"],
+            rng["cached_gaussian"],
+        )
+
+    def birth(
+        self,
+        *,
+        date: int,
+        period: int,
+        identity: str,
+        traits: typing.Mapping[str, float],
+    ) -> None:
+        person = len(self._identities)
+        self._identities.append(identity)
+        self._numbers[identity] = person
+        for k, v in traits.items():
+            column = self._traits.setdefault(k, [])
+            column.extend([np.nan] * (person - len(column)))
+            column.append(v)
+        self._append(Kind.BIRTH, Cause.NONE, date, period, person, 0.0)
+
+    def death(self, *, date: int, period: int, identity: str, cause: Cause) -> None:
+        self._append(Kind.DEATH, cause, date, period, self._numbers[identity], 0.0)
+
+    def reward(self, *, date: int, period: int, value: float) -> None:
+        self._append(Kind.REWARD, Cause.NONE, date, period, NOBODY, value)
+
+    def period_end(self, *, date: int, period: int, population: int) -> None:
+        self._append(Kind.PERIOD_END, Cause.NONE, date, period, NOBODY, population)
+
+    def _append(
+        self,
+        kind: Kind,
+        cause: Cause,
+        date: int,
+        period: int,
+        person: int,
+        value: float,
+    ) -> None:
+        if self._size == len(self._records):
+            grown = np.zeros(max(2 * self._size, 1), dtype=RECORD_DTYPE)
+            grown[: self._size] = self._records
+            self._records = grown
+        self._records[self._size] = (kind, cause, date, period, person, value)
+        self._size += 1
+
+    def count_per_period(
+        self, kind: Kind, cause: typing.Optional[Cause] = None
+    ) -> npt.NDArray[np.int64]:
+        """Number of events of a kind (and cause) in every period."""
+
+        records = self.records
+        mask = records["kind"] == kind
+        if cause is not None:
+            mask &= records["cause"] == cause
+        return np.bincount(
+            records["period"][mask].astype(np.int64), minlength=self.n_periods()
+        )
+
+    def population(self) -> npt.NDArray[np.int64]:
+        """Population at the end of every period, after recruitment."""
+
+        return np.cumsum(
+            self.count_per_period(Kind.BIRTH) - self.count_per_period(Kind.DEATH)
+        )
+
+    def n_periods(self) -> int:
+        records = self.records
+        if len(records) == 0:
+            return 0
+        return int(records["period"].max()) + 1
+
+    def completed_periods(self) -> int:
+        return int(np.count_nonzero(self.records["kind"] == Kind.PERIOD_END))
+
+    def equals(self, other: "EventLog") -> bool:
+        """Whether two logs describe the same run (e.g. a replay and its original)."""
+
+        return (
+            len(self) == len(other)
+            and self._identities == other._identities
+            and bool(np.all(self.records == other.records))
+        )
+
+    def save(self, file: typing.Any) -> None:
+        """Write the log as a compressed `.npz` archive (`file` is a path or a binary file)."""
+
+        if self._rng_keys is None:
+            raise Exception("The event log has not been started")
+        arrays: dict[str, typing.Any] = {
+            "header": np.frombuffer(json.dumps(self.header).encode(), dtype=np.uint8),
+            "rng_keys": self._rng_keys,
+            "records": self.records,
+            "identities": np.array(self._identities, dtype=np.str_),
+        }
+        arrays.update({f"trait:{k}": v for k, v in self.traits.items()})
+        np.savez_compressed(file, **arrays)
+
+    @classmethod
+    def load(cls, file: typing.Any) -> "EventLog":
+        with np.load(file) as archive:
+            header = json.loads(archive["header"].tobytes().decode())
+            if header.get("format") != FORMAT_VERSION:
+                raise Exception(f"Unsupported event log format: {header.get('format')}")
+
+            log = cls(initial_capacity=max(len(archive["records"]), 1))
+            log.header = header
+            log._rng_keys = archive["rng_keys"]
+            log._records[: len(archive["records"])] = archive["records"]
+            log._size = len(archive["records"])
+            log._identities = archive["identities"].tolist()
+            log._numbers = {i: n for n, i in enumerate(log._identities)}
+            log._traits = {
+                k.removeprefix("trait:"): archive[k].tolist()
+                for k in archive.files
+                if k.startswith("trait:")
+            }
+        return log
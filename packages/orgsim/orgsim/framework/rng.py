@@ -0,0 +1,88 @@
+import numpy as np
+import numpy.typing as npt
+
+_M0 = np.uint64(0xD2511F53)
+_M1 = np.uint64(0xCD9E8D57)
+_W0 = np.uint32(0x9E3779B9)
+_W1 = np.uint32(0xBB67AE85)
+_MASK = np.uint64(0xFFFFFFFF)
+_SHIFT = np.uint64(32)
+
+
+def philox4x32(
+    counter: npt.NDArray[np.uint32], key: tuple[int, int], rounds: int = 10
+) -> npt.NDArray[np.uint32]:
+    """Philox-4x32 (Salmon et al., 2011) over a (4, N) array of counters.
+
+    Every column is an independent counter, so the output for one column never depends on how
+    many other columns are evaluated alongside it.
+    """
+
+    c0, c1, c2, c3 = (counter[i].astype(np.uint64) for i in range(4))
+    k0 = np.uint32(key[0] & 0xFFFFFFFF)
+    k1 = np.uint32(key[1] & 0xFFFFFFFF)
+    with np.errstate(over="ignore"):
+        for i in range(rounds):
+            if i > 0:
+                k0 = k0 + _W0
+                k1 = k1 + _W1
+            p0 = _M0 * c0
+            p1 = _M1 * c2
+            c0, c1, c2, c3 = (
+                (p1 >> _SHIFT) ^ c1 ^ np.uint64(k0),
+                p1 & _MASK,
+                (p0 >> _SHIFT) ^ c3 ^ np.uint64(k1),
+                p0 & _MASK,
+            )
+    return np.stack([c0, c1, c2, c3]).astype(np.uint32)
+
+
+class CounterRNG:
+    """Random numbers addressed by (person, day, stream) instead of drawn from a running state.
+
+    The same address always yields the same value, which keeps results independent of the order
+    (and the chunking) in which people are evaluated.
+    """
+
+    def __init__(self, seed: int) -> None:
+        self._key = (seed & 0xFFFFFFFF, (seed >> 32) & 0xFFFFFFFF)
+
+    def bits(
+        self, *, ids: npt.NDArray[np.int64], day: int, stream: int = 0
+    ) -> npt.NDArray[np.uint32]:
+        uids = ids.astype(np.uint64)
+        counter = np.empty((4, len(ids)), dtype=np.uint32)
+        counter[0] = uids & _MASK
+        counter[1] = uids >> _SHIFT
+        counter[2] = day
+        counter[3] = stream
+        return philox4x32(counter, self._key)
+
+    def uniform(
+        self, *, ids: npt.NDArray[np.int64], day: int, stream: int = 0
+    ) -> npt.NDArray[np.float64]:
+        b = self.bits(ids=ids, day=day, stream=stream)
+        return _to_unit(b[0], b[1])
+
+    def normal(
+        self,
+        *,
+        ids: npt.NDArray[np.int64],
+        day: int,
+        stream: int = 0,
+        loc: float = 0.0,
+        scale: float = 1.0,
+    ) -> npt.NDArray[np.float64]:
+        b = self.bits(ids=ids, day=day, stream=stream)
+        u1 = 1.0 - _to_unit(b[0], b[1])
+        u2 = _to_unit(b[2], b[3])
+        z = np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+        return loc + scale * z
+
+
+def _to_unit(
+    a: npt.NDArray[np.uint32], b: npt.NDArray[np.uint32]
+) -> npt.NDArray[np.float64]:
+    hi = (a >> np.uint32(5)).astype(np.float64)
+    lo = (b >> np.uint32(6)).astype(np.float64)
+    return (hi * 67108864.0 + lo) / 9007199254740992.0
@@ -0,0 +1,196 @@
+"""Successive halving of sweep configurations: bad ones are dropped early.
+
+Every configuration is first run for `min_periods`, then they are ranked on an outcome and only
+the best `keep` fraction of them goes on, for `growth` times as many periods, and so on until
+the experiment's full horizon. Extinct configurations always rank last.
+
+Worlds are not re-simulated from the start at every rung: each one lives in a worker process
+for as long as it is in the running, along with its state of the global NumPy RNG (which the
+strategies draw from), and is resumed from where it stopped. A configuration that runs to the
+end therefore ends up exactly where `sweep.run_point` would have. Configurations stay in the
+worker they started in, so the workers can end up unevenly loaded in the later rungs, which
+are run by few configurations anyway.
+"""
+
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import traceback
+import typing
+
+import numpy as np
+import pydantic
+
+from orgsim import framework, sweep
+
+
+class HalvingPolicy(pydantic.BaseModel):
+    outcome: str = "final_population"
+    maximize: bool = True
+    min_periods: int = pydantic.Field(default=20, ge=1)
+    keep: float = pydantic.Field(default=0.5, gt=0, lt=1)
+    growth: float = pydantic.Field(default=2.0, gt=1)
+
+    @pydantic.model_validator(mode="after")
+    def _check(self) -> typing.Self:
+        if self.outcome not in sweep.OUTCOMES:
+            raise ValueError(f"Unknown outcome: {self.outcome}")
+        return self
+
+    def budgets(self, periods: int) -> list[int]:
+        """The number of periods every rung runs up to."""
+
+        result = [min(self.min_periods, periods)]
+        while result[-1] < periods:
+            result.append(min(math.ceil(result[-1] * self.growth), periods))
+        return result
+
+    def rank(self, outcomes: typing.Sequence[typing.Mapping[str, float]]) -> list[int]:
+        """The indices of `outcomes`, best first."""
+
+        def key(i: int) -> tuple[float, float]:
+            value = outcomes[i][self.outcome]
+            if math.isnan(value):
+                value = math.inf
+            elif self.maximize:
+                value = -value
+            return outcomes[i]["extinct"], value
+
+        return sorted(range(len(outcomes)), key=key)
+
+
+class HalvingPoint(pydantic.BaseModel):
+    params: dict[str, float]
+    rung: int
+    periods: int
+    outcomes: dict[str, float]
+
+
+class _Run:
+    """A configuration's world, kept between rungs."""
+
+    def __init__(
+        self,
+        experiment: sweep.ExperimentSpec,
+        params: typing.Mapping[str, float],
+        rng_seed: int,
+    ) -> None:
+        self._strategy = experiment.strategy.build()
+        np.random.seed(rng_seed)
+        self._world = framework.create_world(
+            seed=experiment.world_seed(params, rng_seed), strategy=self._strategy
+        )
+        self._rng_state = np.random.get_state()
+        self._periods = 0
+
+    def advance(self, periods: int) -> dict[str, float]:
+        """Run up to `periods` periods in total, and reduce the run so far to its outcomes."""
+
+        np.random.set_state(self._rng_state)
+        while self._periods < periods and not self._world.is_empty():
+            self._world.run_period()
+            self._periods += 1
+        self._rng_state = np.random.get_state()
+        return sweep.outcomes_of(self._strategy.metrics.data, periods)
+
+
+# Seconds a worker gets to exit once it is told to.
+JOIN_TIMEOUT = 10.0
+
+
+def _worker(
+    connection: multiprocessing.connection.Connection, raw: str, rng_seed: int
+) -> None:
+    experiment = sweep.ExperimentSpec.model_validate_json(raw)
+    runs: dict[int, _Run] = {}
+    while (message := connection.recv()) is not None:
+        periods, jobs = message
+        try:
+            # Configurations that are not in the jobs any more have been dropped.
+            runs = {
+                i: runs[i] if i in runs else _Run(experiment, params, rng_seed)
+                for i, params in jobs
+            }
+            connection.send((True, {i: r.advance(periods) for i, r in runs.items()}))
+        except BaseException:
+            connection.send((False, traceback.format_exc()))
+
+
+def run_halving(
+    experiment: sweep.ExperimentSpec,
+    configurations: typing.Sequence[typing.Mapping[str, float]],
+    *,
+    policy: HalvingPolicy,
+    rng_seed: int = 0,
+    max_workers: typing.Optional[int] = None,
+) -> list[HalvingPoint]:
+    """Run `configurations` of `experiment` by successive halving, on worker processes.
+
+    Every configuration is reported as of the last rung it ran in, and all of them use the RNG
+    seed `rng_seed`, so they are compared on the same random numbers.
+    """
+
+    raw = experiment.model_dump_json()
+    params = [dict(c) for c in configurations]
+    n_workers = min(
+        max_workers if max_workers is not None else (os.cpu_count() or 1),
+        max(1, len(params)),
+    )
+
+    connections = []
+    workers = []
+    for _ in range(n_workers):
+        parent, child = multiprocessing.Pipe()
+        worker = multiprocessing.Process(
+            target=_worker, args=(child, raw, rng_seed), daemon=True
+        )
+        worker.start()
+        child.close()
+        connections.append(parent)
+        workers.append(worker)
+
+    points: dict[int, HalvingPoint] = {}
+    done = False
+    try:
+        alive = list(range(len(params)))
+        budgets = policy.budgets(experiment.periods)
+        for rung, periods in enumerate(budgets):
+            # Configuration i lives in worker i % n_workers for as long as it is alive.
+            for k, connection in enumerate(connections):
+                jobs = [(i, params[i]) for i in alive if i % n_workers == k]
+                connection.send((periods, jobs))
+            outcomes: dict[int, dict[str, float]] = {}
+            for connection in connections:
+                ok, value = connection.recv()
+                if not ok:
+                    raise Exception(f"Halving worker failed:\n{value}")
+                outcomes.update(value)
+
+            for i in alive:
+                points[i] = HalvingPoint(
+                    params=params[i], rung=rung, periods=periods, outcomes=outcomes[i]
+                )
+            if rung + 1 < len(budgets):
+                ranked = policy.rank([outcomes[i] for i in alive])
+                survivors = max(1, math.ceil(policy.keep * len(alive)))
+                alive = sorted(alive[j] for j in ranked[:survivors])
+        done = True
+    finally:
+        for connection in connections:
+            try:
+                connection.send(None)
+            except OSError:
+                # The worker is gone already (BrokenPipeError is an OSError).
+                pass
+            connection.close()
+        for worker in workers:
+            # After a failure, the other workers may still be busy with their rung.
+            if not done:
+                worker.terminate()
+            worker.join(timeout=JOIN_TIMEOUT)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+
+    return [points[i] for i in range(len(params))]
@@ -0,0 +1,454 @@
+"""Per-period history of a world's population, with random access to any recorded period.
+
+A history lives in a directory:
+- `frames.bin` is a memory-mapped table of keyframes, recorded every `keyframe_interval`
+  periods: one row per person alive at that period, holding the numeric fields of the person
+  (e.g. age, wealth).
+- `deltas.bin` is a memory-mapped table of the field values that changed in the periods in
+  between, one row per (person, field).
+- `state.json` holds the part of the state that is neither people nor scalars (e.g. the seed),
+  which is stored once.
+- `index.jsonl` has a header line, then one line per period, appended as soon as the period is
+  recorded: its row range in one of the tables, its scalar state (e.g. the date) and the
+  membership changes since the previous period (people who joined, with their full data at
+  that time, and people who left).
+
+The state at any period is rebuilt from the closest keyframe at or before it by applying at most
+`keyframe_interval` periods of deltas, and one field over a range of periods is read the same
+way, without building any state.
+"""
+
+import abc
+import bisect
+import os
+import pathlib
+import tempfile
+import typing
+
+import numpy as np
+import numpy.typing as npt
+import pydantic
+
+from orgsim import framework
+
+S = typing.TypeVar("S", bound=pydantic.BaseModel)
+P = typing.TypeVar("P", bound=pydantic.BaseModel)
+T = typing.TypeVar("T", bound=pydantic.BaseModel)
+
+FORMAT_VERSION = 2
+
+
+def _get(obj: typing.Any, path: str) -> typing.Any:
+    for name in path.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _set(obj: typing.Any, path: str, value: typing.Any) -> None:
+    *parents, name = path.split(".")
+    for p in parents:
+        obj = getattr(obj, p)
+    setattr(obj, name, value)
+
+
+class HistoryAdapter(abc.ABC, typing.Generic[S, P]):
+    """Describes how the state of an engine is split into what a history stores.
+
+    `fields` are numeric attributes of a person (dotted paths) stored every period,
+    `scalars` are attributes of the state (dotted paths) stored every period, and `period` is
+    the scalar that numbers the periods. Everything else about a person is stored when they
+    join, and everything else about the state when the first period is recorded, so neither
+    may change over time.
+    """
+
+    fields: typing.ClassVar[tuple[str, ...]]
+    scalars: typing.ClassVar[tuple[str, ...]]
+    period: typing.ClassVar[str]
+
+    @abc.abstractmethod
+    def people(self, state: S) -> dict[str, P]:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def load_state(self, raw: str) -> S:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def load_person(self, raw: str) -> P:
+        raise NotImplementedError()
+
+
+class WorldStateAdapter(
+    HistoryAdapter[framework.WorldState[T], framework.PersonState[T]]
+):
+    fields = (
+        "age",
+        "wealth",
+        "contributions",
+        "weight",
+        "wealth_spread",
+        "age_spread",
+    )
+    scalars = ("time.date", "time.fiscal_period", "total_reward")
+    period = "time.fiscal_period"
+
+    def __init__(self, seed_type: type[T]) -> None:
+        self._seed_type = seed_type
+
+    def people(
+        self, state: framework.WorldState[T]
+    ) -> dict[str, framework.PersonState[T]]:
+        return state.people_states
+
+    def load_state(self, raw: str) -> framework.WorldState[T]:
+        return framework.WorldState[self._seed_type].model_validate_json(raw)  # type: ignore[name-defined]
+
+    def load_person(self, raw: str) -> framework.PersonState[T]:
+        return framework.PersonState[self._seed_type].model_validate_json(raw)  # type: ignore[name-defined]
+
+
+class FieldRange(typing.NamedTuple):
+    """The values of one field, one entry per person per period."""
+
+    periods: npt.NDArray[np.int64]
+    identities: npt.NDArray[np.str_]
+    values: npt.NDArray[np.float64]
+
+
+class _Header(pydantic.BaseModel):
+    format: int
+    fields: list[str]
+    scalars: list[str]
+    keyframe_interval: int
+
+
+class _Period(pydantic.BaseModel):
+    period: int
+    # The rows of the period in frames.bin if it is a keyframe, in deltas.bin otherwise.
+    start: int
+    stop: int
+    scalars: list[typing.Any]
+    joined: dict[str, str]
+    left: list[str]
+
+
+class _Table:
+    """An append-only table in a memory-mapped file, which grows as needed."""
+
+    def __init__(
+        self, path: pathlib.Path, dtype: np.dtype[np.void], size: int, capacity: int
+    ) -> None:
+        self._path = path
+        self._dtype = dtype
+        self.size = size
+        path.touch()
+        self.rows = self._map(max(size, capacity, 1))
+
+    def _map(self, capacity: int) -> np.memmap[typing.Any, np.dtype[np.void]]:
+        size = capacity * self._dtype.itemsize
+        if self._path.stat().st_size < size:
+            with open(self._path, "r+b") as f:
+                f.truncate(size)
+        return np.memmap(self._path, dtype=self._dtype, mode="r+", shape=(capacity,))
+
+    def append(
+        self, count: int
+    ) -> tuple[int, np.ndarray[typing.Any, np.dtype[np.void]]]:
+        """Make room for `count` rows at the end; returns where they start, and the rows."""
+
+        start = self.size
+        self.size += count
+        if self.size > len(self.rows):
+            self.rows.flush()
+            self.rows = self._map(max(self.size, 2 * len(self.rows)))
+        return start, self.rows[start : self.size]
+
+
+class History(typing.Generic[S, P]):
+    def __init__(
+        self,
+        *,
+        directory: str | pathlib.Path,
+        adapter: HistoryAdapter[S, P],
+        keyframe_interval: int = 10,
+        capacity: int = 1 << 12,
+    ) -> None:
+        """Open the history in `directory`, creating it if it does not exist yet."""
+
+        self._root = pathlib.Path(directory)
+        self._adapter = adapter
+        self._fields = list(adapter.fields)
+
+        periods: list[_Period] = []
+        index_path = self._root / "index.jsonl"
+        if index_path.exists():
+            self._header, periods = self._read_index(index_path)
+            if self._header.fields != self._fields:
+                raise Exception(
+                    f"The history stores {self._header.fields}, not {adapter.fields}"
+                )
+        else:
+            if keyframe_interval < 1:
+                raise Exception("The keyframe interval has to be at least 1")
+            self._root.mkdir(parents=True, exist_ok=True)
+            self._header = _Header(
+                format=FORMAT_VERSION,
+                fields=self._fields,
+                scalars=list(adapter.scalars),
+                keyframe_interval=keyframe_interval,
+            )
+            self._write(index_path, self._header.model_dump_json() + "\n")
+
+        state_path = self._root / "state.json"
+        self._base = state_path.read_text() if state_path.exists() else None
+
+        # Everybody who ever joined, by number, with their data as of when they last did.
+        self._identities: list[str] = []
+        self._numbers: dict[str, int] = {}
+        self._people: list[str] = []
+        self._periods: list[_Period] = []
+        for p in periods:
+            self._join(p.joined)
+            self._periods.append(p)
+
+        sizes = [0, 0]
+        for n, p in enumerate(self._periods):
+            sizes[self._is_keyframe(n)] = p.stop
+        self._deltas = _Table(
+            self._root / "deltas.bin",
+            np.dtype(
+                [("person", np.uint32), ("field", np.uint16), ("value", np.float64)]
+            ),
+            sizes[False],
+            capacity,
+        )
+        self._frames = _Table(
+            self._root / "frames.bin",
+            np.dtype([("person", np.uint32)] + [(f, np.float64) for f in self._fields]),
+            sizes[True],
+            capacity,
+        )
+
+        # The people alive at the last recorded period, in order, and everybody's fields then.
+        self._alive: dict[int, None] = {}
+        self._values = np.zeros((0, len(self._fields)))
+        if self._periods:
+            self._alive, self._values = self._replay(len(self._periods) - 1)
+
+    def __len__(self) -> int:
+        return len(self._periods)
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.flush()
+
+    @property
+    def keyframe_interval(self) -> int:
+        return self._header.keyframe_interval
+
+    def periods(self) -> list[int]:
+        return [p.period for p in self._periods]
+
+    def _is_keyframe(self, n: int) -> bool:
+        return n % self._header.keyframe_interval == 0
+
+    def _join(self, joined: typing.Mapping[str, str]) -> None:
+        for i, raw in joined.items():
+            if i in self._numbers:
+                self._people[self._numbers[i]] = raw
+            else:
+                self._numbers[i] = len(self._identities)
+                self._identities.append(i)
+                self._people.append(raw)
+
+    def record(self, state: S) -> None:
+        """Append the state at the end of a period. Periods have to be recorded in order."""
+
+        period = int(_get(state, self._adapter.period))
+        if self._periods and period <= self._periods[-1].period:
+            raise Exception(f"Period {period} has already been recorded")
+        if self._base is None:
+            base = self._adapter.load_state(state.model_dump_json())
+            self._adapter.people(base).clear()
+            self._base = base.model_dump_json()
+            self._write(self._root / "state.json", self._base)
+
+        people = self._adapter.people(state)
+        joined = {
+            i: p.model_dump_json()
+            for i, p in people.items()
+            if self._numbers.get(i) not in self._alive
+        }
+        self._join(joined)
+        numbers = np.array([self._numbers[i] for i in people], dtype=np.int64)
+        left = sorted(
+            self._identities[m] for m in self._alive.keys() - set(numbers.tolist())
+        )
+        values = np.array(
+            [[_get(p, f) for f in self._fields] for p in people.values()],
+            dtype=np.float64,
+        ).reshape(len(people), len(self._fields))
+
+        if len(self._values) < len(self._identities):
+            grown = np.full(
+                (max(len(self._identities), 2 * len(self._values)), len(self._fields)),
+                np.nan,
+            )
+            grown[: len(self._values)] = self._values
+            self._values = grown
+        # People who join have no previous values, whatever they had when they last left.
+        self._values[[self._numbers[i] for i in joined]] = np.nan
+
+        n = len(self._periods)
+        if self._is_keyframe(n):
+            table = self._frames
+            start, rows = table.append(len(people))
+            rows["person"] = numbers
+            for f, column in zip(self._fields, values.T):
+                rows[f] = column
+        else:
+            table = self._deltas
+            who, which = np.nonzero(self._values[numbers] != values)
+            start, rows = table.append(len(who))
+            rows["person"] = numbers[who]
+            rows["field"] = which
+            rows["value"] = values[who, which]
+        self._values[numbers] = values
+        self._alive = dict.fromkeys(numbers.tolist())
+
+        p = _Period(
+            period=period,
+            start=start,
+            stop=table.size,
+            scalars=[_get(state, s) for s in self._adapter.scalars],
+            joined=joined,
+            left=left,
+        )
+        # The rows go to disk before the period that points at them.
+        table.rows.flush()
+        with open(self._root / "index.jsonl", "a") as index:
+            index.write(p.model_dump_json() + "\n")
+        self._periods.append(p)
+
+    def flush(self) -> None:
+        self._frames.rows.flush()
+        self._deltas.rows.flush()
+
+    @staticmethod
+    def _read_index(path: pathlib.Path) -> tuple[_Header, list[_Period]]:
+        content = path.read_bytes()
+        complete = content[: content.rfind(b"\n") + 1]
+        if len(complete) < len(content):
+            # A period whose line was cut short was never recorded.
+            with open(path, "r+b") as f:
+                f.truncate(len(complete))
+        header, *lines = complete.decode().splitlines()
+        return (
+            _Header.model_validate_json(header),
+            [_Period.model_validate_json(line) for line in lines],
+        )
+
+    def _write(self, path: pathlib.Path, content: str) -> None:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode="w") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        except BaseException:
+            pathlib.Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _position(self, period: int) -> int:
+        periods = self.periods()
+        n = bisect.bisect_left(periods, period)
+        if n == len(periods) or periods[n] != period:
+            raise Exception(f"Period {period} has not been recorded")
+        return n
+
+    def _step(
+        self, n: int, alive: dict[int, None], values: npt.NDArray[np.float64]
+    ) -> None:
+        """Move `alive` and `values` from the period before the `n`th one to it."""
+
+        p = self._periods[n]
+        if self._is_keyframe(n):
+            frame = self._frames.rows[p.start : p.stop]
+            alive.clear()
+            alive.update(dict.fromkeys(frame["person"].tolist()))
+            for j, f in enumerate(self._fields):
+                values[frame["person"], j] = frame[f]
+            return
+
+        for i in p.left:
+            del alive[self._numbers[i]]
+        for i in p.joined:
+            alive[self._numbers[i]] = None
+        deltas = self._deltas.rows[p.start : p.stop]
+        values[deltas["person"], deltas["field"]] = deltas["value"]
+
+    def _replay(self, n: int) -> tuple[dict[int, None], npt.NDArray[np.float64]]:
+        """The people alive at the `n`th period, and everybody's fields then."""
+
+        alive: dict[int, None] = {}
+        values = np.full((len(self._identities), len(self._fields)), np.nan)
+        for m in range(n - n % self._header.keyframe_interval, n + 1):
+            self._step(m, alive, values)
+        return alive, values
+
+    def state_at(self, period: int) -> S:
+        """Rebuild the state as it was recorded at the end of `period`."""
+
+        n = self._position(period)
+        alive, values = self._replay(n)
+        assert self._base is not None
+        state = self._adapter.load_state(self._base)
+        people = self._adapter.people(state)
+        for number in alive:
+            person = self._adapter.load_person(self._people[number])
+            for f, value in zip(self._fields, values[number].tolist()):
+                _set(person, f, type(_get(person, f))(value))
+            people[self._identities[number]] = person
+
+        for s, v in zip(self._adapter.scalars, self._periods[n].scalars):
+            _set(state, s, v)
+        return state
+
+    def field(
+        self, name: str, *, start: int, stop: typing.Optional[int] = None
+    ) -> FieldRange:
+        """One field of everybody over the recorded periods in [start, stop)."""
+
+        if name not in self._fields:
+            raise Exception(f"No such field: {name}")
+        j = self._fields.index(name)
+
+        periods = self.periods()
+        lo = bisect.bisect_left(periods, start)
+        hi = len(periods) if stop is None else bisect.bisect_left(periods, stop)
+        if lo >= hi:
+            return FieldRange(
+                periods=np.zeros(0, dtype=np.int64),
+                identities=np.zeros(0, dtype=np.str_),
+                values=np.zeros(0),
+            )
+
+        alive, values = self._replay(lo)
+        people = []
+        columns = []
+        for n in range(lo, hi):
+            if n > lo:
+                self._step(n, alive, values)
+            numbers = np.fromiter(alive, dtype=np.int64, count=len(alive))
+            people.append(numbers)
+            columns.append(values[numbers, j])
+        return FieldRange(
+            periods=np.repeat(
+                np.array(periods[lo:hi], dtype=np.int64), [len(p) for p in people]
+            ),
+            identities=np.array(self._identities, dtype=np.str_)[
+                np.concatenate(people)
+            ],
+            values=np.concatenate(columns),
+        )
@@ -1,10 +1,13 @@
 import typing
 
-import pandas as pd
 import pydantic
 
+from orgsim import derived as derived_
 from orgsim.framework import WorldTime
 
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
 Labels: typing.TypeAlias = dict[str, str]
 
 TimeSeriesEntry: typing.TypeAlias = tuple[int, int, float]
@@ -23,9 +26,52 @@ def generate_labels_identity(labels: Labels) -> int:
     return hash(frozenset(list(labels.items())))
 
 
-class Metrics:
+def parse_metrics_data(raw: str | bytes) -> MetricsData:
+    """Load serialized metrics, recomputing label identities for the current process.
+
+    Label identities are string hashes, which are salted per interpreter, so the ones stored by
+    another process cannot be used for lookups as they are.
+    """
+
+    data = MetricsData.model_validate_json(raw)
+    for sc in data.series_classes.values():
+        label_mapping: dict[int, Labels] = {}
+        series: dict[int, list[TimeSeriesEntry]] = {}
+        for lid, labels in sc.label_mapping.items():
+            new_lid = generate_labels_identity(labels)
+            label_mapping[new_lid] = labels
+            series[new_lid] = sc.series.get(lid, [])
+        sc.label_mapping = label_mapping
+        sc.series = series
+    return data
+
+
+def merge_branches(
+    branches: typing.Sequence[MetricsData], label: str = "branch"
+) -> MetricsData:
+    """Combine the metrics of several branches, labelling every series with its branch number."""
+
+    merged = MetricsData(series_classes={})
+    for i, data in enumerate(branches):
+        for name, sc in data.series_classes.items():
+            target = merged.series_classes.setdefault(
+                name, TimeSeriesClass(label_mapping={}, series={})
+            )
+            for lid, labels in sc.label_mapping.items():
+                the_labels = {**labels, label: str(i)}
+                new_lid = generate_labels_identity(the_labels)
+                target.label_mapping[new_lid] = the_labels
+                target.series[new_lid] = list(sc.series.get(lid, []))
+    return merged
+
+
+class Metrics(derived_.DerivedSeries):
     def __init__(self, data: MetricsData) -> None:
         self._data = data
+        self._init_derived()
+
+    def _logged_classes(self) -> dict[str, TimeSeriesClass]:
+        return self._data.series_classes
 
     def log(
         self,
@@ -35,6 +81,23 @@ class Metrics:
         value: float,
         labels: typing.Optional[Labels] = None,
     ) -> None:
+        self._series(name, labels).append((time.date, time.fiscal_period, value))
+
+    def log_many(
+        self,
+        *,
+        time: WorldTime,
+        values: typing.Mapping[str, float],
+        labels: typing.Optional[Labels] = None,
+    ) -> None:
+        """Log one value in each of several series at the same time and with the same labels."""
+
+        for name, value in values.items():
+            self._series(name, labels).append((time.date, time.fiscal_period, value))
+
+    def _series(
+        self, name: str, labels: typing.Optional[Labels]
+    ) -> list[TimeSeriesEntry]:
         if name not in self._data.series_classes:
             self._data.series_classes[name] = TimeSeriesClass(
                 label_mapping={}, series={}
@@ -48,12 +111,15 @@ class Metrics:
         if lid not in sc.series:
             sc.series[lid] = []
 
-        ts = sc.series[lid]
-        ts.append((time.date, time.fiscal_period, value))
+        return sc.series[lid]
 
     def get_fiscal_series(
         self, name: str, labels: typing.Optional[Labels] = None
     ) -> "pd.Series[float]":
+        import pandas as pd
+
+        if name in self._derived and not labels:
+            return self._derived_fiscal_series(name)
         if name not in self._data.series_classes:
             raise Exception(f"No such series class: {name}")
         sc = self._data.series_classes[name]
@@ -68,7 +134,12 @@ class Metrics:
 
     def get_series_in_class(
         self, name: str, filter_labels: typing.Optional[Labels] = None
-    ) -> typing.Iterable[tuple[pd.DataFrame, Labels]]:
+    ) -> "typing.Iterable[tuple[pd.DataFrame, Labels]]":
+        import pandas as pd
+
+        if name in self._derived:
+            yield from self._derived_series_in_class(name, filter_labels)
+            return
         if name not in self._data.series_classes:
             raise Exception(f"No such series class: {name}")
         sc = self._data.series_classes[name]
@@ -2,13 +2,50 @@ import abc
 import typing
 
 import numpy as np
+import numpy.typing as npt
 
 from orgsim import common, framework, metrics
+from orgsim.framework import chunked, rng as rng_
 from . import person, recruitment
 
 type WorldSeed = framework.WorldSeed[person.PersonSeed]
 type WorldState = framework.WorldState[person.PersonSeed]
 type ImmutableWorldState = framework.ImmutableWorldState[person.PersonSeed]
+type ChunkedWorldState = chunked.ChunkedWorldState[person.PersonSeed]
+
+FloatArray: typing.TypeAlias = npt.NDArray[np.float64]
+
+STATISTICS: dict[str, typing.Callable[[FloatArray], FloatArray]] = {
+    "min": lambda table: np.amin(table, axis=1),
+    "avg": lambda table: np.mean(table, axis=1),
+    "max": lambda table: np.amax(table, axis=1),
+}
+
+DEFAULT_STATISTICS: tuple[str, ...] = ("min", "avg", "max")
+
+
+def summarize(
+    columns: typing.Mapping[str, typing.Sequence[float] | FloatArray],
+    statistics: typing.Sequence[str] = DEFAULT_STATISTICS,
+    weights: typing.Optional[typing.Sequence[float]] = None,
+) -> dict[str, float]:
+    """`<statistic>_<column>` for every statistic of every column.
+
+    The columns are stacked into one table, so every statistic is a single reduction over all
+    of them. With `weights` (one per row, see `framework.approx`), averages are weighted.
+    """
+
+    names = list(columns)
+    table = np.array([columns[n] for n in names], dtype=np.float64)
+    reduced = {
+        s: (
+            np.average(table, axis=1, weights=weights)
+            if weights is not None and s == "avg"
+            else STATISTICS[s](table)
+        ).tolist()
+        for s in statistics
+    }
+    return {f"{s}_{n}": reduced[s][k] for k, n in enumerate(names) for s in statistics}
 
 
 class RewardDistributionStrategy(abc.ABC):
@@ -18,22 +55,48 @@ class RewardDistributionStrategy(abc.ABC):
     ) -> None:
         raise NotImplementedError()
 
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        """A key (other than None) if the rewards count `PersonState.weight`, so that a
+        record gets what each of its members would (see `framework.cohorts`)."""
+
+        return None
+
 
-class AllEqual(RewardDistributionStrategy):
+class BatchRewardDistributionStrategy(RewardDistributionStrategy, abc.ABC):
+    """A strategy that also distributes the rewards of a `chunked.ChunkedWorld`, on its
+    population arrays (for `BatchDefaultWorldStrategy`)."""
+
+    @abc.abstractmethod
+    def distribute_rewards_batch(
+        self, *, state: ChunkedWorldState, metrics: metrics.Metrics
+    ) -> None:
+        raise NotImplementedError()
+
+
+class AllEqual(BatchRewardDistributionStrategy):
     def distribute_rewards(
         self, *, state: WorldState, metrics: metrics.Metrics
     ) -> None:
-        v = state.total_reward / len(state.people_states)
+        v = state.total_reward / sum(p.weight for p in state.people_states.values())
         for pstate in state.people_states.values():
             pstate.wealth += v
         state.total_reward = 0
 
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        return AllEqual
+
+    def distribute_rewards_batch(
+        self, *, state: ChunkedWorldState, metrics: metrics.Metrics
+    ) -> None:
+        state.population.wealth += state.total_reward / len(state.population)
+        state.total_reward = 0
+
 
-class EqualContribution(RewardDistributionStrategy):
+class EqualContribution(BatchRewardDistributionStrategy):
     def distribute_rewards(
         self, *, state: WorldState, metrics: metrics.Metrics
     ) -> None:
-        N = sum(x.contributions for x in state.people_states.values())
+        N = sum(x.contributions * x.weight for x in state.people_states.values())
         if N == 0:
             return
         u = state.total_reward / N
@@ -47,6 +110,19 @@ class EqualContribution(RewardDistributionStrategy):
             )
         state.total_reward = 0
 
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        return EqualContribution
+
+    def distribute_rewards_batch(
+        self, *, state: ChunkedWorldState, metrics: metrics.Metrics
+    ) -> None:
+        N = float(state.population.contributions.sum())
+        if N == 0:
+            return
+        u = state.total_reward / N
+        state.population.wealth += state.population.contributions * u
+        state.total_reward = 0
+
 
 class DefaultWorldStrategy(framework.WorldStrategy[person.PersonSeed]):
     def __init__(
@@ -56,57 +132,71 @@ class DefaultWorldStrategy(framework.WorldStrategy[person.PersonSeed]):
         reward_distribution_strategy: RewardDistributionStrategy,
         recruitment_strategy: recruitment.RecruitmentStrategy,
         person_action_strategy: person.PersonActionStrategy,
+        statistics: typing.Sequence[str] = DEFAULT_STATISTICS,
     ) -> None:
         self._reward_distribution_strategy = reward_distribution_strategy
         self._recruitment_strategy = recruitment_strategy
         self._identity_generator = identity_generator
         self._person_action_strategy = person_action_strategy
+        self._statistics = tuple(statistics)
 
         self.metrics = metrics.Metrics(data=metrics.MetricsData(series_classes={}))
 
-    def _log_fiscal_base_stats(
-        self, *, state: WorldState, name: str, values: list[float]
-    ) -> None:
-        self.metrics.log(
-            time=state.time, name=f"min_{name}", value=float(np.amin(values))
-        )
-        self.metrics.log(
-            time=state.time, name=f"avg_{name}", value=float(np.average(values))
-        )
-        self.metrics.log(
-            time=state.time, name=f"max_{name}", value=float(np.amax(values))
-        )
+        inputs = person_action_strategy.pure_inputs()
+        if inputs is not None and not inputs <= person.STATE_FIELDS:
+            raise Exception(f"Not person state fields: {sorted(inputs)}")
+        self._pure_inputs = tuple(sorted(inputs)) if inputs is not None else None
+        # The last contribution of every person, with the inputs it was computed from.
+        self._memo: dict[str, tuple[tuple[float, ...], float]] = {}
+
+    def cache_description(self) -> dict[str, typing.Any]:
+        # The memo fills up as the strategy is used, and is not a parameter of the run.
+        return {k.lstrip("_"): v for k, v in vars(self).items() if k != "_memo"}
+
+    def generate_identity(self) -> str:
+        return self._identity_generator.generate()
 
     def distribute_rewards(self, *, state: WorldState) -> None:
-        self.metrics.log(
-            time=state.time,
-            name="population",
-            value=len(state.people_states.values()),
-        )
-        self._log_fiscal_base_stats(
-            state=state,
-            name="selfishness",
-            values=[x.seed.selfishness for x in state.people_states.values()],
-        )
-        self._log_fiscal_base_stats(
-            state=state,
-            name="contribution",
-            values=[x.contributions for x in state.people_states.values()],
-        )
+        people = list(state.people_states.values())
+        selfishness = []
+        contributions = []
+        weights = []
+        for x in people:
+            selfishness.append(x.seed.selfishness)
+            contributions.append(x.contributions)
+            weights.append(x.weight)
+        weighted = any(w != 1 for w in weights)
 
         self._reward_distribution_strategy.distribute_rewards(
             state=state, metrics=self.metrics
         )
 
-        self._log_fiscal_base_stats(
-            state=state,
-            name="wealth",
-            values=[x.wealth for x in state.people_states.values()],
+        summary = summarize(
+            {
+                "selfishness": selfishness,
+                "contribution": contributions,
+                "wealth": [x.wealth for x in people],
+            },
+            self._statistics,
+            weights if weighted else None,
+        )
+        population = sum(weights) if weighted else len(people)
+        self.metrics.log_many(
+            time=state.time, values={"population": population, **summary}
         )
 
     def pick_role_models(self, *, state: ImmutableWorldState) -> typing.Iterable[str]:
         yield from self._recruitment_strategy.pick_role_models(state=state)
 
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        # Subclasses that change how people are treated have to make sure this still holds.
+        keys = (
+            self._reward_distribution_strategy.cohort_key(),
+            self._recruitment_strategy.cohort_key(),
+            self._person_action_strategy.cohort_key(),
+        )
+        return None if None in keys else keys
+
     def generate_recruits(
         self,
         *,
@@ -115,10 +205,6 @@ class DefaultWorldStrategy(framework.WorldStrategy[person.PersonSeed]):
     ) -> typing.Iterable[person.PersonSeed]:
         m = np.average([s.selfishness for s in role_models])
 
-        identities = [
-            self._identity_generator.generate()
-            for _ in range(seed.periodic_recruit_count)
-        ]
         selfishness_values = np.clip(
             np.random.normal(
                 loc=m,
@@ -128,12 +214,13 @@ class DefaultWorldStrategy(framework.WorldStrategy[person.PersonSeed]):
             0,
             1,
         )
-        for i, s in zip(identities, list(selfishness_values)):
-            yield person.PersonSeed(selfishness=s)
+        return person.PersonSeed.from_arrays(selfishness=selfishness_values)
 
+    @framework.noop
     def on_before_person_acts(self, *, state: WorldState, identity: str) -> None:
         pass
 
+    @framework.noop
     def on_after_person_acts(self, *, state: WorldState, identity: str) -> None:
         pass
 
@@ -146,10 +233,21 @@ class DefaultWorldStrategy(framework.WorldStrategy[person.PersonSeed]):
             labels={"identity": str(pstate.identity)},
         )
         del state.people_states[pstate.identity]
+        self._memo.pop(pstate.identity, None)
 
     def on_end_of_day(self, *, state: WorldState) -> None:
         for pstate in list(state.people_states.values()):
             pstate.age += 1
+            if pstate.age_spread or pstate.wealth_spread:
+                # A merged record loses its members gradually (see `framework.approx`).
+                from orgsim.framework import approx
+
+                pstate.wealth -= state.seed.daily_living_cost
+                approx.cull(pstate, max_age=state.seed.max_age)
+                if pstate.weight == 0:
+                    self._kill_person(state=state, identity=pstate.identity)
+                continue
+
             if pstate.age == state.seed.max_age:
                 self._kill_person(state=state, identity=pstate.identity)
                 continue
@@ -159,17 +257,39 @@ class DefaultWorldStrategy(framework.WorldStrategy[person.PersonSeed]):
                 self._kill_person(state=state, identity=pstate.identity)
 
     def on_end_of_period(self, *, state: WorldState) -> None:
+        if len(self._memo) > len(state.people_states):
+            # People can also leave without dying (see `framework.approx`).
+            self._memo = {
+                i: m for i, m in self._memo.items() if i in state.people_states
+            }
+        ages = []
+        weights = []
         for pstate in state.people_states.values():
             pstate.contributions = 0
+            ages.append(pstate.age)
+            weights.append(pstate.weight)
 
-        self._log_fiscal_base_stats(
-            state=state,
-            name="age",
-            values=[x.age for x in state.people_states.values()],
+        self.metrics.log_many(
+            time=state.time,
+            values=summarize(
+                {"age": ages},
+                self._statistics,
+                weights if any(w != 1 for w in weights) else None,
+            ),
         )
 
     def person_act(self, *, state: WorldState, identity: str) -> float:
-        v = self._person_action_strategy.act(state=state, identity=identity)
+        if self._pure_inputs is None:
+            v = self._person_action_strategy.act(state=state, identity=identity)
+        else:
+            pstate = state.people_states[identity]
+            inputs = tuple(getattr(pstate, f) for f in self._pure_inputs)
+            memo = self._memo.get(identity)
+            if memo is not None and memo[0] == inputs:
+                v = memo[1]
+            else:
+                v = self._person_action_strategy.act(state=state, identity=identity)
+                self._memo[identity] = (inputs, v)
         self.metrics.log(
             time=state.time,
             name="person_contribution",
@@ -177,3 +297,84 @@ class DefaultWorldStrategy(framework.WorldStrategy[person.PersonSeed]):
             labels={"identity": identity},
         )
         return v
+
+
+class BatchDefaultWorldStrategy(chunked.BatchWorldStrategy[person.PersonSeed]):
+    """The `DefaultWorldStrategy` model for `chunked.ChunkedWorld`.
+
+    The fiscal statistics are the same as `DefaultWorldStrategy`'s, but per-person series
+    (contributions, bonuses, age at death) are not logged.
+    """
+
+    def __init__(
+        self,
+        *,
+        reward_distribution_strategy: BatchRewardDistributionStrategy,
+        recruitment_strategy: recruitment.BatchRecruitmentStrategy,
+        person_action_strategy: person.BatchPersonActionStrategy,
+        statistics: typing.Sequence[str] = DEFAULT_STATISTICS,
+    ) -> None:
+        self._reward_distribution_strategy = reward_distribution_strategy
+        self._recruitment_strategy = recruitment_strategy
+        self._person_action_strategy = person_action_strategy
+        self._statistics = tuple(statistics)
+
+        self.metrics = metrics.Metrics(data=metrics.MetricsData(series_classes={}))
+
+    def person_act(
+        self,
+        *,
+        state: ChunkedWorldState,
+        population: chunked.Population,
+        rng: rng_.CounterRNG,
+    ) -> npt.NDArray[np.float64]:
+        return self._person_action_strategy.act_batch(
+            state=state, population=population, rng=rng
+        )
+
+    def on_start_of_day(self, *, state: ChunkedWorldState) -> None:
+        self._person_action_strategy.prepare_batch(state=state)
+
+    def distribute_rewards(self, *, state: ChunkedWorldState) -> None:
+        population = state.population
+        selfishness = population.traits["selfishness"].copy()
+        contributions = population.contributions.copy()
+
+        self._reward_distribution_strategy.distribute_rewards_batch(
+            state=state, metrics=self.metrics
+        )
+
+        summary = summarize(
+            {
+                "selfishness": selfishness,
+                "contribution": contributions,
+                "wealth": state.population.wealth,
+            },
+            self._statistics,
+        )
+        self.metrics.log_many(
+            time=state.time, values={"population": len(population), **summary}
+        )
+
+    def generate_recruits(
+        self,
+        *,
+        state: ChunkedWorldState,
+        ids: npt.NDArray[np.int64],
+        rng: rng_.CounterRNG,
+    ) -> dict[str, npt.NDArray[np.float64]]:
+        role_models = self._recruitment_strategy.pick_role_models_batch(state=state)
+        m = float(np.average(state.population.traits["selfishness"][role_models]))
+
+        selfishness = rng.normal(
+            ids=ids, day=state.time.date, stream=1, loc=m, scale=0.05
+        )
+        return {"selfishness": np.clip(selfishness, 0, 1)}
+
+    def on_end_of_period(self, *, state: ChunkedWorldState) -> None:
+        ages = state.population.age.astype(np.float64)
+        state.population.contributions[:] = 0
+
+        self.metrics.log_many(
+            time=state.time, values=summarize({"age": ages}, self._statistics)
+        )
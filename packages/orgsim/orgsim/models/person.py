@@ -1,14 +1,28 @@
 import abc
+import typing
 
 import numpy as np
+import numpy.typing as npt
 import pydantic
 
-from orgsim import framework
+from orgsim import expr, framework
+from orgsim.framework import chunked, events as events_, rng as rng_
 
 
 class PersonSeed(pydantic.BaseModel):
+    model_config = pydantic.ConfigDict(frozen=True)
+
     selfishness: float
 
+    @classmethod
+    def from_arrays(cls, *, selfishness: npt.NDArray[np.float64]) -> list["PersonSeed"]:
+        """Build seeds from trait arrays the caller has already generated within bounds."""
+
+        return [cls.model_construct(selfishness=s) for s in selfishness.tolist()]
+
+
+STATE_FIELDS: frozenset[str] = frozenset({"age", "wealth", "contributions", "weight"})
+
 
 class PersonActionStrategy(abc.ABC):
     @abc.abstractmethod
@@ -17,22 +31,91 @@ class PersonActionStrategy(abc.ABC):
     ) -> float:
         raise NotImplementedError()
 
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        """The `STATE_FIELDS` that `act` depends on, if it depends on nothing else but the
+        person's seed (and the `WorldSeed`); None if it may depend on anything.
+
+        The World then only calls `act` for a person when one of those fields has changed.
+        """
+
+        return None
+
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        """A key (other than None) if `act` gives the same value for people with identical
+        states, whatever their `weight` and everybody else's states, like
+        `IndividualStrategy.cohort_key` in v1 (see `framework.cohorts`)."""
+
+        return None
+
+
+class BatchPersonActionStrategy(PersonActionStrategy, abc.ABC):
+    """A strategy that also acts for a chunk of the population of a `chunked.ChunkedWorld` at
+    once, on its arrays (for `models.BatchDefaultWorldStrategy`)."""
+
+    @abc.abstractmethod
+    def act_batch(
+        self,
+        *,
+        state: chunked.ChunkedWorldState[PersonSeed],
+        population: chunked.Population,
+        rng: rng_.CounterRNG,
+    ) -> npt.NDArray[np.float64]:
+        raise NotImplementedError()
+
+    def prepare_batch(self, *, state: chunked.ChunkedWorldState[PersonSeed]) -> None:
+        """Called once a day, before `act_batch` runs on the chunks of the population."""
+
+        pass
 
-class ConstantSelfishness(PersonActionStrategy):
+
+class ConstantSelfishness(BatchPersonActionStrategy):
     def act(
         self, *, state: framework.ImmutableWorldState[PersonSeed], identity: str
     ) -> float:
         return 1 - state.people_states[identity].seed.selfishness
 
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        return frozenset()
+
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        return ConstantSelfishness
 
-class ConstantAntiSelfishness(PersonActionStrategy):
+    def act_batch(
+        self,
+        *,
+        state: chunked.ChunkedWorldState[PersonSeed],
+        population: chunked.Population,
+        rng: rng_.CounterRNG,
+    ) -> npt.NDArray[np.float64]:
+        return 1 - population.traits["selfishness"]
+
+
+class ConstantAntiSelfishness(BatchPersonActionStrategy):
     def act(
         self, *, state: framework.ImmutableWorldState[PersonSeed], identity: str
     ) -> float:
         return state.people_states[identity].seed.selfishness
 
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        return frozenset()
+
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        return ConstantAntiSelfishness
+
+    def act_batch(
+        self,
+        *,
+        state: chunked.ChunkedWorldState[PersonSeed],
+        population: chunked.Population,
+        rng: rng_.CounterRNG,
+    ) -> npt.NDArray[np.float64]:
+        return population.traits["selfishness"].copy()
+
+
+class StrategicSelfishness(BatchPersonActionStrategy):
+    """Has no `cohort_key`: everybody sees the contributions of those who acted before them
+    that day, so the members of a cohort would not act alike."""
 
-class StrategicSelfishness(PersonActionStrategy):
     def __init__(self, c: float = 2) -> None:
         self._c = c
 
@@ -42,7 +125,10 @@ class StrategicSelfishness(PersonActionStrategy):
         base = 1 - state.people_states[identity].seed.selfishness
 
         total_contributions = sum(
-            [pstate.contributions for pstate in state.people_states.values()]
+            [
+                pstate.contributions * pstate.weight
+                for pstate in state.people_states.values()
+            ]
         )
         if total_contributions == 0:
             return base
@@ -59,3 +145,242 @@ class StrategicSelfishness(PersonActionStrategy):
         cf = np.clip((c - c * qol) / qol, 0, 1)
 
         return float(base * cf)
+
+    def act_batch(
+        self,
+        *,
+        state: chunked.ChunkedWorldState[PersonSeed],
+        population: chunked.Population,
+        rng: rng_.CounterRNG,
+    ) -> npt.NDArray[np.float64]:
+        base = 1 - population.traits["selfishness"]
+        if state.total_contributions == 0:
+            return base
+
+        my_bonus_forecast = (
+            population.contributions * state.total_reward / state.total_contributions
+        )
+        qol = (
+            my_bonus_forecast + state.seed.fiscal_length * state.seed.daily_salary
+        ) / (state.seed.fiscal_length * state.seed.daily_living_cost)
+        c = self._c
+        cf = np.clip((c - c * qol) / qol, 0, 1)
+
+        return base * cf
+
+
+class _Day:
+    """What `ExpressionAction.act` takes from everybody, once a day."""
+
+    def __init__(
+        self,
+        *,
+        state: framework.ImmutableWorldState[PersonSeed],
+        time: framework.WorldTime,
+        variables: dict[str, typing.Any],
+        aggregates: typing.Optional[dict[str, float]],
+        total_contributions: float,
+    ) -> None:
+        self.state = state
+        self.time = time
+        self.variables = variables
+        self.aggregates = aggregates
+        self.total_contributions = total_contributions
+        # The last one to act, with their contributions and weight before they did.
+        self.last: typing.Optional[tuple[str, float, float]] = None
+
+
+class ExpressionAction(BatchPersonActionStrategy):
+    """A contribution given by an `expr.Expression`, on one person or on a whole chunk at once.
+
+    The expression sees the person's traits, `age`, `wealth`, `contributions` and `weight`, the
+    world's `population`, `total_reward`, `total_contributions`, `date` and `fiscal_period`,
+    the fields of the `WorldSeed` and the given `constants`. `StrategicSelfishness`, say, is
+
+        ExpressionAction(
+            "(1 - selfishness) * (1 if total_contributions == 0 else clip((c - c * qol) / qol, 0, 1))",
+            definitions={
+                "forecast": "contributions * total_reward / total_contributions",
+                "qol": "(forecast + fiscal_length * daily_salary)"
+                " / (fiscal_length * daily_living_cost)",
+            },
+            constants={"c": 2},
+        )
+
+    As with the hand-written strategies, `act` sees the totals as they run during the day and
+    `act_batch` sees them as of its start. Aggregates (`sum(wealth)`, ...) are taken as of the
+    start of the day by both, once a day.
+    """
+
+    def __init__(
+        self,
+        expression: str,
+        *,
+        definitions: typing.Mapping[str, str] = {},
+        constants: typing.Mapping[str, float] = {},
+    ) -> None:
+        self._expression = expr.Expression(expression, definitions=definitions)
+        self._constants = {k: np.float64(v) for k, v in constants.items()}
+        self._batch_aggregates: typing.Optional[dict[str, float]] = None
+        self._day: typing.Optional[_Day] = None
+
+    @property
+    def expression(self) -> expr.Expression:
+        return self._expression
+
+    def cache_description(self) -> dict[str, typing.Any]:
+        return {"expression": self._expression, "constants": self._constants}
+
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        names = self._expression.names - self._constants.keys()
+        seed_fields = set(framework.WorldSeed.model_fields) - {"initial_people"}
+        known = set(PersonSeed.model_fields) | seed_fields | STATE_FIELDS
+        if self._expression.has_aggregates or not names <= known:
+            return None
+        return frozenset(names & STATE_FIELDS)
+
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        inputs = self.pure_inputs()
+        if inputs is None or "weight" in inputs:
+            return None
+        return id(self)
+
+    def _world(
+        self,
+        *,
+        seed: framework.WorldSeed[PersonSeed],
+        time: framework.WorldTime,
+        total_reward: float,
+        total_contributions: float,
+        population: float,
+    ) -> dict[str, typing.Any]:
+        variables = {
+            k: np.float64(v)
+            for k, v in seed.model_dump(exclude={"initial_people"}).items()
+        }
+        variables.update(
+            population=np.float64(population),
+            total_reward=np.float64(total_reward),
+            total_contributions=np.float64(total_contributions),
+            date=np.float64(time.date),
+            fiscal_period=np.float64(time.fiscal_period),
+        )
+        variables.update(self._constants)
+        return variables
+
+    def act(
+        self, *, state: framework.ImmutableWorldState[PersonSeed], identity: str
+    ) -> float:
+        day = self._day
+        if day is None or day.state is not state or day.time != state.time:
+            day = self._day = self._start_day(state)
+        elif day.last is not None:
+            # Only the one who acted last has contributed since: keep the total running.
+            last, contributions, weight = day.last
+            p = state.people_states.get(last)
+            if p is not None:
+                day.total_contributions += (p.contributions - contributions) * weight
+
+        p = state.people_states[identity]
+        day.last = (identity, p.contributions, p.weight)
+        variables = dict(day.variables)
+        variables.update(
+            total_reward=np.float64(state.total_reward),
+            total_contributions=np.float64(day.total_contributions),
+        )
+        variables.update(
+            {k: np.float64(v) for k, v in events_.flatten_traits(p.seed).items()}
+        )
+        variables.update(
+            age=np.float64(p.age),
+            wealth=np.float64(p.wealth),
+            contributions=np.float64(p.contributions),
+            weight=np.float64(p.weight),
+        )
+        return float(self._expression(variables, aggregates=day.aggregates))
+
+    def _start_day(self, state: framework.ImmutableWorldState[PersonSeed]) -> "_Day":
+        names = self._expression.names
+        totals = self._expression.has_aggregates or not names.isdisjoint(
+            {"population", "total_contributions"}
+        )
+        # The totals take a pass over everybody, so they are only taken when needed.
+        people = list(state.people_states.values()) if totals else []
+        weights = np.array([p.weight for p in people])
+        contributions = np.array([p.contributions for p in people])
+        total_contributions = float(np.dot(contributions, weights))
+        variables = self._world(
+            seed=state.seed,
+            time=state.time,
+            total_reward=state.total_reward,
+            total_contributions=total_contributions,
+            population=float(weights.sum()),
+        )
+
+        aggregates = None
+        if self._expression.has_aggregates:
+            traits = [events_.flatten_traits(p.seed) for p in people]
+            columns: dict[str, typing.Any] = {
+                k: np.array([t[k] for t in traits]) for k in traits[0]
+            }
+            columns.update(
+                age=np.array([p.age for p in people], dtype=np.float64),
+                wealth=np.array([p.wealth for p in people]),
+                contributions=contributions,
+                weight=weights,
+            )
+            aggregates = self._expression.aggregate(
+                {**variables, **columns}, weights=weights
+            )
+        return _Day(
+            state=state,
+            time=state.time.model_copy(),
+            variables=variables,
+            aggregates=aggregates,
+            total_contributions=total_contributions,
+        )
+
+    def _batch_variables(
+        self,
+        state: chunked.ChunkedWorldState[PersonSeed],
+        population: chunked.Population,
+    ) -> dict[str, typing.Any]:
+        variables = self._world(
+            seed=state.seed,
+            time=state.time,
+            total_reward=state.total_reward,
+            total_contributions=state.total_contributions,
+            population=len(state.population),
+        )
+        variables.update(population.traits)
+        variables.update(
+            age=population.age.astype(np.float64),
+            wealth=population.wealth,
+            contributions=population.contributions,
+            weight=np.float64(1),
+        )
+        return variables
+
+    def prepare_batch(self, *, state: chunked.ChunkedWorldState[PersonSeed]) -> None:
+        self._batch_aggregates = self._expression.aggregate(
+            self._batch_variables(state, state.population)
+        )
+
+    def act_batch(
+        self,
+        *,
+        state: chunked.ChunkedWorldState[PersonSeed],
+        population: chunked.Population,
+        rng: rng_.CounterRNG,
+    ) -> npt.NDArray[np.float64]:
+        aggregates = self._batch_aggregates
+        if aggregates is None:
+            aggregates = self._expression.aggregate(
+                self._batch_variables(state, state.population)
+            )
+        result = self._expression(
+            self._batch_variables(state, population), aggregates=aggregates
+        )
+        return np.broadcast_to(
+            np.asarray(result, dtype=np.float64), (len(population),)
+        ).copy()
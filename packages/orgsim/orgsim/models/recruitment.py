@@ -1,8 +1,11 @@
 import abc
 import typing
 
+import numpy as np
+import numpy.typing as npt
 
 from orgsim import framework, common
+from orgsim.framework import chunked
 from .person import PersonSeed
 
 
@@ -13,8 +16,25 @@ class RecruitmentStrategy(abc.ABC):
     ) -> typing.Iterable[str]:
         raise NotImplementedError()
 
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        """A key (other than None) if the role models picked stand for all of their members,
+        as the World counts them (see `framework.cohorts`)."""
 
-class AverageOfEveryone(RecruitmentStrategy):
+        return None
+
+
+class BatchRecruitmentStrategy(RecruitmentStrategy, abc.ABC):
+    """A strategy that also picks role models in a `chunked.ChunkedWorld`, as indices into its
+    population (for `models.BatchDefaultWorldStrategy`)."""
+
+    @abc.abstractmethod
+    def pick_role_models_batch(
+        self, *, state: chunked.ChunkedWorldState[PersonSeed]
+    ) -> npt.NDArray[np.int64]:
+        raise NotImplementedError()
+
+
+class AverageOfEveryone(BatchRecruitmentStrategy):
     def __init__(self, *, identity_generator: common.IdentityGenerator) -> None:
         self._identity_generator = identity_generator
 
@@ -24,8 +44,18 @@ class AverageOfEveryone(RecruitmentStrategy):
         for s in state.people_states.values():
             yield s.identity
 
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        return AverageOfEveryone
+
+    def pick_role_models_batch(
+        self, *, state: chunked.ChunkedWorldState[PersonSeed]
+    ) -> npt.NDArray[np.int64]:
+        return np.arange(len(state.population), dtype=np.int64)
+
+
+class AverageOfTopContributors(BatchRecruitmentStrategy):
+    """Has no `cohort_key`: its cut can fall within a cohort."""
 
-class AverageOfTopContributors(RecruitmentStrategy):
     def __init__(
         self, *, identity_generator: common.IdentityGenerator, percentile: float
     ) -> None:
@@ -43,9 +73,24 @@ class AverageOfTopContributors(RecruitmentStrategy):
         if not contributors:
             raise Exception("No people to compare to!")
 
-        N = len(contributors)
+        # Records can stand for several people (see `framework.approx`); a record that
+        # straddles the cut is taken whole.
+        N = sum(x.weight for x in contributors)
         p = int(self._percentile * N) + 1
-        sample = contributors[:p]
-
-        for s in sample:
+        taken = 0.0
+        for s in contributors:
+            if taken >= p:
+                break
+            taken += s.weight
             yield s.identity
+
+    def pick_role_models_batch(
+        self, *, state: chunked.ChunkedWorldState[PersonSeed]
+    ) -> npt.NDArray[np.int64]:
+        N = len(state.population)
+        if N == 0:
+            raise Exception("No people to compare to!")
+
+        p = int(self._percentile * N) + 1
+        order = np.argsort(-state.population.contributions, kind="stable")
+        return order[:p].astype(np.int64)
@@ -0,0 +1,212 @@
+"""Replicates of sweep configurations, run until their outcomes are known precisely enough.
+
+Instead of a fixed number of replicates per configuration, every configuration gets
+`min_replicates` and then more only while the confidence interval of one of its target outcomes
+is still wider than asked for (up to `max_replicates`). Whenever a worker frees up, the next
+replicate goes to the configuration that is furthest from its targets, so the budget ends up
+where the noise is.
+"""
+
+import concurrent.futures
+import math
+import os
+import typing
+
+import pydantic
+
+from orgsim import sweep
+
+
+class ReplicatePolicy(pydantic.BaseModel):
+    """Target confidence interval half-widths per outcome (relative to the mean if `relative`)."""
+
+    targets: dict[str, float]
+    relative: bool = False
+    confidence: float = 0.95
+    min_replicates: int = 3
+    max_replicates: int = 50
+
+    @pydantic.model_validator(mode="after")
+    def _check(self) -> typing.Self:
+        unknown = set(self.targets) - set(sweep.OUTCOMES)
+        if unknown:
+            raise ValueError(f"Unknown outcomes: {sorted(unknown)}")
+        if self.min_replicates < 2 or self.max_replicates < self.min_replicates:
+            raise ValueError("Need 2 <= min_replicates <= max_replicates")
+        return self
+
+
+class ReplicateSummary(pydantic.BaseModel):
+    params: dict[str, float]
+    n: int
+    mean: dict[str, float]
+    half_width: dict[str, float]
+    converged: bool
+
+
+def t_quantile(p: float, df: int) -> float:
+    """Quantile of Student's t distribution with `df` degrees of freedom.
+
+    The distribution function has a closed form for whole degrees of freedom (Abramowitz and
+    Stegun 26.7.3-4), in terms of the angle theta = atan(t / sqrt(df)), which is inverted by
+    bisection on theta, so the quantile is exact to within floating point.
+    """
+
+    if not 0 < p < 1 or df < 1:
+        raise Exception(f"No t quantile for p={p} with {df} degrees of freedom")
+    if p < 0.5:
+        return -t_quantile(1 - p, df)
+
+    target = 2 * p - 1
+    low, high = 0.0, math.pi / 2
+    for _ in range(100):
+        theta = (low + high) / 2
+        if _t_central(theta, df) < target:
+            low = theta
+        else:
+            high = theta
+    return math.sqrt(df) * math.tan((low + high) / 2)
+
+
+def _t_central(theta: float, df: int) -> float:
+    """P(|T| < sqrt(df) tan(theta)) for T with `df` degrees of freedom."""
+
+    c2 = math.cos(theta) ** 2
+    if df % 2 == 0:
+        term = total = 1.0
+        for k in range(1, df // 2):
+            term *= c2 * (2 * k - 1) / (2 * k)
+            total += term
+        return math.sin(theta) * total
+
+    if df == 1:
+        return 2 * theta / math.pi
+    term = total = math.cos(theta)
+    for k in range(1, (df - 1) // 2):
+        term *= c2 * (2 * k) / (2 * k + 1)
+        total += term
+    return 2 / math.pi * (theta + math.sin(theta) * total)
+
+
+class _Moments:
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def half_width(self, confidence: float) -> float:
+        if self.n < 2:
+            return math.inf
+        std = math.sqrt(self.m2 / (self.n - 1))
+        return t_quantile(0.5 + confidence / 2, self.n - 1) * std / math.sqrt(self.n)
+
+
+class _Configuration:
+    def __init__(self, params: dict[str, float], policy: ReplicatePolicy) -> None:
+        self.params = params
+        self.policy = policy
+        self.moments = {o: _Moments() for o in policy.targets}
+        self.submitted = 0
+        self.in_flight = 0
+
+    def add(self, outcomes: typing.Mapping[str, float]) -> None:
+        self.in_flight -= 1
+        for o, m in self.moments.items():
+            if not math.isnan(outcomes[o]):
+                m.add(outcomes[o])
+
+    def need(self) -> float:
+        """How far the widest interval is from its target (<= 1 means it is met)."""
+
+        result = 0.0
+        for o, target in self.policy.targets.items():
+            m = self.moments[o]
+            width = m.half_width(self.policy.confidence)
+            if self.policy.relative:
+                width /= max(abs(m.mean), 1e-12)
+            result = max(result, width / target if target > 0 else math.inf)
+        return result
+
+    def projected_need(self) -> float:
+        """`need` once the replicates in flight are in, assuming the spread stays the same."""
+
+        n = min(m.n for m in self.moments.values())
+        if n < 2:
+            return math.inf
+        return self.need() * math.sqrt(n / (n + self.in_flight))
+
+    def wants_more(self) -> bool:
+        if self.submitted < self.policy.min_replicates:
+            return True
+        if self.submitted >= self.policy.max_replicates:
+            return False
+        n = min(m.n for m in self.moments.values())
+        return n >= 2 and self.projected_need() > 1
+
+    def summary(self) -> ReplicateSummary:
+        return ReplicateSummary(
+            params=self.params,
+            n=min(m.n for m in self.moments.values()),
+            mean={o: m.mean if m.n else math.nan for o, m in self.moments.items()},
+            half_width={
+                o: m.half_width(self.policy.confidence) for o, m in self.moments.items()
+            },
+            converged=self.need() <= 1,
+        )
+
+
+def run_replicates(
+    experiment: sweep.ExperimentSpec,
+    configurations: typing.Sequence[typing.Mapping[str, float]],
+    *,
+    policy: ReplicatePolicy,
+    rng_seed: int = 0,
+    cache_dir: typing.Optional[str] = None,
+    max_workers: typing.Optional[int] = None,
+) -> list[ReplicateSummary]:
+    """Run replicates of every configuration on a process pool until `policy` is satisfied.
+
+    Replicate i of every configuration uses the RNG seed `rng_seed + i`, so configurations are
+    compared on the same random numbers.
+    """
+
+    raw = experiment.model_dump_json()
+    configs = [_Configuration(dict(c), policy) for c in configurations]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        slots = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        pending: dict[concurrent.futures.Future[dict[str, float]], _Configuration] = {}
+
+        def submit() -> bool:
+            candidates = [c for c in configs if c.wants_more()]
+            if not candidates:
+                return False
+            # Everybody gets their minimum first, then the neediest goes next.
+            c = max(
+                candidates,
+                key=lambda c: (c.submitted < policy.min_replicates, c.projected_need()),
+            )
+            job = (raw, c.params, rng_seed + c.submitted, cache_dir)
+            c.submitted += 1
+            c.in_flight += 1
+            pending[executor.submit(sweep.run_job, job)] = c
+            return True
+
+        while True:
+            while len(pending) < slots and submit():
+                pass
+            if not pending:
+                break
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for f in done:
+                pending.pop(f).add(f.result())
+
+    return [c.summary() for c in configs]
@@ -0,0 +1,372 @@
+"""Design-of-experiments sweeps over `WorldSeed` parameters.
+
+Instead of a full grid, a sweep starts from a space-filling Latin hypercube design over the
+parameter ranges and then spends the rest of its budget in rounds of refinement: every point is
+paired with its nearest neighbours and new points are placed between the pairs across which the
+outcome changes the most, i.e. near the boundaries and steep regions of the response surface.
+All points share the same RNG seed (common random numbers), so that differences between
+neighbours come from the parameters rather than from the noise.
+
+A spec looks like this in YAML:
+
+    experiment:
+      world: {fiscal_length: 30, productivity: 1.0, initial_individual_wealth: 10,
+              daily_salary: 1, daily_living_cost: 1.1, periodic_recruit_count: 5,
+              max_age: 1000}
+      population: {count: 50, selfishness: [0.0, 1.0]}
+      strategy:
+        reward_distribution: EqualContribution
+        recruitment: {name: AverageOfTopContributors, args: {percentile: 0.2}}
+        person_action: ConstantSelfishness
+      periods: 200
+    parameters:
+      productivity: {low: 0.5, high: 3.0}
+      periodic_recruit_count: {low: 1, high: 20, integer: true}
+    outcome: final_population
+    design: {samples: 32, rounds: 2, refine_samples: 16}
+"""
+
+import concurrent.futures
+import typing
+
+import numpy as np
+import numpy.typing as npt
+import pydantic
+
+from orgsim import common, framework, metrics, models
+
+FloatArray: typing.TypeAlias = npt.NDArray[np.float64]
+
+REWARD_DISTRIBUTIONS: dict[
+    str, typing.Callable[..., models.RewardDistributionStrategy]
+] = {
+    "AllEqual": models.AllEqual,
+    "EqualContribution": models.EqualContribution,
+}
+
+RECRUITMENTS: dict[
+    str, typing.Callable[..., models.recruitment.RecruitmentStrategy]
+] = {
+    "AverageOfEveryone": models.recruitment.AverageOfEveryone,
+    "AverageOfTopContributors": models.recruitment.AverageOfTopContributors,
+}
+
+PERSON_ACTIONS: dict[str, typing.Callable[..., models.person.PersonActionStrategy]] = {
+    "ConstantSelfishness": models.person.ConstantSelfishness,
+    "ConstantAntiSelfishness": models.person.ConstantAntiSelfishness,
+    "StrategicSelfishness": models.person.StrategicSelfishness,
+}
+
+OUTCOMES: tuple[str, ...] = (
+    "final_population",
+    "extinct",
+    "avg_selfishness",
+    "avg_wealth",
+)
+
+
+class ComponentSpec(pydantic.BaseModel):
+    name: str
+    args: dict[str, typing.Any] = {}
+
+    @pydantic.model_validator(mode="before")
+    @classmethod
+    def _from_name(cls, data: typing.Any) -> typing.Any:
+        return {"name": data} if isinstance(data, str) else data
+
+
+class StrategySpec(pydantic.BaseModel):
+    reward_distribution: ComponentSpec = ComponentSpec(name="EqualContribution")
+    recruitment: ComponentSpec = ComponentSpec(name="AverageOfEveryone")
+    person_action: ComponentSpec = ComponentSpec(name="ConstantSelfishness")
+
+    def build(self) -> models.DefaultWorldStrategy:
+        for registry, c in (
+            (REWARD_DISTRIBUTIONS, self.reward_distribution),
+            (RECRUITMENTS, self.recruitment),
+            (PERSON_ACTIONS, self.person_action),
+        ):
+            if c.name not in registry:
+                raise Exception(f"Unknown strategy: {c.name}")
+
+        id_gen = common.SequentialIdentityGenerator()
+        return models.DefaultWorldStrategy(
+            identity_generator=id_gen,
+            reward_distribution_strategy=REWARD_DISTRIBUTIONS[
+                self.reward_distribution.name
+            ](**self.reward_distribution.args),
+            recruitment_strategy=RECRUITMENTS[self.recruitment.name](
+                identity_generator=id_gen, **self.recruitment.args
+            ),
+            person_action_strategy=PERSON_ACTIONS[self.person_action.name](
+                **self.person_action.args
+            ),
+        )
+
+
+class WorldParams(pydantic.BaseModel):
+    fiscal_length: int
+    productivity: float
+    initial_individual_wealth: float
+    daily_salary: float
+    daily_living_cost: float
+    periodic_recruit_count: int
+    max_age: int
+
+
+class PopulationSpec(pydantic.BaseModel):
+    count: int
+    selfishness: tuple[float, float] = (0.0, 1.0)
+
+
+class ExperimentSpec(pydantic.BaseModel):
+    world: WorldParams
+    population: PopulationSpec
+    strategy: StrategySpec = StrategySpec()
+    periods: int = 200
+
+    def world_seed(
+        self, params: typing.Mapping[str, float], rng_seed: int
+    ) -> framework.WorldSeed[models.person.PersonSeed]:
+        """The seed with `params` overriding the world fields; people are drawn from `rng_seed`."""
+
+        rng = np.random.default_rng(rng_seed)
+        lo, hi = self.population.selfishness
+        people = models.person.PersonSeed.from_arrays(
+            selfishness=rng.uniform(lo, hi, size=self.population.count)
+        )
+        world = WorldParams.model_validate({**self.world.model_dump(), **params})
+        return framework.WorldSeed[models.person.PersonSeed](
+            initial_people=set(people), **world.model_dump()
+        )
+
+
+class Parameter(pydantic.BaseModel):
+    low: float
+    high: float
+    integer: bool = False
+    log: bool = False
+
+    def scale(self, u: FloatArray) -> FloatArray:
+        """Map points of the unit interval onto the parameter's range."""
+
+        v: FloatArray
+        if self.log:
+            v = np.exp(np.log(self.low) + u * (np.log(self.high) - np.log(self.low)))
+        else:
+            v = self.low + u * (self.high - self.low)
+        if self.integer:
+            v = np.round(v)
+        return v
+
+
+class DesignSpec(pydantic.BaseModel):
+    samples: int = 32
+    rounds: int = 2
+    refine_samples: int = 16
+    neighbours: int = 4
+
+
+class SweepSpec(pydantic.BaseModel):
+    experiment: ExperimentSpec
+    parameters: dict[str, Parameter]
+    outcome: str = "final_population"
+    design: DesignSpec = DesignSpec()
+    rng_seed: int = 0
+    cache: typing.Optional[str] = None
+
+    @pydantic.model_validator(mode="after")
+    def _check(self) -> typing.Self:
+        unknown = set(self.parameters) - set(WorldParams.model_fields)
+        if unknown:
+            raise ValueError(f"Not WorldSeed parameters: {sorted(unknown)}")
+        if self.outcome not in OUTCOMES:
+            raise ValueError(f"Unknown outcome: {self.outcome}")
+        return self
+
+
+class SweepPoint(pydantic.BaseModel):
+    round: int
+    params: dict[str, float]
+    outcomes: dict[str, float]
+
+
+def load_spec(path: str) -> SweepSpec:
+    import yaml
+
+    with open(path) as f:
+        return SweepSpec.model_validate(yaml.safe_load(f))
+
+
+def latin_hypercube(
+    n: int, d: int, rng: np.random.Generator, candidates: int = 10
+) -> FloatArray:
+    """An n-point Latin hypercube in [0, 1)^d, the most spread out (maximin) of a few tries."""
+
+    def sample() -> FloatArray:
+        strata = np.argsort(rng.random((d, n)), axis=1).T
+        points: FloatArray = (strata + rng.random((n, d))) / n
+        return points
+
+    return max((sample() for _ in range(candidates)), key=_min_distance)
+
+
+def _min_distance(points: FloatArray) -> float:
+    if len(points) < 2:
+        return 0.0
+    d = np.linalg.norm(points[:, np.newaxis] - points[np.newaxis], axis=-1)
+    return float(d[np.triu_indices(len(points), k=1)].min())
+
+
+def refine(
+    points: FloatArray,
+    values: FloatArray,
+    *,
+    n: int,
+    neighbours: int,
+    rng: np.random.Generator,
+) -> FloatArray:
+    """Place `n` new points between the neighbouring pairs whose outcomes differ the most.
+
+    Pairs are scored by the outcome difference (relative to its overall range) per unit of
+    distance, so both sharp boundaries and steep slopes attract points; pairs with a missing
+    outcome are skipped. New points land at a random spot along the pair with a little jitter.
+    """
+
+    finite = np.isfinite(values)
+    span = float(np.ptp(values[finite])) if finite.any() else 0.0
+    if span == 0 or len(points) < 2:
+        return rng.random((n, points.shape[1]))
+
+    distances = np.linalg.norm(points[:, np.newaxis] - points[np.newaxis], axis=-1)
+    np.fill_diagonal(distances, np.inf)
+    k = min(neighbours, len(points) - 1)
+    nearest = np.argsort(distances, axis=1)[:, :k]
+
+    pairs = {
+        (min(i, int(j)), max(i, int(j))) for i in range(len(points)) for j in nearest[i]
+    }
+    scored = [
+        (abs(values[i] - values[j]) / span / max(distances[i, j], 1e-9), i, j)
+        for i, j in pairs
+        if finite[i] and finite[j]
+    ]
+    if not scored:
+        return rng.random((n, points.shape[1]))
+    scored.sort(reverse=True)
+
+    new = []
+    for m in range(n):
+        _, i, j = scored[m % len(scored)]
+        t = rng.uniform(0.25, 0.75)
+        p = points[i] + t * (points[j] - points[i])
+        p += rng.normal(scale=0.1 * distances[i, j], size=len(p))
+        new.append(np.clip(p, 0, np.nextafter(1, 0)))
+    return np.array(new)
+
+
+def outcomes_of(data: metrics.MetricsData, periods: int) -> dict[str, float]:
+    """The sweep outcomes of a finished run, read straight from its fiscal series."""
+
+    def values(name: str) -> list[float]:
+        sc = data.series_classes.get(name)
+        if sc is None:
+            return []
+        return [
+            v for _, _, v in sc.series.get(metrics.generate_labels_identity({}), [])
+        ]
+
+    population = values("population")
+    selfishness = values("avg_selfishness")
+    wealth = values("avg_wealth")
+    extinct = len(population) < periods
+    return {
+        "final_population": 0.0 if extinct else population[-1],
+        "extinct": float(extinct),
+        "avg_selfishness": selfishness[-1] if selfishness else float("nan"),
+        "avg_wealth": wealth[-1] if wealth else float("nan"),
+    }
+
+
+def run_point(
+    experiment: ExperimentSpec,
+    params: typing.Mapping[str, float],
+    *,
+    rng_seed: int,
+    cache_dir: typing.Optional[str] = None,
+) -> dict[str, float]:
+    """Simulate one configuration and reduce it to its outcomes."""
+
+    import orgsim
+    from orgsim import cache as cache_
+
+    strategy = experiment.strategy.build()
+    result = orgsim.run_experiment(
+        seed=experiment.world_seed(params, rng_seed),
+        strategy=strategy,
+        periods=experiment.periods,
+        rng_seed=rng_seed,
+        cache=cache_.ResultCache(cache_dir) if cache_dir is not None else None,
+    )
+    return outcomes_of(result.data, experiment.periods)
+
+
+def run_job(
+    job: tuple[str, dict[str, float], int, typing.Optional[str]],
+) -> dict[str, float]:
+    """`run_point` for a process pool: the experiment comes as JSON, with the params, the RNG
+    seed and the cache directory."""
+
+    raw, params, rng_seed, cache_dir = job
+    return run_point(
+        ExperimentSpec.model_validate_json(raw),
+        params,
+        rng_seed=rng_seed,
+        cache_dir=cache_dir,
+    )
+
+
+def run_sweep(
+    spec: SweepSpec, *, max_workers: typing.Optional[int] = None
+) -> list[SweepPoint]:
+    """Run the initial design and the refinement rounds of a sweep on a process pool."""
+
+    names = list(spec.parameters)
+    rng = np.random.default_rng(spec.rng_seed)
+    raw = spec.experiment.model_dump_json()
+
+    units = np.zeros((0, len(names)))
+    values = np.zeros(0)
+    points: list[SweepPoint] = []
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for round_ in range(spec.design.rounds + 1):
+            if round_ == 0:
+                batch = latin_hypercube(spec.design.samples, len(names), rng)
+            else:
+                batch = refine(
+                    units,
+                    values,
+                    n=spec.design.refine_samples,
+                    neighbours=spec.design.neighbours,
+                    rng=rng,
+                )
+
+            params = [
+                {
+                    n: float(spec.parameters[n].scale(batch[:, k])[i])
+                    for k, n in enumerate(names)
+                }
+                for i in range(len(batch))
+            ]
+            jobs = [(raw, p, spec.rng_seed, spec.cache) for p in params]
+            results = list(executor.map(run_job, jobs))
+
+            points.extend(
+                SweepPoint(round=round_, params=p, outcomes=o)
+                for p, o in zip(params, results)
+            )
+            units = np.concatenate([units, batch])
+            values = np.concatenate([values, [o[spec.outcome] for o in results]])
+
+    return points
@@ -1,3 +1,20 @@
-from . import game, variants
+import importlib
+import types
+import typing
+
+from . import game
+
+if typing.TYPE_CHECKING:
+    from . import variants
+
+# The strategies in `variants` (and the asyncio they use) are only imported on first access, so
+# that playing games does not pay for them.
+
+
+def __getattr__(name: str) -> types.ModuleType:
+    if name == "variants":
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["game", "variants"]
@@ -1,13 +1,23 @@
 from .impl import Game
-from .individual import IndividualStrategy, IndividualStrategyStateView, IndividualStats
+from .individual import (
+    AsyncIndividualStrategy,
+    BatchIndividualStrategy,
+    IndividualStrategy,
+    IndividualStrategyStateView,
+    IndividualStats,
+)
+from .payroll import PayrollPolicy
 from .seed import Seed, IndividualSeed, Factory
 
 __all__ = [
+    "AsyncIndividualStrategy",
+    "BatchIndividualStrategy",
     "Game",
     "Factory",
     "IndividualStrategyStateView",
     "IndividualSeed",
     "IndividualStrategy",
     "IndividualStats",
+    "PayrollPolicy",
     "Seed",
 ]
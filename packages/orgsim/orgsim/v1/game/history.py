@@ -0,0 +1,44 @@
+import typing
+
+from orgsim import history
+from . import state as state_
+
+
+class SnapshotAdapter(
+    history.HistoryAdapter[state_.Snapshot[typing.Any], state_.IndividualStateData]
+):
+    """Stores the game's `Snapshot`s (see `Game.snapshot`) in a `history.History`.
+
+    Individual seeds are loaded back as plain JSON values, since the game does not know their
+    type.
+    """
+
+    fields = (
+        "stats.score",
+        "stats.wealth",
+        "stats.unit_production",
+        "stats.salary",
+        "stats.cost_of_living",
+        "periodic.contribution",
+        "periodic.starting_unit_production",
+        "contribution",
+        "count",
+    )
+    scalars = (
+        "shared.date",
+        "shared.period",
+        "shared.org_wealth",
+        "shared.shareholder_value",
+    )
+    period = "shared.period"
+
+    def people(
+        self, state: state_.Snapshot[typing.Any]
+    ) -> dict[str, state_.IndividualStateData]:
+        return state.individual_states.d
+
+    def load_state(self, raw: str) -> state_.Snapshot[typing.Any]:
+        return state_.Snapshot[typing.Any].model_validate_json(raw)
+
+    def load_person(self, raw: str) -> state_.IndividualStateData:
+        return state_.IndividualStateData.model_validate_json(raw)
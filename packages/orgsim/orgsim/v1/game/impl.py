@@ -2,7 +2,10 @@ import typing
 
 import pydantic
 
-from . import state, seed
+from orgsim import common
+from . import individual, metrics as metrics_, state, seed
+
+R = typing.TypeVar("R")
 
 
 class Results(pydantic.BaseModel):
@@ -17,15 +20,37 @@ class _Game(typing.Generic[seed.IndividualSeed]):
     def __init__(self, state: state.GameState[seed.IndividualSeed]) -> None:
         self._state = state
         self._metrics = state.metrics
+        # The last work coefficient of every Individual with a pure strategy, with the stats
+        # it was computed from.
+        self._memo: dict[str, tuple[tuple[float, ...], float]] = {}
+
+    @property
+    def metrics(self) -> metrics_.Metrics:
+        return self._metrics.metrics
+
+    @property
+    def remaining_periods(self) -> int:
+        return max(self._state.periods - self._state.period, 0)
 
     def play(self) -> Results:
-        """Play the game for however many periods were provided in the seed."""
+        """Play the game for whatever is left of the periods provided in the seed."""
 
-        for _ in range(self._state.periods):
+        for _ in range(self.remaining_periods):
             self.play_period()
 
         return self.calculate_results()
 
+    async def play_async(self) -> Results:
+        """`play`, with the strategies that are coroutines awaited (see `play_day_async`)."""
+
+        for _ in range(self.remaining_periods):
+            await self.play_period_async()
+
+        return self.calculate_results()
+
+    def snapshot(self) -> state.Snapshot[seed.IndividualSeed]:
+        return self._state.snapshot()
+
     def play_period(self) -> None:
         """Play a single period.
 
@@ -36,9 +61,19 @@ class _Game(typing.Generic[seed.IndividualSeed]):
         for _ in range(self._state.days_in_period):
             self.play_day()
 
+        self._end_period()
+
+    async def play_period_async(self) -> None:
+        for _ in range(self._state.days_in_period):
+            await self.play_day_async()
+
+        self._end_period()
+
+    def _end_period(self) -> None:
         dead_individuals = self._state.org.play()
         for i in dead_individuals:
             self._state.delete_individual(i)
+            self._memo.pop(i, None)
         self._metrics.log_end_of_period()
         self._state.advance_period()
 
@@ -46,40 +81,186 @@ class _Game(typing.Generic[seed.IndividualSeed]):
         """Play a single day.
 
         During the day, all Individuals execute their turns sequentially, albeit in no particular order.
+        Work coefficients of Individuals with batch strategies are computed up front, one call per
+        batch, since they only depend on each Individual's own stats.
+        """
+
+        self._play_individuals(self.compute_batched_coefficients())
+
+    async def play_day_async(self) -> None:
+        """`play_day`, with the work coefficients of async strategies awaited concurrently.
+
+        Like batched ones, they only depend on each Individual's own stats, so they are all
+        requested at the start of the day and the day is then played as usual. While a game
+        waits on its players, other games on the same event loop get to run.
         """
 
+        coefficients = self.compute_batched_coefficients()
+        waiting = [
+            i
+            for i in self._state.individuals
+            if i not in coefficients
+            and isinstance(
+                self._state.obj_of(i).strategy, individual.AsyncIndividualStrategy
+            )
+        ]
+        # Only async games need asyncio, and their callers have imported it already.
+        import asyncio
+
+        ks = await asyncio.gather(
+            *(self._state.obj_of(i).compute_work_coefficient_async() for i in waiting)
+        )
+        coefficients.update(zip(waiting, ks))
+        self._remember(waiting, ks)
+        self._play_individuals(coefficients)
+
+    def _play_individuals(self, coefficients: dict[str, float]) -> None:
         for identity in self._state.individuals:
-            self._state.obj_of(identity).play()
+            obj = self._state.obj_of(identity)
+            k = coefficients.get(identity)
+            if k is None:
+                obj.play()
+            else:
+                obj.play_with(k)
 
         self._state.advance_date()
 
+    def compute_batched_coefficients(self) -> dict[str, float]:
+        """The work coefficients that are known before the day is played: those of pure
+        strategies whose inputs have not changed since they were last computed (see
+        `IndividualStrategy.pure_inputs`), and those of batch strategies."""
+
+        coefficients: dict[str, float] = {}
+        batches: dict[
+            typing.Hashable, tuple[individual.BatchIndividualStrategy, list[str]]
+        ] = {}
+        recomputed = []
+        for identity in self._state.individuals:
+            obj = self._state.obj_of(identity)
+            strategy = obj.strategy
+            if obj.is_pure:
+                memo = self._memo.get(identity)
+                if memo is not None and memo[0] == obj.pure_inputs():
+                    coefficients[identity] = memo[1]
+                    continue
+            if isinstance(strategy, individual.BatchIndividualStrategy):
+                batch = batches.setdefault(strategy.batch_key(), (strategy, []))
+                batch[1].append(identity)
+            elif obj.is_pure and not isinstance(
+                strategy, individual.AsyncIndividualStrategy
+            ):
+                coefficients[identity] = obj.compute_work_coefficient()
+                recomputed.append(identity)
+
+        for strategy, identities in batches.values():
+            features = individual.features_of(
+                [self._state.obj_of(i).stats for i in identities]
+            )
+            ks = strategy.compute_work_coefficients(features)
+            coefficients.update(zip(identities, ks.tolist()))
+            recomputed.extend(identities)
+
+        self._remember(recomputed, [coefficients[i] for i in recomputed])
+        return coefficients
+
+    def _remember(
+        self, identities: typing.Sequence[str], ks: typing.Sequence[float]
+    ) -> None:
+        for identity, k in zip(identities, ks):
+            obj = self._state.obj_of(identity)
+            if obj.is_pure:
+                self._memo[identity] = (obj.pure_inputs(), k)
+
     def calculate_results(self) -> Results:
-        individual_values = list(
-            self._state.score_of(i) for i in self._state.individuals
+        individual_values = sorted(
+            (self._state.score_of(i), self._state.count_of(i))
+            for i in self._state.individuals
         )
         results = Results(
             shareholder_value=self._state.shareholder_value,
-            total_individual_value=sum(individual_values),
-            min_individual_value=min(individual_values) if individual_values else 0,
-            med_individual_value=sorted(individual_values)[len(individual_values) // 2]
-            if individual_values
-            else 0,
-            max_individual_value=max(individual_values) if individual_values else 0,
+            total_individual_value=sum(v * n for v, n in individual_values),
+            min_individual_value=individual_values[0][0] if individual_values else 0,
+            med_individual_value=_median(individual_values) if individual_values else 0,
+            max_individual_value=individual_values[-1][0] if individual_values else 0,
         )
         return results
 
 
+def _median(values: list[tuple[float, int]]) -> float:
+    """The value of the middle Individual, from sorted (value, count) pairs."""
+
+    middle = sum(n for _, n in values) // 2
+    for v, n in values:
+        if middle < n:
+            return v
+        middle -= n
+    raise Exception("Counts must be positive")
+
+
 class Game(typing.Generic[seed.IndividualSeed]):
     @classmethod
     def from_seed(
         cls,
         seed: seed.Seed[seed.IndividualSeed],
         factory: seed.Factory[seed.IndividualSeed],
+        *,
+        cohorts: bool = False,
     ) -> typing.Self:
-        return cls(_Game(state.GameState.from_seed(seed, factory)))
+        """Set up a game with the Individuals the factory creates for the seed.
+
+        With `cohorts`, Individuals whose stats are identical and whose strategies share a
+        `cohort_key` are played as one, with a count: they act alike and the Org pays them alike,
+        so they would stay identical for the whole game anyway. Only the first of them is
+        simulated and logged, under its own identity, with an `individual_count` series.
+        """
+
+        return cls(_Game(state.GameState.from_seed(seed, factory, cohorts=cohorts)))
 
     def __init__(self, game: _Game[seed.IndividualSeed]) -> None:
         self._game = game
 
+    @property
+    def metrics(self) -> metrics_.Metrics:
+        return self._game.metrics
+
     def play(self) -> Results:
         return self._game.play()
+
+    def play_period(self) -> None:
+        self._game.play_period()
+
+    async def play_async(self) -> Results:
+        return await self._game.play_async()
+
+    async def play_period_async(self) -> None:
+        await self._game.play_period_async()
+
+    def snapshot(self) -> state.Snapshot[seed.IndividualSeed]:
+        return self._game.snapshot()
+
+    def results(self) -> Results:
+        return self._game.calculate_results()
+
+    def fork(
+        self,
+        n: int,
+        *,
+        collect: typing.Callable[[typing.Self], R],
+        mutate: typing.Optional[typing.Callable[[typing.Self, int], None]] = None,
+        max_workers: typing.Optional[int] = None,
+    ) -> list[R]:
+        """Branch the game into `n` children that each play out the remaining periods.
+
+        Like `framework.World.fork`: every child starts from the current state (shared
+        copy-on-write through `os.fork`), is passed to `mutate` with its branch number first, and
+        is reduced to a picklable value by `collect` once it is done, e.g. its `results()` and
+        `metrics.data` (which `metrics.merge_branches` combines). This game is left untouched.
+        """
+
+        def branch(i: int) -> R:
+            if mutate is not None:
+                mutate(self, i)
+            self.play()
+            return collect(self)
+
+        return common.run_forked(n, branch, max_workers=max_workers)
@@ -1,5 +1,8 @@
 import abc
+import typing
 
+import numpy as np
+import numpy.typing as npt
 import pydantic
 
 from . import metrics
@@ -25,6 +28,77 @@ class IndividualStrategy(abc.ABC):
     def compute_work_coefficient(self, state: IndividualStrategyStateView) -> float:
         raise NotImplementedError()
 
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        """The stats (of `FEATURES`) the work coefficient depends on, if it depends on nothing
+        else; None if it may. The Game then only asks again when one of them has changed."""
+
+        return None
+
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        """Strategies that share a key (other than None) always give the same work coefficient
+        for the same stats, so identical Individuals playing them can be played as one cohort
+        (see `Game.from_seed`). Strategies that draw random numbers must not have one."""
+
+        return None
+
+
+FEATURES: tuple[str, ...] = (
+    "score",
+    "wealth",
+    "unit_production",
+    "salary",
+    "cost_of_living",
+)
+
+
+def features_of(stats: typing.Sequence[IndividualStats]) -> npt.NDArray[np.float64]:
+    """Build the (individuals x `FEATURES`) matrix that batch strategies work on."""
+
+    return np.array(
+        [
+            (s.score, s.wealth, s.unit_production, s.salary, s.cost_of_living)
+            for s in stats
+        ],
+        dtype=np.float64,
+    ).reshape(-1, len(FEATURES))
+
+
+class BatchIndividualStrategy(IndividualStrategy, abc.ABC):
+    """A strategy that computes the work coefficients of many individuals at once.
+
+    The Game evaluates all individuals sharing a `batch_key` in a single call per day.
+    """
+
+    @abc.abstractmethod
+    def compute_work_coefficients(
+        self, features: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        raise NotImplementedError()
+
+    def batch_key(self) -> typing.Hashable:
+        return id(self)
+
+    def compute_work_coefficient(self, state: IndividualStrategyStateView) -> float:
+        return float(self.compute_work_coefficients(features_of([state.stats]))[0])
+
+
+class AsyncIndividualStrategy(IndividualStrategy, abc.ABC):
+    """A strategy that waits on something outside the simulation (a person, another process).
+
+    Only `Game.play_async` can play it. The Game asks all async strategies for their work
+    coefficients concurrently at the start of every day, so that many games can wait on their
+    players on one event loop.
+    """
+
+    @abc.abstractmethod
+    async def compute_work_coefficient_async(
+        self, state: IndividualStrategyStateView
+    ) -> float:
+        raise NotImplementedError()
+
+    def compute_work_coefficient(self, state: IndividualStrategyStateView) -> float:
+        raise Exception("Async strategies can only be played with Game.play_async")
+
 
 class IndividualState(IndividualStrategyStateView, abc.ABC):
     @property
@@ -58,10 +132,41 @@ class Individual:
         self._strategy = strategy
         self._state = state
         self._metrics = metrics
+        inputs = strategy.pure_inputs()
+        self._pure_inputs = tuple(sorted(inputs)) if inputs is not None else None
+
+    @property
+    def strategy(self) -> IndividualStrategy:
+        return self._strategy
+
+    @property
+    def is_pure(self) -> bool:
+        return self._pure_inputs is not None
+
+    def pure_inputs(self) -> tuple[float, ...]:
+        """The current values of the stats the (pure) strategy depends on."""
+
+        if self._pure_inputs is None:
+            raise Exception("The strategy of this individual is not pure")
+        stats = self._state.stats
+        return tuple(getattr(stats, f) for f in self._pure_inputs)
+
+    @property
+    def stats(self) -> IndividualStats:
+        return self._state.stats
 
     def play(self) -> None:
-        k = self._strategy.compute_work_coefficient(self._state)
+        self.play_with(self.compute_work_coefficient())
+
+    def compute_work_coefficient(self) -> float:
+        return self._strategy.compute_work_coefficient(self._state)
+
+    async def compute_work_coefficient_async(self) -> float:
+        if not isinstance(self._strategy, AsyncIndividualStrategy):
+            raise Exception("The strategy of this individual is not async")
+        return await self._strategy.compute_work_coefficient_async(self._state)
 
+    def play_with(self, k: float) -> None:
         self.do_work(k)
         self.do_self_improvement(1 - k)
         self._metrics.log_individual(self._state.identity)
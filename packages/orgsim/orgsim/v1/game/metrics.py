@@ -1,30 +1,37 @@
 import abc
 import typing
 
-import pandas as pd
-import pydantic
-
-Labels: typing.TypeAlias = dict[str, str]
-
-TimeSeriesEntry: typing.TypeAlias = tuple[int, int, float]
-
-
-class TimeSeriesClass(pydantic.BaseModel):
-    label_mapping: dict[int, Labels]
-    series: dict[int, list[TimeSeriesEntry]]
-
-
-class MetricsData(pydantic.BaseModel):
-    series_classes: dict[str, TimeSeriesClass]
-
-
-def generate_labels_identity(labels: Labels) -> int:
-    return hash(frozenset(list(labels.items())))
-
-
-class Metrics:
+from orgsim import derived as derived_
+from orgsim.metrics import (
+    Labels,
+    MetricsData,
+    TimeSeriesClass,
+    TimeSeriesEntry,
+    generate_labels_identity,
+)
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "Labels",
+    "Metrics",
+    "MetricsData",
+    "MetricsLogger",
+    "MetricsState",
+    "TimeSeriesClass",
+    "TimeSeriesEntry",
+    "generate_labels_identity",
+]
+
+
+class Metrics(derived_.DerivedSeries):
     def __init__(self, data: MetricsData) -> None:
         self._data = data
+        self._init_derived()
+
+    def _logged_classes(self) -> dict[str, TimeSeriesClass]:
+        return self._data.series_classes
 
     def log(
         self,
@@ -54,6 +61,10 @@ class Metrics:
     def get_fiscal_series(
         self, name: str, labels: typing.Optional[Labels] = None
     ) -> "pd.Series[float]":
+        import pandas as pd
+
+        if name in self._derived and not labels:
+            return self._derived_fiscal_series(name)
         if name not in self._data.series_classes:
             raise Exception(f"No such series class: {name}")
         sc = self._data.series_classes[name]
@@ -68,7 +79,12 @@ class Metrics:
 
     def get_series_in_class(
         self, name: str, filter_labels: typing.Optional[Labels] = None
-    ) -> typing.Iterable[tuple[pd.DataFrame, Labels]]:
+    ) -> "typing.Iterable[tuple[pd.DataFrame, Labels]]":
+        import pandas as pd
+
+        if name in self._derived:
+            yield from self._derived_series_in_class(name, filter_labels)
+            return
         if name not in self._data.series_classes:
             raise Exception(f"No such series class: {name}")
         sc = self._data.series_classes[name]
@@ -122,12 +138,20 @@ class MetricsState(abc.ABC):
     def unit_production_of(self, identity: str) -> float:
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def count_of(self, identity: str) -> int:
+        raise NotImplementedError()
+
 
 class MetricsLogger:
     def __init__(self, state: MetricsState, metrics: Metrics) -> None:
         self._state = state
         self._metrics = metrics
 
+    @property
+    def metrics(self) -> Metrics:
+        return self._metrics
+
     def log_end_of_period(self) -> None:
         self._log(name="population", value=self._state.population)
 
@@ -145,6 +169,9 @@ class MetricsLogger:
             self._state.unit_production_of(identity),
             labels=labels,
         )
+        count = self._state.count_of(identity)
+        if count != 1:
+            self._log("individual_count", count, labels=labels)
 
     def _log(
         self, name: str, value: float, labels: typing.Optional[Labels] = None
@@ -1,6 +1,6 @@
 import abc
 
-from . import metrics
+from . import metrics, payroll
 
 
 class OrgState(abc.ABC):
@@ -14,10 +14,6 @@ class OrgState(abc.ABC):
     def individuals(self) -> set[str]:
         raise NotImplementedError()
 
-    @abc.abstractmethod
-    def salary_of(self, identity: str) -> float:
-        raise NotImplementedError()
-
     @property
     @abc.abstractmethod
     def wealth(self) -> float:
@@ -39,11 +35,13 @@ class OrgState(abc.ABC):
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def pay_individual(self, identity: str, v: float) -> None:
+    def payroll_sheet(self) -> tuple[list[str], payroll.PayrollSheet]:
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def deduct_cost_of_living(self, identity: str) -> bool:
+    def apply_payroll(
+        self, identities: list[str], result: payroll.PayrollResult
+    ) -> None:
         raise NotImplementedError()
 
 
@@ -53,9 +51,11 @@ class Org:
         *,
         state: OrgState,
         metrics: metrics.MetricsLogger,
+        policy: payroll.PayrollPolicy = payroll.PayrollPolicy(),
     ) -> None:
         self._state = state
         self._metrics = metrics
+        self._policy = policy
 
     def play(self) -> set[str]:
         dead = set()
@@ -64,34 +64,19 @@ class Org:
 
         self.pay_shareholders()
 
-        self.re_evaluate_salaries(dead)
-
         return dead
 
     def pay_employees(self) -> set[str]:
-        total_salaries = sum(self._state.salary_of(i) for i in self._state.individuals)
-        insufficiency_coef = min(self._state.wealth / total_salaries, 1.0)
-
-        # bonuses = org.compute_bonuses(ostate)
+        """Pay salaries and bonuses, re-evaluate salaries and return who could not make a living."""
 
-        dead_individuals: set[str] = set()
+        identities, sheet = self._state.payroll_sheet()
+        result = payroll.run_payroll(
+            org_wealth=self._state.wealth, sheet=sheet, policy=self._policy
+        )
+        self._state.apply_payroll(identities, result)
 
-        for identity in self._state.individuals:
-            salary = insufficiency_coef * self._state.salary_of(identity)
-            self._state.pay_individual(identity, salary)
-            # self._mutator.pay_bonus(identity, bonuses[identity])
-            dead = self._state.deduct_cost_of_living(identity)
-            if dead:
-                dead_individuals.add(identity)
-
-        return dead_individuals
+        return {i for i, dead in zip(identities, result.dead) if dead}
 
     def pay_shareholders(self) -> None:
         self._state.shareholder_value += self._state.wealth
         self._state.wealth = 0
-
-    def re_evaluate_salaries(self, dead: set[str]) -> None:
-        pass
-        # new_salaries = org.re_evaluate_salaries(ostate)
-        # for identity in self._config.individuals.keys():
-        #     self._mutator.update_salary(identity, new_salaries[identity])
@@ -0,0 +1,133 @@
+import typing
+
+import numpy as np
+import numpy.typing as npt
+import pydantic
+
+FloatArray: typing.TypeAlias = npt.NDArray[np.float64]
+
+
+class PayrollPolicy(pydantic.BaseModel):
+    """How the Org pays its employees at the end of a period.
+
+    `bonus_share` of the wealth left after salaries becomes the bonus pool, `skill_bonus_share`
+    of which is split by unit production gains and the rest by contribution. Salaries are
+    raised by `salary_raise_coef` times the relative unit production gain. The defaults pay
+    salaries only.
+    """
+
+    bonus_share: float = 0.0
+    skill_bonus_share: float = 0.5
+    salary_raise_coef: float = 0.0
+
+
+class PayrollSheet:
+    COLUMNS: typing.ClassVar[tuple[str, ...]] = (
+        "salary",
+        "wealth",
+        "cost_of_living",
+        "contribution",
+        "unit_production",
+        "starting_unit_production",
+    )
+
+    def __init__(
+        self,
+        *,
+        salary: FloatArray,
+        wealth: FloatArray,
+        cost_of_living: FloatArray,
+        contribution: FloatArray,
+        unit_production: FloatArray,
+        starting_unit_production: FloatArray,
+        count: typing.Optional[FloatArray] = None,
+    ) -> None:
+        """`count` is how many Individuals each row stands for (see `Game.from_seed`), one each
+        by default; all amounts are per Individual."""
+
+        self.salary = salary
+        self.wealth = wealth
+        self.cost_of_living = cost_of_living
+        self.contribution = contribution
+        self.unit_production = unit_production
+        self.starting_unit_production = starting_unit_production
+        self.count = count if count is not None else np.ones_like(salary)
+
+    @classmethod
+    def from_rows(cls, rows: typing.Sequence[tuple[float, ...]]) -> typing.Self:
+        """Build a sheet from one tuple per individual, in the order of `COLUMNS`."""
+
+        table = np.array(rows, dtype=np.float64).reshape(-1, len(cls.COLUMNS))
+        return cls(**{c: table[:, i] for i, c in enumerate(cls.COLUMNS)})
+
+
+class PayrollResult:
+    def __init__(
+        self,
+        *,
+        org_wealth: float,
+        paid: FloatArray,
+        bonus: FloatArray,
+        wealth: FloatArray,
+        salary: FloatArray,
+        dead: npt.NDArray[np.bool_],
+    ) -> None:
+        self.org_wealth = org_wealth
+        self.paid = paid
+        self.bonus = bonus
+        self.wealth = wealth
+        self.salary = salary
+        self.dead = dead
+
+
+def _split(pool: float, weights: FloatArray, count: FloatArray) -> FloatArray:
+    total = float((weights * count).sum())
+    if total <= 0:
+        return np.zeros_like(weights)
+    return pool * weights / total
+
+
+def run_payroll(
+    *, org_wealth: float, sheet: PayrollSheet, policy: PayrollPolicy
+) -> PayrollResult:
+    """Pay a whole period's salaries and bonuses and charge the cost of living in one pass.
+
+    Salaries are scaled down together when the Org cannot afford all of them. The bonus pool
+    comes out of whatever is left, split between unit production gains and contributions.
+    Individuals whose wealth ends up negative are marked dead.
+    """
+
+    count = sheet.count
+    total_salaries = float((sheet.salary * count).sum())
+    insufficiency_coef = (
+        min(org_wealth / total_salaries, 1.0) if total_salaries > 0 else 1.0
+    )
+    paid = insufficiency_coef * sheet.salary
+    org_wealth -= float((paid * count).sum())
+
+    gains = np.maximum(sheet.unit_production - sheet.starting_unit_production, 0)
+    pool = max(org_wealth, 0.0) * policy.bonus_share
+    skill_pool = pool * policy.skill_bonus_share
+    bonus = _split(skill_pool, gains, count) + _split(
+        pool - skill_pool, sheet.contribution, count
+    )
+    org_wealth -= float((bonus * count).sum())
+
+    wealth = sheet.wealth + paid + bonus - sheet.cost_of_living
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_gains = np.where(
+            sheet.starting_unit_production > 0,
+            gains / sheet.starting_unit_production,
+            0.0,
+        )
+    salary = sheet.salary * (1 + policy.salary_raise_coef * relative_gains)
+
+    return PayrollResult(
+        org_wealth=org_wealth,
+        paid=paid,
+        bonus=bonus,
+        wealth=wealth,
+        salary=salary,
+        dead=wealth < 0,
+    )
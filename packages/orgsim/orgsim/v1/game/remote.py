@@ -0,0 +1,184 @@
+"""Work coefficients computed by a policy in another local process.
+
+A `PolicyServer` runs the policy (e.g. inside a training process) and any number of
+`PolicyClient`s connect to it. Each client owns a shared memory buffer holding a feature matrix
+(rows of `individual.FEATURES`) followed by a vector of work coefficients. A call writes the
+features into the buffer and sends the server the number of rows. The server runs the policy on
+them in place and writes the coefficients back, so only two small messages cross the connection
+per call, however many individuals it covers.
+"""
+
+import multiprocessing.connection
+import sys
+import threading
+import typing
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import numpy.typing as npt
+
+from . import individual
+
+FloatArray: typing.TypeAlias = npt.NDArray[np.float64]
+
+Policy: typing.TypeAlias = typing.Callable[[FloatArray], FloatArray]
+
+
+def _views(
+    shm: shared_memory.SharedMemory, capacity: int
+) -> tuple[FloatArray, FloatArray]:
+    n_features = len(individual.FEATURES)
+    features: FloatArray = np.ndarray(
+        (capacity, n_features), dtype=np.float64, buffer=shm.buf
+    )
+    coefficients: FloatArray = np.ndarray(
+        (capacity,),
+        dtype=np.float64,
+        buffer=shm.buf,
+        offset=capacity * n_features * 8,
+    )
+    return features, coefficients
+
+
+_untracked = threading.Lock()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a client's buffer without registering it with our resource tracker: the client
+    unlinks it, and a tracker would unlink it a second time when we exit.
+
+    Before Python 3.13 attaching always registers it, and unregistering it afterwards goes wrong
+    when the client shares our tracker (as processes started by one another do), since the
+    tracker then forgets the client's own registration. The registration is skipped instead.
+    """
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    with _untracked:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class PolicyServer:
+    def __init__(
+        self,
+        policy: Policy,
+        *,
+        address: typing.Optional[typing.Any] = None,
+        authkey: typing.Optional[bytes] = None,
+    ) -> None:
+        """Listen on `address` (a fresh local socket by default) for clients of `policy`."""
+
+        self._policy = policy
+        self._listener = multiprocessing.connection.Listener(address, authkey=authkey)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.calls = 0
+
+    @property
+    def address(self) -> typing.Any:
+        return self._listener.address
+
+    def serve(self) -> None:
+        """Serve clients, each on its own thread, until `close` is called."""
+
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed:
+                    return
+                raise
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def close(self) -> None:
+        self._closed = True
+        self._listener.close()
+
+    def _handle(self, conn: multiprocessing.connection.Connection) -> None:
+        shm: typing.Optional[shared_memory.SharedMemory] = None
+        features = coefficients = np.zeros(0)
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    break
+                if message[0] == "attach":
+                    _, name, capacity = message
+                    if shm is not None:
+                        del features, coefficients
+                        shm.close()
+                    shm = _attach(name)
+                    features, coefficients = _views(shm, capacity)
+                    conn.send(capacity)
+                elif message[0] == "call":
+                    n = message[1]
+                    with self._lock:
+                        coefficients[:n] = self._policy(features[:n])
+                        self.calls += 1
+                    conn.send(n)
+                else:
+                    break
+        if shm is not None:
+            del features, coefficients
+            shm.close()
+
+
+class PolicyClient:
+    def __init__(
+        self,
+        address: typing.Any,
+        *,
+        authkey: typing.Optional[bytes] = None,
+        capacity: int = 1024,
+    ) -> None:
+        self._conn = multiprocessing.connection.Client(address, authkey=authkey)
+        self._shm: typing.Optional[shared_memory.SharedMemory] = None
+        self._capacity = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self._release()
+        size = capacity * (len(individual.FEATURES) + 1) * 8
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._capacity = capacity
+        self._features, self._coefficients = _views(self._shm, capacity)
+        self._conn.send(("attach", self._shm.name, capacity))
+        self._conn.recv()
+
+    def _release(self) -> None:
+        if self._shm is not None:
+            del self._features, self._coefficients
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def compute(self, features: FloatArray) -> FloatArray:
+        """The work coefficients for a (individuals x `FEATURES`) matrix, in one server call."""
+
+        n = len(features)
+        if n > self._capacity:
+            self._allocate(max(n, 2 * self._capacity))
+        self._features[:n] = features
+        self._conn.send(("call", n))
+        self._conn.recv()
+        return self._coefficients[:n].copy()
+
+    def close(self) -> None:
+        try:
+            self._conn.send(("detach",))
+        except OSError:
+            pass
+        self._conn.close()
+        self._release()
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
@@ -3,7 +3,7 @@ import typing
 
 import pydantic
 
-from . import individual
+from . import individual, payroll as payroll_
 
 IndividualSeed = typing.TypeVar("IndividualSeed")
 
@@ -24,3 +24,4 @@ class Seed(pydantic.BaseModel, typing.Generic[IndividualSeed]):
     org_productivity: float
     production_to_value_coef: float
     max_invest_coef: float
+    payroll: payroll_.PayrollPolicy = payroll_.PayrollPolicy()
@@ -1,8 +1,9 @@
 import typing
 
+import numpy as np
 import pydantic
 
-from . import individual, metrics, org, seed as seed_
+from . import individual, metrics, org, payroll, seed as seed_
 
 
 class SharedStateData(pydantic.BaseModel, typing.Generic[seed_.IndividualSeed]):
@@ -32,17 +33,23 @@ class IndividualStateData(pydantic.BaseModel):
     identity: str
     stats: individual.IndividualStats
     periodic: PeriodicIndividualStateData
+    # Over the whole game, while `periodic.contribution` starts over with every payroll.
+    contribution: float = 0.0
+    # How many identical Individuals this one stands for (see `Game.from_seed`).
+    count: int = 1
 
     @classmethod
     def from_stats(
         cls, identity: str, stats: individual.IndividualStats
     ) -> typing.Self:
-        return cls(
+        return cls.model_construct(
             identity=identity,
             stats=stats,
-            periodic=PeriodicIndividualStateData(
-                contribution=0, starting_unit_production=stats.unit_production
+            periodic=PeriodicIndividualStateData.model_construct(
+                contribution=0.0, starting_unit_production=stats.unit_production
             ),
+            contribution=0.0,
+            count=1,
         )
 
 
@@ -67,11 +74,14 @@ class IndividualStateImpl(
 
     @property
     def contribution(self) -> float:
-        return self._individual_state.periodic.contribution
+        return self._individual_state.contribution
 
     def contribute(self, v: float) -> None:
+        self._individual_state.contribution += v
         self._individual_state.periodic.contribution += v
-        self._shared_state.org_wealth += self._shared_state.seed.org_productivity * v
+        self._shared_state.org_wealth += (
+            self._shared_state.seed.org_productivity * v * self._individual_state.count
+        )
 
     @property
     def stats(self) -> individual.IndividualStats:
@@ -97,15 +107,12 @@ class OrgStateImpl(org.OrgState, typing.Generic[seed_.IndividualSeed]):
 
     @property
     def population(self) -> int:
-        return len(self._individuals.d)
+        return sum(s.count for s in self._individuals.d.values())
 
     @property
     def individuals(self) -> set[str]:
         return set(self._individuals.d.keys())
 
-    def salary_of(self, identity: str) -> float:
-        return self._individuals.d[identity].stats.salary
-
     @property
     def shareholder_value(self) -> float:
         return self._shared_state.shareholder_value
@@ -114,14 +121,36 @@ class OrgStateImpl(org.OrgState, typing.Generic[seed_.IndividualSeed]):
     def shareholder_value(self, v: float) -> None:
         self._shared_state.shareholder_value = v
 
-    def pay_individual(self, identity: str, v: float) -> None:
-        self._individuals.d[identity].stats.wealth += v
-        self._shared_state.org_wealth -= v
+    def payroll_sheet(self) -> tuple[list[str], payroll.PayrollSheet]:
+        states = list(self._individuals.d.values())
+        sheet = payroll.PayrollSheet.from_rows(
+            [
+                (
+                    s.stats.salary,
+                    s.stats.wealth,
+                    s.stats.cost_of_living,
+                    s.periodic.contribution,
+                    s.stats.unit_production,
+                    s.periodic.starting_unit_production,
+                )
+                for s in states
+            ]
+        )
+        sheet.count = np.array([s.count for s in states], dtype=np.float64)
+        return [s.identity for s in states], sheet
 
-    def deduct_cost_of_living(self, identity: str) -> bool:
-        istats = self._individuals.d[identity].stats
-        istats.wealth -= istats.cost_of_living
-        return istats.wealth < 0
+    def apply_payroll(
+        self, identities: list[str], result: payroll.PayrollResult
+    ) -> None:
+        self._shared_state.org_wealth = result.org_wealth
+        for identity, wealth, salary in zip(
+            identities, result.wealth.tolist(), result.salary.tolist()
+        ):
+            istate = self._individuals.d[identity]
+            istate.stats.wealth = wealth
+            istate.stats.salary = salary
+            istate.periodic.contribution = 0
+            istate.periodic.starting_unit_production = istate.stats.unit_production
 
 
 class MetricsState(metrics.MetricsState, typing.Generic[seed_.IndividualSeed]):
@@ -143,13 +172,13 @@ class MetricsState(metrics.MetricsState, typing.Generic[seed_.IndividualSeed]):
 
     @property
     def population(self) -> int:
-        return len(self._individuals.d)
+        return sum(s.count for s in self._individuals.d.values())
 
     def wealth_of(self, identity: str) -> float:
         return self._individuals.d[identity].stats.wealth
 
     def contribution_of(self, identity: str) -> float:
-        return self._individuals.d[identity].periodic.contribution
+        return self._individuals.d[identity].contribution
 
     def score_of(self, identity: str) -> float:
         return self._individuals.d[identity].stats.score
@@ -157,6 +186,9 @@ class MetricsState(metrics.MetricsState, typing.Generic[seed_.IndividualSeed]):
     def unit_production_of(self, identity: str) -> float:
         return self._individuals.d[identity].stats.unit_production
 
+    def count_of(self, identity: str) -> int:
+        return self._individuals.d[identity].count
+
 
 class StateData(pydantic.BaseModel, typing.Generic[seed_.IndividualSeed]):
     shared: SharedStateData[seed_.IndividualSeed]
@@ -174,13 +206,24 @@ class StateData(pydantic.BaseModel, typing.Generic[seed_.IndividualSeed]):
         cls,
         seed: seed_.Seed[seed_.IndividualSeed],
         factory: seed_.Factory[seed_.IndividualSeed],
+        *,
+        cohorts: bool = False,
     ) -> typing.Self:
         shared = SharedStateData.from_seed(seed)
-        individual_states = {}
+        individual_states: dict[str, IndividualStateData] = {}
+        strategies = {}
+        cohort_of: dict[typing.Hashable, str] = {}
         for iseed in seed.initial_individuals:
             (i, istats, strategy) = factory.create_individual(iseed)
+            key = _cohort_key(strategy, istats) if cohorts else None
+            if key is not None and key in cohort_of:
+                individual_states[cohort_of[key]].count += 1
+                continue
+            if key is not None:
+                cohort_of[key] = i
             istate = IndividualStateData.from_stats(i, istats)
             individual_states[i] = istate
+            strategies[i] = strategy
 
         ids = IndividualStates(d=individual_states)
         metrics_ = metrics.MetricsLogger(
@@ -191,7 +234,7 @@ class StateData(pydantic.BaseModel, typing.Generic[seed_.IndividualSeed]):
         individuals = {}
         for i, istate in individual_states.items():
             individuals[i] = individual.Individual(
-                strategy=strategy,
+                strategy=strategies[i],
                 state=IndividualStateImpl(istate, shared_state=shared),
                 metrics=metrics_,
             )
@@ -203,20 +246,40 @@ class StateData(pydantic.BaseModel, typing.Generic[seed_.IndividualSeed]):
             org=org.Org(
                 state=OrgStateImpl(shared, individuals=ids),
                 metrics=metrics_,
+                policy=seed.payroll,
             ),
             factory=factory,
             metrics=metrics_,
         )
 
 
+def _cohort_key(
+    strategy: individual.IndividualStrategy, stats: individual.IndividualStats
+) -> typing.Optional[typing.Hashable]:
+    key = strategy.cohort_key()
+    if key is None:
+        return None
+    # Bit for bit: hex tells apart values that compare equal, such as 0.0 and -0.0.
+    return (key, tuple(float(v).hex() for v in stats.model_dump().values()))
+
+
+class Snapshot(pydantic.BaseModel, typing.Generic[seed_.IndividualSeed]):
+    """The serializable part of `StateData`, without the live individuals, Org and metrics."""
+
+    shared: SharedStateData[seed_.IndividualSeed]
+    individual_states: IndividualStates
+
+
 class GameState(typing.Generic[seed_.IndividualSeed]):
     @classmethod
     def from_seed(
         cls,
         seed: seed_.Seed[seed_.IndividualSeed],
         factory: seed_.Factory[seed_.IndividualSeed],
+        *,
+        cohorts: bool = False,
     ) -> typing.Self:
-        return cls(StateData.from_seed(seed, factory))
+        return cls(StateData.from_seed(seed, factory, cohorts=cohorts))
 
     def __init__(self, data: StateData[seed_.IndividualSeed]) -> None:
         self._data = data
@@ -229,6 +292,10 @@ class GameState(typing.Generic[seed_.IndividualSeed]):
     def days_in_period(self) -> int:
         return self._data.shared.seed.days_in_period
 
+    @property
+    def period(self) -> int:
+        return self._data.shared.period
+
     @property
     def shareholder_value(self) -> float:
         return self._data.shared.shareholder_value
@@ -236,6 +303,9 @@ class GameState(typing.Generic[seed_.IndividualSeed]):
     def score_of(self, identity: str) -> float:
         return self._data.individual_states.d[identity].stats.score
 
+    def count_of(self, identity: str) -> int:
+        return self._data.individual_states.d[identity].count
+
     def obj_of(self, identity: str) -> individual.Individual:
         return self._data.individuals[identity]
 
@@ -260,3 +330,10 @@ class GameState(typing.Generic[seed_.IndividualSeed]):
     @property
     def metrics(self) -> metrics.MetricsLogger:
         return self._data.metrics
+
+    def snapshot(self) -> Snapshot[seed_.IndividualSeed]:
+        """A view of the current state (not a copy) that can be serialized."""
+
+        return Snapshot[seed_.IndividualSeed].model_construct(
+            shared=self._data.shared, individual_states=self._data.individual_states
+        )
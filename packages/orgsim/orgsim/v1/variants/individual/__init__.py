@@ -1,5 +1,19 @@
-# import numpy as np
-from orgsim.v1.game import IndividualStrategy, IndividualStrategyStateView
+import asyncio
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from orgsim import expr
+from orgsim.v1.game import (
+    AsyncIndividualStrategy,
+    BatchIndividualStrategy,
+    IndividualStats,
+    IndividualStrategy,
+    IndividualStrategyStateView,
+)
+from orgsim.v1.game import remote
+from orgsim.v1.game.individual import FEATURES, features_of
 
 
 class Human(IndividualStrategy):
@@ -10,10 +24,223 @@ class Human(IndividualStrategy):
         return v
 
 
+class AsyncHuman(AsyncIndividualStrategy):
+    """`Human` for interactive front ends, which provide `ask` to prompt without blocking."""
+
+    def __init__(self, ask: typing.Callable[[str], typing.Awaitable[str]]) -> None:
+        self._ask = ask
+
+    async def compute_work_coefficient_async(
+        self, state: IndividualStrategyStateView
+    ) -> float:
+        v = -1.0
+        while not (0 < v < 1):
+            v = float(await self._ask("Enter a contirbution value: "))
+        return v
+
+
+class PipeAgent(AsyncIndividualStrategy):
+    """An agent running in a local subprocess, talking over its stdin and stdout.
+
+    For every request the agent reads a line with the Individual's stats as a JSON object and
+    answers with a line holding the work coefficient. One agent may play several Individuals;
+    its requests are sent one at a time.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        if process.stdin is None or process.stdout is None:
+            raise Exception("The agent process needs piped stdin and stdout")
+        self._process = process
+        self._stdin = process.stdin
+        self._stdout = process.stdout
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def start(cls, program: str, *args: str) -> typing.Self:
+        return cls(
+            await asyncio.create_subprocess_exec(
+                program,
+                *args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+            )
+        )
+
+    async def compute_work_coefficient_async(
+        self, state: IndividualStrategyStateView
+    ) -> float:
+        async with self._lock:
+            self._stdin.write(state.stats.model_dump_json().encode() + b"\n")
+            await self._stdin.drain()
+            line = await self._stdout.readline()
+        if not line:
+            raise Exception("The agent process exited")
+        return float(line)
+
+    async def close(self) -> int:
+        self._stdin.close()
+        return await self._process.wait()
+
+
+class RemotePolicy(AsyncIndividualStrategy):
+    """A policy served by a `remote.PolicyServer`, shared by any number of Individuals and games.
+
+    Requests made within one iteration of the event loop (by every game whose turn it is) are
+    collected and sent to the server in a single call. The call runs in the loop's default
+    executor, so the loop goes on meanwhile, and requests made while it is in flight make up
+    the next call: there is at most one at a time, as the client is not thread-safe.
+    """
+
+    def __init__(self, client: remote.PolicyClient) -> None:
+        self._client = client
+        self._pending: list[tuple[IndividualStats, asyncio.Future[float]]] = []
+        self._in_flight = False
+
+    async def compute_work_coefficient_async(
+        self, state: IndividualStrategyStateView
+    ) -> float:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[float] = loop.create_future()
+        self._pending.append((state.stats, future))
+        if len(self._pending) == 1 and not self._in_flight:
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._in_flight or not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self._in_flight = True
+        loop = asyncio.get_running_loop()
+        call = loop.run_in_executor(
+            None, self._client.compute, features_of([s for s, _ in pending])
+        )
+        call.add_done_callback(lambda c: self._resolve(pending, c))
+
+    def _resolve(
+        self,
+        pending: list[tuple[IndividualStats, asyncio.Future[float]]],
+        call: "asyncio.Future[npt.NDArray[np.float64]]",
+    ) -> None:
+        self._in_flight = False
+        if self._pending:
+            asyncio.get_running_loop().call_soon(self._flush)
+
+        # Games that were cancelled meanwhile have given up on their futures.
+        waiting = [(i, f) for i, (_, f) in enumerate(pending) if not f.done()]
+        if call.cancelled():
+            for _, f in waiting:
+                f.cancel()
+        elif (e := call.exception()) is not None:
+            for _, f in waiting:
+                f.set_exception(e)
+        else:
+            ks = call.result().tolist()
+            for i, f in waiting:
+                f.set_result(ks[i])
+
+
 class Slave(IndividualStrategy):
     def compute_work_coefficient(self, state: IndividualStrategyStateView) -> float:
         return 0.9
 
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        return frozenset()
+
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        return Slave
+
+
+class MLP(BatchIndividualStrategy):
+    """A small neural network policy: tanh hidden layers and a sigmoid output.
+
+    Features are squashed with a signed log first, as they are amounts of money and skill that
+    span several orders of magnitude. Each layer is one matrix multiply for all the Individuals
+    sharing this instance.
+    """
+
+    def __init__(
+        self,
+        *,
+        weights: typing.Sequence[npt.NDArray[np.float64]],
+        biases: typing.Sequence[npt.NDArray[np.float64]],
+    ) -> None:
+        if len(weights) != len(biases) or not weights:
+            raise Exception("An MLP needs one bias vector per weight matrix")
+        if weights[0].shape[0] != len(FEATURES) or weights[-1].shape[1] != 1:
+            raise Exception(
+                f"An MLP maps {len(FEATURES)} features to one work coefficient"
+            )
+
+        self._weights = [np.asarray(w, dtype=np.float64) for w in weights]
+        self._biases = [np.asarray(b, dtype=np.float64) for b in biases]
+
+    @classmethod
+    def random(
+        cls, *, hidden: typing.Sequence[int], rng: np.random.Generator
+    ) -> typing.Self:
+        sizes = [len(FEATURES), *hidden, 1]
+        return cls(
+            weights=[
+                rng.normal(scale=1 / np.sqrt(m), size=(m, n))
+                for m, n in zip(sizes[:-1], sizes[1:])
+            ],
+            biases=[np.zeros(n) for n in sizes[1:]],
+        )
+
+    def compute_work_coefficients(
+        self, features: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        x = np.sign(features) * np.log1p(np.abs(features))
+        for w, b in zip(self._weights[:-1], self._biases[:-1]):
+            x = np.tanh(x @ w + b)
+        out = x @ self._weights[-1] + self._biases[-1]
+        return 1 / (1 + np.exp(-out[:, 0]))
+
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        return frozenset(FEATURES)
+
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        return id(self)
+
+
+class ExpressionPolicy(BatchIndividualStrategy):
+    """A work coefficient given by an `expr.Expression` of the Individual's stats (the names in
+    `FEATURES`) and the given `constants`, clipped to [0, 1]. Aggregates (`mean(wealth)`, ...)
+    are taken over all the Individuals playing this instance."""
+
+    def __init__(
+        self,
+        expression: str,
+        *,
+        definitions: typing.Mapping[str, str] = {},
+        constants: typing.Mapping[str, float] = {},
+    ) -> None:
+        self._expression = expr.Expression(expression, definitions=definitions)
+        self._constants = {k: np.float64(v) for k, v in constants.items()}
+
+    def compute_work_coefficients(
+        self, features: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        variables: dict[str, typing.Any] = {
+            name: features[:, i] for i, name in enumerate(FEATURES)
+        }
+        variables.update(self._constants)
+        result = np.asarray(self._expression(variables), dtype=np.float64)
+        ks: npt.NDArray[np.float64] = np.clip(
+            np.broadcast_to(result, (len(features),)), 0, 1
+        )
+        return ks
+
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        names = self._expression.names - self._constants.keys()
+        if self._expression.has_aggregates or not names <= set(FEATURES):
+            return None
+        return frozenset(names)
+
+    def cohort_key(self) -> typing.Optional[typing.Hashable]:
+        return None if self._expression.has_aggregates else id(self)
+
 
 # class Slave(game.IndividualStrategy):
 #     def get_public_data(self) -> game.PublicIndividualData:
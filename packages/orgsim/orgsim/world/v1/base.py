@@ -3,6 +3,8 @@ import typing
 
 import pydantic
 
+from orgsim.framework import events as events_
+
 OrgState = typing.TypeVar("OrgState")
 NatureState = typing.TypeVar("NatureState")
 IndividualState = typing.TypeVar("IndividualState")
@@ -50,9 +52,28 @@ class Candidate(
 Labels: typing.TypeAlias = dict[str, str]
 
 
+class SeriesConfig(pydantic.BaseModel):
+    """How one series is sampled and how much of it is kept.
+
+    The daily (fiscal) value is logged every `daily_interval` days (`fiscal_interval` periods),
+    or never if it is 0. With `retain`, only the most recent points are kept, in a fixed-size
+    ring buffer; with `rollup`, the points pushed out of it are folded into per-period
+    aggregates instead of being dropped, separately for daily and fiscal points.
+    """
+
+    daily_interval: int = pydantic.Field(default=1, ge=0)
+    fiscal_interval: int = pydantic.Field(default=1, ge=0)
+    retain: typing.Optional[int] = pydantic.Field(default=None, ge=1)
+    rollup: bool = False
+
+
 class MetricsConfig(pydantic.BaseModel):
     daily: bool
     fiscal: bool
+    series: dict[str, SeriesConfig] = {}
+
+    def for_series(self, name: str) -> SeriesConfig:
+        return self.series.get(name, SeriesConfig())
 
 
 class Metrics(abc.ABC):
@@ -73,7 +94,11 @@ class Metrics(abc.ABC):
         name: str,
         value: float,
         labels: typing.Optional[Labels] = None,
+        fiscal: bool = False,
     ) -> None:
+        """Log a value of a series, which is a fiscal value (of the period that is ending) or a
+        daily one."""
+
         raise NotImplementedError()
 
 
@@ -268,12 +293,49 @@ class World(
             CandidatePublicData,
             CandidatePrivateData,
         ],
+        events: typing.Optional[events_.EventLog] = None,
     ) -> None:
         self._config = config
         self._metrics_config = self._config.metrics.get_config()
+        self._events = events
+
+        mc = self._metrics_config
+        self._daily_intervals = {
+            name: mc.for_series(name).daily_interval if mc.daily else 0
+            for name in (Metrics.POPULATION, Metrics.SUICIDES, Metrics.KILLED)
+        }
+        self._fiscal_intervals = {
+            name: mc.for_series(name).fiscal_interval if mc.fiscal else 0
+            for name in (
+                Metrics.POPULATION,
+                Metrics.SUICIDES,
+                Metrics.KILLED,
+                Metrics.RECRUITED,
+            )
+        }
+
+    @property
+    def events(self) -> typing.Optional[events_.EventLog]:
+        return self._events
 
-    def _log(self, name: str, value: float) -> None:
-        self._config.metrics.log(state=self._config.state.base, name=name, value=value)
+    @property
+    def state(self) -> State[OrgState, NatureState, IndividualState, CommonState]:
+        return self._config.state
+
+    def _log(self, name: str, value: float, *, fiscal: bool) -> None:
+        self._config.metrics.log(
+            state=self._config.state.base, name=name, value=value, fiscal=fiscal
+        )
+
+    def _log_daily(self, name: str, value: float) -> None:
+        interval = self._daily_intervals[name]
+        if interval and self._config.state.base.date % interval == 0:
+            self._log(name, value, fiscal=False)
+
+    def _log_fiscal(self, name: str, value: float) -> None:
+        interval = self._fiscal_intervals[name]
+        if interval and self._config.state.base.fiscal_period % interval == 0:
+            self._log(name, value, fiscal=True)
 
     def init(self) -> None:
         s = self._config.state
@@ -288,8 +350,7 @@ class World(
             state=s, initial_people=set(self._config.individuals.keys())
         )
 
-        if self._metrics_config.fiscal:
-            self._log(Metrics.RECRUITED, len(self._config.individuals.keys()))
+        self._log_fiscal(Metrics.RECRUITED, len(self._config.individuals.keys()))
 
     def is_empty(self) -> bool:
         return len(self._config.individuals) == 0
@@ -312,12 +373,17 @@ class World(
         if self.is_empty():
             return
 
-        if self._metrics_config.fiscal:
-            self._log(Metrics.POPULATION, len(self._config.individuals.keys()))
-            self._log(Metrics.SUICIDES, self._config.state.base.n_fiscal_suicides)
-            self._log(Metrics.KILLED, self._config.state.base.n_fiscal_killed)
+        self._log_fiscal(Metrics.POPULATION, len(self._config.individuals.keys()))
+        self._log_fiscal(Metrics.SUICIDES, self._config.state.base.n_fiscal_suicides)
+        self._log_fiscal(Metrics.KILLED, self._config.state.base.n_fiscal_killed)
 
         self.perform_recruitment()
+        if self._events is not None:
+            self._events.period_end(
+                date=self._config.state.base.date,
+                period=self._config.state.base.fiscal_period,
+                population=len(self._config.individuals),
+            )
         self._config.state.base.fiscal_period += 1
 
     def run_day(self) -> None:
@@ -348,19 +414,9 @@ class World(
         bstate.n_fiscal_suicides += n_suicides
         bstate.n_fiscal_killed += n_killed
 
-        if self._metrics_config.daily:
-            self._log(
-                Metrics.POPULATION,
-                len(self._config.individuals.keys()),
-            )
-            self._log(
-                Metrics.SUICIDES,
-                n_suicides,
-            )
-            self._log(
-                Metrics.KILLED,
-                n_killed,
-            )
+        self._log_daily(Metrics.POPULATION, len(self._config.individuals.keys()))
+        self._log_daily(Metrics.SUICIDES, n_suicides)
+        self._log_daily(Metrics.KILLED, n_killed)
         self._config.state.base.date += 1
 
     def perform_recruitment(self) -> None:
@@ -393,8 +449,7 @@ class World(
         except StopIteration:
             pass
 
-        if self._metrics_config.fiscal:
-            self._log(Metrics.RECRUITED, recruited)
+        self._log_fiscal(Metrics.RECRUITED, recruited)
 
     def _add_individual(
         self,
@@ -405,6 +460,15 @@ class World(
         self._config.individuals[identity] = individual
         self._config.state.individuals[identity] = state
         individual.init(state=self._config.state, identity=identity)
+        if self._events is not None:
+            self._events.birth(
+                date=self._config.state.base.date,
+                period=self._config.state.base.fiscal_period,
+                identity=identity,
+                traits=events_.flatten_traits(state)
+                if isinstance(state, pydantic.BaseModel)
+                else {},
+            )
 
     def _delete_individual(self, *, identity: str, suicide: bool, killed: bool) -> None:
         self._config.individuals[identity].die(
@@ -412,3 +476,10 @@ class World(
         )
         del self._config.individuals[identity]
         del self._config.state.individuals[identity]
+        if self._events is not None:
+            self._events.death(
+                date=self._config.state.base.date,
+                period=self._config.state.base.fiscal_period,
+                identity=identity,
+                cause=events_.Cause.SUICIDE if suicide else events_.Cause.KILLED,
+            )
@@ -1,12 +1,32 @@
 import abc
+import concurrent.futures
+import html
+import pathlib
+import re
 import typing
 
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-import pandas as pd
+import numpy as np
 
 from . import base
 
+if typing.TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    import pandas as pd
+
+    from orgsim import aggregate
+
+# matplotlib and pandas are imported where they are used, so that simulating (which only needs
+# MetricsStore) does not pay for loading them.
+
+SUMMARY_SERIES: tuple[str, ...] = (
+    base.Metrics.POPULATION,
+    base.Metrics.RECRUITED,
+    base.Metrics.SUICIDES,
+    base.Metrics.KILLED,
+)
+
+SummarySeries: typing.TypeAlias = dict[str, "pd.Series[float]"]
+
 
 class MetricsStore(abc.ABC):
     @abc.abstractmethod
@@ -16,10 +36,54 @@ class MetricsStore(abc.ABC):
         raise NotImplementedError()
 
 
-def plot_world_summary(*, metrics: MetricsStore, filepath: str) -> Figure:
-    fig, ax = plt.subplots(1, 1, figsize=(10, 10))
+def downsample(series: "pd.Series[float]", max_points: int) -> "pd.Series[float]":
+    """Reduce a series to at most `max_points` points while keeping its shape.
+
+    The series is split into equally sized buckets and only the minimum and maximum of every
+    bucket are kept (in their original order), so spikes survive the reduction. This is min/max
+    bucketing rather than LTTB: it keeps every extreme, where LTTB only keeps the points that
+    span the largest triangles. Below 4 points there is no room for a bucket besides the
+    endpoints, and evenly spaced points are picked instead.
+    """
+
+    n = len(series)
+    if n <= max_points:
+        return series
+    if max_points < 4:
+        picks = np.linspace(0, n - 1, max(max_points, 0)).round().astype(np.int64)
+        return series.iloc[np.unique(picks)]
+
+    n_buckets = (max_points - 2) // 2
+    size = -(-n // n_buckets)
+    values = series.to_numpy(dtype=float)
+    padded = np.pad(values, (0, n_buckets * size - n), mode="edge").reshape(
+        n_buckets, size
+    )
+    offsets = np.arange(n_buckets) * size
+    keep = np.concatenate(
+        [
+            [0, n - 1],
+            offsets + np.argmin(padded, axis=1),
+            offsets + np.argmax(padded, axis=1),
+        ]
+    )
+    return series.iloc[np.unique(np.minimum(keep, n - 1))]
+
+
+def extract_summary(
+    metrics: MetricsStore, max_points: typing.Optional[int] = None
+) -> SummarySeries:
+    result: SummarySeries = {}
+    for name in SUMMARY_SERIES:
+        series = metrics.get_fiscal_series(name)
+        result[name] = downsample(series, max_points) if max_points else series
+    return result
 
-    population = metrics.get_fiscal_series(base.Metrics.POPULATION)
+
+def draw_world_summary(*, fig: "Figure", summary: SummarySeries) -> None:
+    ax = fig.subplots(1, 1)
+
+    population = summary[base.Metrics.POPULATION]
     ax.plot(population.index, population, label="Population")
     ax.set_xlabel("Period")
     ax.set_ylabel("Individuals")
@@ -28,15 +92,128 @@ def plot_world_summary(*, metrics: MetricsStore, filepath: str) -> Figure:
 
     ax2 = ax.twinx()
     ax2._get_lines = ax._get_lines  # type: ignore
-    recruited = metrics.get_fiscal_series(base.Metrics.RECRUITED)
-    suicides = metrics.get_fiscal_series(base.Metrics.SUICIDES)
-    killed = metrics.get_fiscal_series(base.Metrics.KILLED)
+    recruited = summary[base.Metrics.RECRUITED]
+    suicides = summary[base.Metrics.SUICIDES]
+    killed = summary[base.Metrics.KILLED]
     ax2.plot(recruited.index, recruited, label="Recruited", linestyle="dashed")
     ax2.plot(suicides.index, suicides, label="Suicides", linestyle="dashed")
     ax2.plot(killed.index, killed, label="Killed", linestyle="dashed")
     ax2.set_ylim(0, max(recruited.max(), suicides.max(), killed.max()) * 1.2)
     ax2.legend(loc="upper right")
 
+
+def plot_world_summary(
+    *,
+    metrics: MetricsStore,
+    filepath: str,
+    max_points: typing.Optional[int] = None,
+) -> "Figure":
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(10, 10))
+    draw_world_summary(fig=fig, summary=extract_summary(metrics, max_points))
     fig.savefig(filepath)
 
     return fig
+
+
+def plot_bands(
+    *,
+    bands: typing.Mapping[str, "aggregate.Bands"],
+    filepath: typing.Optional[str] = None,
+) -> "Figure":
+    """Plot the mean, median and outermost quantile band of every aggregated series."""
+
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(1, 1, figsize=(10, 6))
+    for label, b in bands.items():
+        (line,) = ax.plot(b.index, b.mean, label=f"{label} (mean)")
+        qs = sorted(b.quantiles)
+        if 0.5 in b.quantiles:
+            ax.plot(
+                b.index,
+                b.quantiles[0.5],
+                color=line.get_color(),
+                linestyle="dashed",
+                label=f"{label} (median)",
+            )
+        if len(qs) >= 2:
+            ax.fill_between(
+                b.index,
+                b.quantiles[qs[0]],
+                b.quantiles[qs[-1]],
+                color=line.get_color(),
+                alpha=0.2,
+                label=f"{label} ({qs[0]:g}-{qs[-1]:g})",
+            )
+        ax.set_xlabel(b.on.capitalize())
+    ax.legend(loc="upper left")
+
+    if filepath is not None:
+        fig.savefig(filepath)
+
+    return fig
+
+
+def _render_world_summary(job: tuple[str, SummarySeries, str]) -> str:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    title, summary, filepath = job
+
+    fig = Figure(figsize=(10, 10))
+    FigureCanvasAgg(fig)
+    draw_world_summary(fig=fig, summary=summary)
+    fig.suptitle(title)
+    fig.savefig(filepath)
+
+    return filepath
+
+
+def _slugify(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", name).strip("-") or "run"
+
+
+def render_world_summaries(
+    *,
+    runs: typing.Mapping[str, MetricsStore],
+    directory: str,
+    max_points: int = 2000,
+    max_workers: typing.Optional[int] = None,
+) -> pathlib.Path:
+    """Render the summary of every run into `directory` and write an `index.html` for them.
+
+    Series are downsampled in the calling process, so only a few thousand points per line are
+    shipped to the worker processes, which draw on the Agg canvas without touching pyplot.
+    """
+
+    root = pathlib.Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+
+    jobs = [
+        (
+            title,
+            extract_summary(metrics, max_points),
+            str(root / f"{i:04d}-{_slugify(title)}.png"),
+        )
+        for i, (title, metrics) in enumerate(runs.items())
+    ]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        filepaths = list(executor.map(_render_world_summary, jobs))
+
+    items = "\n".join(
+        f'<figure><img src="{html.escape(pathlib.Path(f).name)}" loading="lazy">'
+        f"<figcaption>{html.escape(title)}</figcaption></figure>"
+        for (title, _, _), f in zip(jobs, filepaths)
+    )
+    index = root / "index.html"
+    index.write_text(
+        "<!DOCTYPE html>\n<html><head><meta charset='utf-8'><title>World summaries</title>"
+        "<style>figure{display:inline-block;width:480px;margin:8px}"
+        "img{width:100%}</style></head>\n"
+        f"<body>\n{items}\n</body></html>\n"
+    )
+
+    return index
@@ -1,11 +1,16 @@
 import typing
 
 import numpy as np
-import pandas as pd
+import numpy.typing as npt
 import pydantic
 
+from orgsim import derived as derived_
+from orgsim.framework import events as events_
 from orgsim.world.v1 import base, explore
 
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
 TimeSeriesEntry: typing.TypeAlias = tuple[int, int, float]
 
 
@@ -18,12 +23,76 @@ class MetricsData(pydantic.BaseModel):
     series_classes: dict[str, TimeSeriesClass]
 
 
-class Metrics(base.Metrics, explore.MetricsStore):
-    def __init__(self) -> None:
+class _Ring:
+    """The most recent `capacity` entries of a series, in preallocated arrays, each with whether
+    it is a fiscal one."""
+
+    def __init__(self, capacity: int) -> None:
+        self._dates = np.zeros(capacity, dtype=np.int64)
+        self._periods = np.zeros(capacity, dtype=np.int64)
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._fiscal = np.zeros(capacity, dtype=np.bool_)
+        self._start = 0
+        self._size = 0
+        self.pushed = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(
+        self, entry: TimeSeriesEntry, fiscal: bool
+    ) -> typing.Optional[tuple[TimeSeriesEntry, bool]]:
+        """Append an entry, returning the oldest one if it had to make room for it."""
+
+        capacity = len(self._values)
+        self.pushed += 1
+        evicted = None
+        if self._size == capacity:
+            evicted = self._entry(self._start), bool(self._fiscal[self._start])
+            k = self._start
+            self._start = (self._start + 1) % capacity
+        else:
+            k = (self._start + self._size) % capacity
+            self._size += 1
+        self._dates[k], self._periods[k], self._values[k] = entry
+        self._fiscal[k] = fiscal
+        return evicted
+
+    def _entry(self, k: int) -> TimeSeriesEntry:
+        return (int(self._dates[k]), int(self._periods[k]), float(self._values[k]))
+
+    def entries(self) -> list[TimeSeriesEntry]:
+        order = (self._start + np.arange(self._size)) % len(self._values)
+        return list(
+            zip(
+                self._dates[order].tolist(),
+                self._periods[order].tolist(),
+                self._values[order].tolist(),
+            )
+        )
+
+
+# period, count, sum, min, max
+RollupEntry: typing.TypeAlias = tuple[int, int, float, float, float]
+
+
+class Metrics(base.Metrics, explore.MetricsStore, derived_.DerivedSeries):
+    def __init__(self, config: typing.Optional[base.MetricsConfig] = None) -> None:
         self._data = MetricsData(series_classes={})
+        self._config = (
+            config
+            if config is not None
+            else base.MetricsConfig(daily=True, fiscal=True)
+        )
+        self._rings: dict[str, dict[int, _Ring]] = {}
+        self._rollups: dict[str, dict[tuple[int, bool], list[RollupEntry]]] = {}
+        self._init_derived()
+
+    def _logged_classes(self) -> dict[str, TimeSeriesClass]:
+        return self._data.series_classes
 
     def get_config(self) -> base.MetricsConfig:
-        return base.MetricsConfig(daily=True, fiscal=True)
+        return self._config
 
     def log(
         self,
@@ -32,6 +101,7 @@ class Metrics(base.Metrics, explore.MetricsStore):
         name: str,
         value: float,
         labels: typing.Optional[base.Labels] = None,
+        fiscal: bool = False,
     ) -> None:
         if name not in self._data.series_classes:
             self._data.series_classes[name] = TimeSeriesClass(
@@ -46,15 +116,80 @@ class Metrics(base.Metrics, explore.MetricsStore):
         if lid not in sc.series:
             sc.series[lid] = []
 
-        ts = sc.series[lid]
-        ts.append((state.date, state.fiscal_period, value))
+        entry = (state.date, state.fiscal_period, value)
+        series_config = self._config.for_series(name)
+        if series_config.retain is None:
+            sc.series[lid].append(entry)
+            return
+
+        rings = self._rings.setdefault(name, {})
+        if lid not in rings:
+            rings[lid] = _Ring(series_config.retain)
+        evicted = rings[lid].push(entry, fiscal)
+        if evicted is not None and series_config.rollup:
+            self._roll_up(name, lid, *evicted)
+
+    def _roll_up(
+        self, name: str, lid: int, entry: TimeSeriesEntry, fiscal: bool
+    ) -> None:
+        rollups = self._rollups.setdefault(name, {}).setdefault((lid, fiscal), [])
+        _, period, value = entry
+        if rollups and rollups[-1][0] == period:
+            _, count, total, lo, hi = rollups[-1]
+            rollups[-1] = (
+                period,
+                count + 1,
+                total + value,
+                min(lo, value),
+                max(hi, value),
+            )
+        else:
+            rollups.append((period, 1, value, value, value))
+
+    def _retained(
+        self, name: str, lid: int
+    ) -> tuple[typing.Sequence[TimeSeriesEntry], int]:
+        ring = self._rings.get(name, {}).get(lid)
+        if ring is not None:
+            return ring.entries(), ring.pushed
+        return super()._retained(name, lid)
+
+    def _entries(self, name: str, lid: int) -> list[TimeSeriesEntry]:
+        ring = self._rings.get(name, {}).get(lid)
+        if ring is not None:
+            return ring.entries()
+        return self._data.series_classes[name].series[lid]
+
+    @property
+    def data(self) -> MetricsData:
+        """The retained entries of every series (copied out of their buffers, if any)."""
+
+        series_classes = dict(self._data.series_classes)
+        for name, rings in self._rings.items():
+            sc = series_classes[name]
+            series_classes[name] = TimeSeriesClass(
+                label_mapping=sc.label_mapping,
+                series={
+                    lid: rings[lid].entries() if lid in rings else series
+                    for lid, series in sc.series.items()
+                },
+            )
+        return MetricsData(series_classes=series_classes)
+
+    def series_names(self) -> list[str]:
+        return [*self._data.series_classes, *self._derived.names()]
 
     def _generate_labels_identity(self, labels: base.Labels) -> int:
         return hash(frozenset(list(labels.items())))
 
     def get_series_in_class(
         self, name: str, filter_labels: typing.Optional[base.Labels] = None
-    ) -> typing.Iterable[tuple[pd.DataFrame, base.Labels]]:
+    ) -> "typing.Iterable[tuple[pd.DataFrame, base.Labels]]":
+        import pandas as pd
+
+        if name in self._derived:
+            yield from self._derived_series_in_class(name, filter_labels)
+            return
         if name not in self._data.series_classes:
             raise Exception(f"No such series class: {name}")
         sc = self._data.series_classes[name]
@@ -67,13 +202,19 @@ class Metrics(base.Metrics, explore.MetricsStore):
             ):
                 continue
             yield (
-                pd.DataFrame(sc.series[lid], columns=["date", "period", "value"]),
+                pd.DataFrame(
+                    self._entries(name, lid), columns=["date", "period", "value"]
+                ),
                 labels,
             )
 
     def get_fiscal_series(
         self, name: str, labels: typing.Optional[base.Labels] = None
     ) -> "pd.Series[float]":
+        import pandas as pd
+
+        if name in self._derived and not labels:
+            return self._derived_fiscal_series(name)
         if name not in self._data.series_classes:
             raise Exception(f"No such series class: {name}")
         sc = self._data.series_classes[name]
@@ -83,9 +224,27 @@ class Metrics(base.Metrics, explore.MetricsStore):
         if lid not in sc.label_mapping or lid not in sc.series:
             raise Exception(f"Series {name} does not have label set: {the_labels}")
 
-        series = sc.series[lid]
+        series = self._entries(name, lid)
         return pd.Series([s[2] for s in series], index=[s[1] for s in series])
 
+    def get_rollups(
+        self,
+        name: str,
+        labels: typing.Optional[base.Labels] = None,
+        *,
+        fiscal: bool = False,
+    ) -> "pd.DataFrame":
+        """Per-period aggregates of the daily (or fiscal) points that no longer fit in the
+        series' buffer."""
+
+        import pandas as pd
+
+        lid = self._generate_labels_identity(labels if labels is not None else {})
+        rollups = self._rollups.get(name, {}).get((lid, fiscal), [])
+        df = pd.DataFrame(rollups, columns=["period", "count", "sum", "min", "max"])
+        df["mean"] = df["sum"] / df["count"]
+        return df.drop(columns="sum")
+
 
 class CandidatePublicData(pydantic.BaseModel):
     pass
@@ -98,6 +257,19 @@ class CandidatePrivateData(pydantic.BaseModel):
 Candidate = base.Candidate[CandidatePublicData, CandidatePrivateData]
 
 
+def make_candidates(selfishness: npt.NDArray[np.float64]) -> list[Candidate]:
+    """Build candidates in bulk from already generated traits, skipping validation."""
+
+    public_data = CandidatePublicData.model_construct()
+    return [
+        Candidate.model_construct(
+            public_data=public_data,
+            private_data=CandidatePrivateData.model_construct(selfishness=s),
+        )
+        for s in selfishness.tolist()
+    ]
+
+
 class OrgSeed(pydantic.BaseModel):
     recruit_count_per_period: int
 
@@ -229,15 +401,8 @@ class Nature(
         N = 10
         while True:
             rands = np.random.normal(loc=m, scale=0.05, size=N)
-            for r in rands:
-                identity = self._generate_identity(state=state.nature)
-                yield (
-                    identity,
-                    Candidate(
-                        public_data=CandidatePublicData(),
-                        private_data=CandidatePrivateData(selfishness=r),
-                    ),
-                )
+            for candidate in make_candidates(rands):
+                yield (self._generate_identity(state=state.nature), candidate)
 
     def _generate_identity(self, state: NatureState) -> str:
         state.identity_counter += 1
@@ -248,7 +413,10 @@ class Nature(
         *,
         candidate: Candidate,
     ) -> tuple[Individual, IndividualState]:
-        return (Individual(), IndividualState(candidate=candidate, age=0))
+        return (
+            Individual(),
+            IndividualState.model_construct(candidate=candidate, age=0),
+        )
 
     def generate_initial_individuals(
         self, state: NatureState
@@ -269,9 +437,10 @@ class Nature(
         for c in state.seed.initial_candidates:
             result[self._generate_identity(state)] = (
                 Individual(),
-                IndividualState(
-                    candidate=Candidate(
-                        public_data=CandidatePublicData(), private_data=c
+                IndividualState.model_construct(
+                    candidate=Candidate.model_construct(
+                        public_data=CandidatePublicData.model_construct(),
+                        private_data=c,
                     ),
                     age=0,
                 ),
@@ -333,7 +502,9 @@ class Seed(pydantic.BaseModel):
 
 
 def create_model(
-    seed: Seed, metrics: base.Metrics
+    seed: Seed,
+    metrics: base.Metrics,
+    events: typing.Optional[events_.EventLog] = None,
 ) -> base.World[
     OrgState,
     NatureState,
@@ -342,6 +513,9 @@ def create_model(
     CandidatePublicData,
     CandidatePrivateData,
 ]:
+    if events is not None:
+        events.begin(engine="world.v1", seed=seed)
+
     nature = Nature()
     return base.World(
         config=base.WorldConfig(
@@ -356,5 +530,41 @@ def create_model(
             individuals={},
             nature=nature,
             metrics=metrics,
-        )
+        ),
+        events=events,
     )
+
+
+def replay_model(
+    events: events_.EventLog, metrics: base.Metrics
+) -> base.World[
+    OrgState,
+    NatureState,
+    IndividualState,
+    CommonState,
+    CandidatePublicData,
+    CandidatePrivateData,
+]:
+    """Re-run a world recorded by `create_model` (from `init`), e.g. into metrics that log more.
+
+    The seed and the RNG state are taken from the log. The replay is checked against the log
+    and raises if it diverges.
+    """
+
+    if events.header.get("engine") != "world.v1":
+        raise Exception(f"Cannot replay a {events.header.get('engine')} event log")
+
+    seed = Seed.model_validate_json(events.header["seed"])
+    np.random.set_state(events.rng_state())
+    replay = events_.EventLog()
+    world = create_model(seed, metrics, events=replay)
+    world.init()
+    for _ in range(events.completed_periods()):
+        if world.is_empty():
+            break
+        world.run_period()
+
+    if not replay.equals(events):
+        raise Exception("The replay diverged from the event log")
+
+    return world
@@ -0,0 +1,521 @@
+"""Animated timeline of a run: its series over time and what every individual is doing.
+
+Frames are drawn incrementally with blitting. The static parts of the figure (axes, ticks, labels)
+are rendered once into a background that is restored for every frame, and only the lines, the
+traces of the individuals and the date are drawn on top of it. The figure is redrawn in full
+only when the data outgrows the axes, whose limits double every time, so that happens a
+logarithmic number of times over a run. Series are decimated to the envelope of their values,
+individuals are represented by a stable sample whose traces are thinned out as they grow, and
+frames are streamed to an encoder in a separate process (a GIF with Pillow, or anything else
+with ffmpeg) while the next ones are drawn.
+"""
+
+import math
+import multiprocessing
+import pathlib
+import queue as queue_
+import shutil
+import subprocess
+import typing
+import zlib
+
+
+from . import base
+
+if typing.TYPE_CHECKING:
+    from orgsim.world.v1.models import v1
+
+
+# How long to wait for room in the queue of frames before checking that the encoder still runs.
+ENCODER_TIMEOUT = 1.0
+
+
+class Frame(typing.NamedTuple):
+    date: int
+    values: typing.Mapping[str, float]
+    individuals: typing.Optional[typing.Mapping[str, float]] = None
+
+
+def sample_individuals(
+    identities: typing.Iterable[str], max_individuals: int
+) -> list[str]:
+    """A bottom-k sample by hash: an individual stays in it for as long as it lives, unless
+    newcomers with lower hashes push it out."""
+
+    return sorted(identities, key=lambda i: zlib.crc32(i.encode()))[:max_individuals]
+
+
+class Envelope:
+    """A series decimated into at most `max_points` points that keep its extremes.
+
+    Days are grouped into buckets of `stride` days, and every bucket keeps only its lowest and
+    highest values. Once there are too many buckets, neighbouring ones are merged and the stride
+    doubles, so a line stays as cheap to draw however long the run, and spikes are not lost.
+    """
+
+    def __init__(self, max_points: int) -> None:
+        # Buckets of [start, low date, low, high date, high]; empty ones have NaN values.
+        self._buckets: list[list[float]] = []
+        self._stride = 1
+        self._max_buckets = max(max_points // 2, 1)
+        self._last: typing.Optional[tuple[float, float]] = None
+
+    def add(self, date: int, value: float) -> None:
+        self._last = (date, value)
+        if not self._buckets or date >= self._buckets[-1][0] + self._stride:
+            self._buckets.append([date, date, math.nan, date, math.nan])
+            if len(self._buckets) > self._max_buckets:
+                self._stride *= 2
+                self._buckets = [
+                    self._merge(self._buckets[i : i + 2])
+                    for i in range(0, len(self._buckets), 2)
+                ]
+        bucket = self._buckets[-1]
+        if not math.isnan(value):
+            if math.isnan(bucket[2]) or value < bucket[2]:
+                bucket[1], bucket[2] = date, value
+            if math.isnan(bucket[4]) or value > bucket[4]:
+                bucket[3], bucket[4] = date, value
+
+    @staticmethod
+    def _merge(buckets: list[list[float]]) -> list[float]:
+        merged = list(buckets[0])
+        for bucket in buckets[1:]:
+            if math.isnan(merged[2]) or bucket[2] < merged[2]:
+                merged[1], merged[2] = bucket[1], bucket[2]
+            if math.isnan(merged[4]) or bucket[4] > merged[4]:
+                merged[3], merged[4] = bucket[3], bucket[4]
+        return merged
+
+    def points(self) -> tuple[list[float], list[float]]:
+        """The points to draw, in order of date, ending with the last value added."""
+
+        xs: list[float] = []
+        ys: list[float] = []
+        for start, low_date, low, high_date, high in self._buckets:
+            if math.isnan(low):
+                # Nothing was logged: break the line, like the NaN of a missing day would.
+                xs.append(start)
+                ys.append(math.nan)
+            elif low_date == high_date:
+                xs.append(low_date)
+                ys.append(low)
+            else:
+                first, second = sorted([(low_date, low), (high_date, high)])
+                xs.extend((first[0], second[0]))
+                ys.extend((first[1], second[1]))
+        if self._last is not None and (not xs or xs[-1] != self._last[0]):
+            xs.append(self._last[0])
+            ys.append(self._last[1])
+        return xs, ys
+
+
+def _encode(
+    queue: "multiprocessing.Queue[typing.Optional[bytes]]",
+    filepath: str,
+    size: tuple[int, int],
+    fps: int,
+) -> None:
+    if filepath.endswith(".gif"):
+        _encode_gif(queue, filepath, size, fps)
+    else:
+        _encode_ffmpeg(queue, filepath, size, fps)
+
+
+def _encode_gif(
+    queue: "multiprocessing.Queue[typing.Optional[bytes]]",
+    filepath: str,
+    size: tuple[int, int],
+    fps: int,
+) -> None:
+    from PIL import GifImagePlugin, Image
+
+    # Frames are written out as they come rather than handed to `Image.save` all at once, which
+    # would hold every one of them in memory. They all share the fixed web palette, which is
+    # orders of magnitude faster than an adaptive one, and plenty for flat-coloured plots.
+    info = {"loop": 0, "duration": 1000 // fps, "optimize": False}
+    f: typing.Optional[typing.BinaryIO] = None
+    try:
+        while (data := queue.get()) is not None:
+            frame = (
+                Image.frombuffer("RGBA", size, data, "raw", "RGBA", 0, 1)
+                .convert("RGB")
+                .convert("P", palette=Image.Palette.WEB, dither=Image.Dither.NONE)
+            )
+            if f is None:
+                f = open(filepath, "wb")
+                header, _ = GifImagePlugin.getheader(frame, info=dict(info))
+                f.writelines(header)
+            f.writelines(GifImagePlugin.getdata(frame, duration=info["duration"]))
+        if f is not None:
+            f.write(b";")
+    except BaseException:
+        _drain(queue)
+        raise
+    finally:
+        if f is not None:
+            f.close()
+
+
+def _encode_ffmpeg(
+    queue: "multiprocessing.Queue[typing.Optional[bytes]]",
+    filepath: str,
+    size: tuple[int, int],
+    fps: int,
+) -> None:
+    ffmpeg = subprocess.Popen(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgba",
+            "-s",
+            f"{size[0]}x{size[1]}",
+            "-r",
+            str(fps),
+            "-i",
+            "-",
+            "-pix_fmt",
+            "yuv420p",
+            filepath,
+        ],
+        stdin=subprocess.PIPE,
+    )
+    assert ffmpeg.stdin is not None
+    try:
+        while (data := queue.get()) is not None:
+            ffmpeg.stdin.write(data)
+        ffmpeg.stdin.close()
+    except BrokenPipeError:
+        # ffmpeg is gone: report the failure below.
+        _drain(queue)
+    returncode = ffmpeg.wait()
+    if returncode != 0:
+        raise Exception(f"ffmpeg failed with exit code {returncode}")
+
+
+def _drain(queue: "multiprocessing.Queue[typing.Optional[bytes]]") -> None:
+    """Keep taking frames until the renderer is done, so that it is not blocked on a full queue
+    after the encoder failed."""
+
+    while queue.get() is not None:
+        pass
+
+
+class TimelineRenderer:
+    def __init__(
+        self,
+        *,
+        filepath: str,
+        series: typing.Sequence[str] = (
+            base.Metrics.POPULATION,
+            base.Metrics.SUICIDES,
+            base.Metrics.KILLED,
+        ),
+        individuals_label: str = "Individuals",
+        frame_interval: int = 1,
+        fps: int = 25,
+        figsize: tuple[float, float] = (8, 6),
+        dpi: int = 80,
+        max_individuals: int = 100,
+        max_trace_points: int = 256,
+        max_series_points: int = 1024,
+    ) -> None:
+        """Render frames into `filepath` (a `.gif`, or any format ffmpeg writes).
+
+        One frame is drawn every `frame_interval` days; the days in between are still plotted,
+        through the `Envelope` of every series.
+        """
+
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        if not filepath.endswith(".gif") and shutil.which("ffmpeg") is None:
+            raise Exception("Encoding anything but GIFs needs ffmpeg")
+        # Fail on a path that cannot be written now, rather than in the encoder.
+        open(filepath, "wb").close()
+
+        self._series = list(series)
+        self._frame_interval = frame_interval
+        self._max_individuals = max_individuals
+        self._max_trace_points = max_trace_points
+        self.redraws = 0
+        self.frames = 0
+
+        self._fig = Figure(figsize=figsize, dpi=dpi)
+        self._canvas = FigureCanvasAgg(self._fig)
+        self._ax, self._ax_individuals = self._fig.subplots(2, 1, sharex=True)
+        self._ax.set_ylabel("Count")
+        self._ax_individuals.set_ylabel(individuals_label)
+        self._ax_individuals.set_xlabel("Day")
+
+        self._lines = {
+            name: self._ax.plot([], [], label=name, animated=True)[0]
+            for name in self._series
+        }
+        self._ax.legend(loc="upper left")
+        # All traces are one line broken up by NaNs, which Agg draws as a single path.
+        (self._traces,) = self._ax_individuals.plot(
+            [], [], linewidth=0.5, color="tab:gray", animated=True
+        )
+        self._date_text = self._ax.text(
+            0.99,
+            0.95,
+            "",
+            transform=self._ax.transAxes,
+            ha="right",
+            va="top",
+            animated=True,
+        )
+
+        self._last_date: typing.Optional[int] = None
+        self._envelopes = {name: Envelope(max_series_points) for name in self._series}
+        self._trace_data: dict[str, tuple[list[int], list[float]]] = {}
+        self._trace_stride: dict[str, int] = {}
+        self._xmax = 1.0
+        self._ymax = 1.0
+        self._iymin, self._iymax = 0.0, 1.0
+        self._last_frame: typing.Optional[int] = None
+        self._background: typing.Any = None
+        self._set_limits()
+
+        width, height = self._canvas.get_width_height()
+        # The encoder is spawned rather than forked: the renderer may live in a process that
+        # runs other threads, which a forked child could deadlock on.
+        context = multiprocessing.get_context("spawn")
+        self._queue: "multiprocessing.Queue[typing.Optional[bytes]]" = context.Queue(
+            maxsize=64
+        )
+        self._encoder = context.Process(
+            target=_encode,
+            args=(self._queue, str(pathlib.Path(filepath)), (width, height), fps),
+            daemon=True,
+        )
+        self._encoder.start()
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    @property
+    def series(self) -> list[str]:
+        return self._series
+
+    @property
+    def traced(self) -> list[str]:
+        """The individuals whose traces are drawn."""
+
+        return list(self._trace_data)
+
+    def _set_limits(self) -> None:
+        self._ax.set_xlim(0, self._xmax)
+        self._ax.set_ylim(0, self._ymax)
+        self._ax_individuals.set_ylim(self._iymin, self._iymax)
+        self._background = None
+
+    def add(self, frame: Frame) -> None:
+        """Add the data of a day, and draw a frame if one is due."""
+
+        self._last_date = frame.date
+        for name in self._series:
+            self._envelopes[name].add(frame.date, frame.values.get(name, math.nan))
+        if frame.individuals is not None:
+            self._add_individuals(frame.date, frame.individuals)
+
+        grown = False
+        while frame.date > self._xmax:
+            self._xmax *= 2
+            grown = True
+        top = max((v for v in frame.values.values() if math.isfinite(v)), default=0)
+        while top > self._ymax:
+            self._ymax *= 2
+            grown = True
+        if grown:
+            self._set_limits()
+
+        if (
+            self._last_frame is None
+            or frame.date - self._last_frame >= self._frame_interval
+        ):
+            self._draw(frame.date)
+
+    def _add_individuals(
+        self, date: int, individuals: typing.Mapping[str, float]
+    ) -> None:
+        sampled = sample_individuals(individuals, self._max_individuals)
+        keep = set(sampled)
+        for identity in list(self._trace_data):
+            if identity not in keep:
+                del self._trace_data[identity]
+                del self._trace_stride[identity]
+
+        grown = False
+        for identity in sampled:
+            value = individuals[identity]
+            dates, values = self._trace_data.setdefault(identity, ([], []))
+            stride = self._trace_stride.setdefault(identity, 1)
+            if dates and date - dates[-1] < stride:
+                continue
+            dates.append(date)
+            values.append(value)
+            if len(dates) > self._max_trace_points:
+                # Thin the trace out to every other point and sample half as often from now on.
+                del dates[1::2], values[1::2]
+                self._trace_stride[identity] = 2 * stride
+            while value > self._iymax:
+                self._iymax = self._iymax * 2 if self._iymax > 0 else 1
+                grown = True
+            while value < self._iymin:
+                self._iymin = self._iymin * 2 if self._iymin < 0 else -1
+                grown = True
+        if grown:
+            self._set_limits()
+
+    def _draw(self, date: int) -> None:
+        if self._background is None:
+            self._canvas.draw()  # type: ignore[no-untyped-call]
+            self._background = self._canvas.copy_from_bbox(self._fig.bbox)  # type: ignore[no-untyped-call]
+            self.redraws += 1
+        self._canvas.restore_region(self._background)  # type: ignore[no-untyped-call]
+
+        for name, line in self._lines.items():
+            line.set_data(*self._envelopes[name].points())
+            self._ax.draw_artist(line)
+        xs: list[float] = []
+        ys: list[float] = []
+        for dates, values in self._trace_data.values():
+            xs.extend(dates)
+            ys.extend(values)
+            xs.append(math.nan)
+            ys.append(math.nan)
+        self._traces.set_data(xs, ys)
+        self._ax_individuals.draw_artist(self._traces)
+        self._date_text.set_text(f"Day {date}")
+        self._ax.draw_artist(self._date_text)
+        self._canvas.blit(self._fig.bbox)
+
+        self._put(bytes(self._canvas.buffer_rgba()))  # type: ignore[no-untyped-call]
+        self._last_frame = date
+        self.frames += 1
+
+    def close(self) -> None:
+        """Draw the last day if it has not been drawn yet and wait for the encoder to finish."""
+
+        if self._last_date is not None and self._last_frame != self._last_date:
+            self._draw(self._last_date)
+        self._put(None)
+        self._encoder.join()
+        self._check_encoder()
+
+    def _put(self, data: typing.Optional[bytes]) -> None:
+        # The encoder drains the queue when it fails, but it may die before it gets to.
+        while True:
+            try:
+                self._queue.put(data, timeout=ENCODER_TIMEOUT)
+                return
+            except queue_.Full:
+                if not self._encoder.is_alive():
+                    self._check_encoder()
+                    raise Exception("The encoder stopped taking frames")
+
+    def _check_encoder(self) -> None:
+        if self._encoder.exitcode not in (None, 0):
+            raise Exception(
+                f"The encoder failed with exit code {self._encoder.exitcode}"
+            )
+
+
+def frames_from_metrics(
+    metrics: "v1.Metrics", series: typing.Sequence[str]
+) -> typing.Iterator[Frame]:
+    """The days of a finished run, one frame per logged date (later values of a date win)."""
+
+    by_date: dict[int, dict[str, float]] = {}
+    logged = metrics.series_names()
+    for name in (n for n in series if n in logged):
+        for df, labels in metrics.get_series_in_class(name):
+            if labels:
+                continue
+            for date, value in zip(df["date"].tolist(), df["value"].tolist()):
+                by_date.setdefault(date, {})[name] = value
+    for date in sorted(by_date):
+        yield Frame(date=date, values=by_date[date])
+
+
+def render_timeline(
+    *, metrics: "v1.Metrics", filepath: str, **kwargs: typing.Any
+) -> TimelineRenderer:
+    renderer = TimelineRenderer(filepath=filepath, **kwargs)
+    with renderer:
+        for frame in frames_from_metrics(metrics, renderer.series):
+            renderer.add(frame)
+    return renderer
+
+
+class LiveTimeline(base.Metrics):
+    """Metrics that also feed a renderer while the world runs.
+
+    The values logged on a date make up the frame of that day, which is added once the world
+    moves on to the next date. `individuals`, if given, is called then for the current value of
+    every individual.
+    """
+
+    def __init__(
+        self,
+        *,
+        metrics: base.Metrics,
+        renderer: TimelineRenderer,
+        individuals: typing.Optional[
+            typing.Callable[[], typing.Mapping[str, float]]
+        ] = None,
+    ) -> None:
+        self._metrics = metrics
+        self._renderer = renderer
+        self._individuals = individuals
+        self._date: typing.Optional[int] = None
+        self._values: dict[str, float] = {}
+
+    def get_config(self) -> base.MetricsConfig:
+        return self._metrics.get_config()
+
+    def log(
+        self,
+        *,
+        state: base.BaseWorldState,
+        name: str,
+        value: float,
+        labels: typing.Optional[base.Labels] = None,
+        fiscal: bool = False,
+    ) -> None:
+        self._metrics.log(
+            state=state, name=name, value=value, labels=labels, fiscal=fiscal
+        )
+        if labels:
+            return
+        if self._date is not None and state.date != self._date:
+            self._flush()
+        self._date = state.date
+        self._values[name] = value
+
+    def _flush(self) -> None:
+        if self._date is None:
+            return
+        self._renderer.add(
+            Frame(
+                date=self._date,
+                values=self._values,
+                individuals=self._individuals() if self._individuals else None,
+            )
+        )
+        self._values = {}
+
+    def close(self) -> None:
+        self._flush()
+        self._date = None
+        self._renderer.close()
@@ -0,0 +1,53 @@
+"""Worlds, seeds and strategies shared by the tests of the framework (and of history)."""
+
+import numpy as np
+
+from orgsim import common, framework, models
+
+
+def create_strategy() -> models.DefaultWorldStrategy:
+    id_gen = common.SequentialIdentityGenerator()
+    return models.DefaultWorldStrategy(
+        identity_generator=id_gen,
+        reward_distribution_strategy=models.EqualContribution(),
+        recruitment_strategy=models.recruitment.AverageOfEveryone(
+            identity_generator=id_gen
+        ),
+        person_action_strategy=models.person.ConstantSelfishness(),
+    )
+
+
+def create_seed() -> framework.WorldSeed[models.person.PersonSeed]:
+    return framework.WorldSeed[models.person.PersonSeed](
+        initial_people={
+            models.person.PersonSeed(selfishness=s) for s in np.linspace(0.05, 0.95, 20)
+        },
+        fiscal_length=10,
+        productivity=1.5,
+        initial_individual_wealth=5,
+        daily_salary=1,
+        daily_living_cost=1.1,
+        periodic_recruit_count=3,
+        max_age=120,
+    )
+
+
+def create_world() -> tuple[
+    framework.World[models.person.PersonSeed], models.DefaultWorldStrategy
+]:
+    """A small world of four people, with a strategy that keeps its metrics."""
+
+    strategy = create_strategy()
+    seed = framework.WorldSeed[models.person.PersonSeed](
+        initial_people={
+            models.person.PersonSeed(selfishness=s) for s in (0.1, 0.3, 0.5, 0.7)
+        },
+        fiscal_length=5,
+        productivity=1.0,
+        initial_individual_wealth=10,
+        daily_salary=1,
+        daily_living_cost=1.2,
+        periodic_recruit_count=1,
+        max_age=100,
+    )
+    return framework.create_world(seed=seed, strategy=strategy), strategy
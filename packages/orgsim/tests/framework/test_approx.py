@@ -0,0 +1,165 @@
+import numpy as np
+import numpy.typing as npt
+
+from orgsim import common, framework, models
+from orgsim.framework import approx
+
+
+def create_strategy() -> models.DefaultWorldStrategy:
+    id_gen = common.SequentialIdentityGenerator()
+    return models.DefaultWorldStrategy(
+        identity_generator=id_gen,
+        reward_distribution_strategy=models.EqualContribution(),
+        recruitment_strategy=models.recruitment.AverageOfEveryone(
+            identity_generator=id_gen
+        ),
+        person_action_strategy=models.person.ConstantSelfishness(),
+    )
+
+
+def create_seed(
+    *, fiscal_length: int = 10, recruits: int = 40
+) -> framework.WorldSeed[models.person.PersonSeed]:
+    # Recruitment outpaces deaths, so the population grows to several hundred people, who
+    # all die of age.
+    return framework.WorldSeed[models.person.PersonSeed](
+        initial_people={
+            models.person.PersonSeed(selfishness=s) for s in np.linspace(0.05, 0.95, 50)
+        },
+        fiscal_length=fiscal_length,
+        productivity=1.5,
+        initial_individual_wealth=5,
+        daily_salary=1,
+        daily_living_cost=1.1,
+        periodic_recruit_count=recruits,
+        max_age=150,
+    )
+
+
+def run(
+    cap: approx.PopulationCap | None,
+    rng_seed: int,
+    seed: framework.WorldSeed[models.person.PersonSeed],
+    periods: int,
+) -> tuple[models.DefaultWorldStrategy, framework.World[models.person.PersonSeed]]:
+    np.random.seed(rng_seed)
+    strategy = create_strategy()
+    world = framework.create_world(
+        seed,
+        strategy,
+        initial_people=sorted(seed.initial_people, key=lambda p: p.selfishness),
+        population_cap=cap,
+    )
+    for _ in range(periods):
+        world.run_period()
+    return strategy, world
+
+
+def finals(
+    cap: approx.PopulationCap | None,
+    seed: framework.WorldSeed[models.person.PersonSeed],
+    periods: int,
+) -> dict[str, npt.NDArray[np.float64]]:
+    """The final values of the main series, over a few RNG seeds."""
+
+    runs = []
+    for rng_seed in range(4):
+        strategy, world = run(cap, rng_seed, seed, periods)
+        if cap is not None:
+            assert len(world.state.people_states) <= cap.max_records
+        runs.append(strategy.metrics)
+    return {
+        name: np.array([m.get_fiscal_series(name).iloc[-1] for m in runs])
+        for name in ("population", "avg_selfishness", "avg_wealth", "avg_age")
+    }
+
+
+def assert_within_noise(
+    capped: npt.NDArray[np.float64], exact: npt.NDArray[np.float64]
+) -> None:
+    """The means differ by less than their run-to-run noise allows: 4 standard errors of the
+    difference, which a difference of means over 4 runs each exceeds about 1% of the time (t
+    distribution with about 6 degrees of freedom)."""
+
+    se = np.sqrt(capped.var(ddof=1) / len(capped) + exact.var(ddof=1) / len(exact))
+    assert abs(capped.mean() - exact.mean()) <= 4 * se
+
+
+def test_merge_conserves_population_and_wealth() -> None:
+    rng = np.random.default_rng(0)
+    people = framework.create_people(
+        seeds=models.person.PersonSeed.from_arrays(selfishness=rng.random(500)),
+        identities=[str(i) for i in range(500)],
+        wealth=0,
+    )
+    for p in people.values():
+        p.wealth = float(rng.exponential(10))
+        p.age = int(rng.integers(0, 100))
+    total_wealth = sum(p.wealth for p in people.values())
+
+    merged = approx.merge_people(
+        people, cap=approx.PopulationCap(max_records=60), rng=rng
+    )
+
+    assert len(merged) <= 60
+    assert sum(p.weight for p in merged.values()) == 500
+    assert all(p.weight == 1 for p in people.values())
+    np.testing.assert_allclose(
+        sum(p.wealth * p.weight for p in merged.values()), total_wealth
+    )
+
+
+def test_resample_by_weight_follows_the_weights() -> None:
+    items = ["a", "b", "c"]
+    result = approx.resample_by_weight(
+        items, [1.0, 2.0, 7.0], rng=np.random.default_rng(0)
+    )
+    assert [result.count(i) for i in items] == [1, 2, 7]
+
+
+def test_capped_world_tracks_the_exact_one() -> None:
+    # There are 15 ages at a time (people are recruited once a period), so records never mix
+    # ages, and everybody dies of age: the population is exactly that of the exact world.
+    seed = create_seed()
+    exact = finals(None, seed, 30)
+    capped = finals(approx.PopulationCap(max_records=50), seed, 30)
+
+    assert exact["population"].min() > 300
+    np.testing.assert_array_equal(capped["population"], exact["population"])
+    np.testing.assert_array_equal(capped["avg_age"], exact["avg_age"])
+    assert_within_noise(capped["avg_wealth"], exact["avg_wealth"])
+    assert_within_noise(capped["avg_selfishness"], exact["avg_selfishness"])
+
+
+def test_records_of_many_ages_die_gradually() -> None:
+    # People are recruited every day, so there are more ages than records: merged records
+    # span several ages, and lose their oldest members one day at a time.
+    seed = create_seed(fiscal_length=1, recruits=4)
+    exact = finals(None, seed, 170)
+    capped = finals(approx.PopulationCap(max_records=50), seed, 170)
+
+    assert exact["population"].min() > 500
+    for name in ("population", "avg_age", "avg_wealth", "avg_selfishness"):
+        assert_within_noise(capped[name], exact[name])
+
+
+def test_cull_takes_out_the_members_past_the_limits() -> None:
+    people = framework.create_people(
+        seeds=models.person.PersonSeed.from_arrays(selfishness=np.array([0.5])),
+        identities=["1"],
+        wealth=0,
+    )
+    record = people["1"]
+    # 100 people aged 95 to 105 (11 ages), with wealth evenly spread between -1 and 9.
+    record.weight, record.age, record.age_spread = 100, 100, 5
+    record.wealth, record.wealth_spread = 4, 5
+
+    approx.cull(record, max_age=101)
+
+    # Ages 101 to 105 are gone, and so is a tenth of the rest, whose wealth was below 0.
+    np.testing.assert_allclose(record.weight, 100 * 6 / 11 * 0.9)
+    # The survivors are aged 95 to 100, which is centred on a whole age give or take a half.
+    assert record.age_spread == 2.5
+    assert abs(record.age - 97.5) == 0.5
+    assert record.wealth - record.wealth_spread == 0
+    assert record.wealth + record.wealth_spread == 9
@@ -0,0 +1,84 @@
+import numpy as np
+
+from orgsim import common, framework, models
+from orgsim.framework import chunked, rng
+
+
+def test_philox_known_answers() -> None:
+    counters = np.array(
+        [
+            [0, 0xFFFFFFFF, 0x243F6A88],
+            [0, 0xFFFFFFFF, 0x85A308D3],
+            [0, 0xFFFFFFFF, 0x13198A2E],
+            [0, 0xFFFFFFFF, 0x03707344],
+        ],
+        dtype=np.uint32,
+    )
+    expected = [
+        [0x6627E8D5, 0xE169C58D, 0xBC57AC4C, 0x9B00DBD8],
+        [0x408F276D, 0x41C83B0E, 0xA20BC7C6, 0x6D5451FD],
+        [0xD16CFE09, 0x94FDCCEB, 0x5001E420, 0x24126EA1],
+    ]
+    keys = [(0, 0), (0xFFFFFFFF, 0xFFFFFFFF), (0xA4093822, 0x299F31D0)]
+
+    for i, key in enumerate(keys):
+        out = rng.philox4x32(counters[:, i : i + 1], key)
+        assert list(out[:, 0]) == expected[i]
+
+
+def test_counter_rng_is_addressed_by_person_and_day() -> None:
+    g = rng.CounterRNG(42)
+    ids = np.arange(1000, dtype=np.int64)
+
+    all_at_once = g.uniform(ids=ids, day=7)
+    one_by_one = np.concatenate([g.uniform(ids=ids[i : i + 1], day=7) for i in ids])
+
+    assert np.array_equal(all_at_once, one_by_one)
+    assert not np.array_equal(all_at_once, g.uniform(ids=ids, day=8))
+    assert 0 <= all_at_once.min() and all_at_once.max() < 1
+
+
+def run(chunks: int) -> chunked.ChunkedWorld[models.person.PersonSeed]:
+    seed = framework.WorldSeed[models.person.PersonSeed](
+        initial_people={
+            models.person.PersonSeed(selfishness=s)
+            for s in np.linspace(0.05, 0.95, 1000)
+        },
+        fiscal_length=10,
+        productivity=1.0,
+        initial_individual_wealth=20,
+        daily_salary=1,
+        daily_living_cost=1.5,
+        periodic_recruit_count=50,
+        max_age=60,
+    )
+    strategy = models.BatchDefaultWorldStrategy(
+        reward_distribution_strategy=models.EqualContribution(),
+        recruitment_strategy=models.recruitment.AverageOfTopContributors(
+            identity_generator=common.SequentialIdentityGenerator(),
+            percentile=0.2,
+        ),
+        person_action_strategy=models.person.StrategicSelfishness(),
+    )
+    w = chunked.create_chunked_world(
+        seed=seed, strategy=strategy, rng_seed=3, chunks=chunks
+    )
+    with w:
+        for _ in range(8):
+            w.run_period()
+    return w
+
+
+def test_results_do_not_depend_on_chunk_count() -> None:
+    single = run(1).state
+    multi = run(7).state
+
+    assert single.time == multi.time
+    assert single.total_reward == multi.total_reward
+    assert len(single.population) > 0
+    assert np.array_equal(single.population.ids, multi.population.ids)
+    assert np.array_equal(single.population.wealth, multi.population.wealth)
+    assert np.array_equal(
+        single.population.traits["selfishness"],
+        multi.population.traits["selfishness"],
+    )
@@ -0,0 +1,110 @@
+import typing
+
+import numpy as np
+import pytest
+
+from orgsim import common, framework, models
+from orgsim.models import person
+
+
+class Clones(models.DefaultWorldStrategy):
+    """Recruits are all alike: the average role model, to one decimal."""
+
+    def generate_recruits(
+        self,
+        *,
+        seed: framework.WorldSeed[person.PersonSeed],
+        role_models: typing.Iterable[person.PersonSeed],
+    ) -> typing.Iterable[person.PersonSeed]:
+        m = round(float(np.average([s.selfishness for s in role_models])), 1)
+        return [person.PersonSeed(selfishness=m)] * seed.periodic_recruit_count
+
+
+def run(cohorts: bool) -> tuple[Clones, framework.World[person.PersonSeed]]:
+    id_gen = common.SequentialIdentityGenerator()
+    strategy = Clones(
+        identity_generator=id_gen,
+        reward_distribution_strategy=models.EqualContribution(),
+        recruitment_strategy=models.recruitment.AverageOfEveryone(
+            identity_generator=id_gen
+        ),
+        person_action_strategy=models.person.ConstantSelfishness(),
+    )
+    seed = framework.WorldSeed[person.PersonSeed](
+        initial_people={
+            person.PersonSeed(selfishness=s) for s in np.linspace(0.05, 0.95, 10)
+        },
+        fiscal_length=10,
+        productivity=1.5,
+        initial_individual_wealth=5,
+        daily_salary=1,
+        daily_living_cost=1.1,
+        periodic_recruit_count=20,
+        max_age=150,
+    )
+    world = framework.create_world(
+        seed,
+        strategy,
+        initial_people=sorted(seed.initial_people, key=lambda p: p.selfishness),
+        cohorts=cohorts,
+    )
+    for _ in range(30):
+        world.run_period()
+    return strategy, world
+
+
+def test_cohorts_give_the_same_run() -> None:
+    full, full_world = run(cohorts=False)
+    compressed, compressed_world = run(cohorts=True)
+
+    records = len(compressed_world.state.people_states)
+    population = sum(p.weight for p in compressed_world.state.people_states.values())
+    assert population == len(full_world.state.people_states) > 100
+    assert records < population / 10
+
+    for name in ("population", "avg_selfishness", "avg_wealth", "avg_age"):
+        np.testing.assert_allclose(
+            compressed.metrics.get_fiscal_series(name),
+            full.metrics.get_fiscal_series(name),
+        )
+
+
+@pytest.mark.parametrize(
+    "action, percentile",
+    [
+        (models.person.StrategicSelfishness(), None),
+        (models.person.ExpressionAction("weight * (1 - selfishness)"), None),
+        (models.person.ConstantSelfishness(), 0.5),
+    ],
+)
+def test_strategies_that_tell_members_apart_are_refused(
+    action: person.PersonActionStrategy, percentile: typing.Optional[float]
+) -> None:
+    id_gen = common.SequentialIdentityGenerator()
+    recruitment: models.recruitment.RecruitmentStrategy = (
+        models.recruitment.AverageOfEveryone(identity_generator=id_gen)
+        if percentile is None
+        else models.recruitment.AverageOfTopContributors(
+            identity_generator=id_gen, percentile=percentile
+        )
+    )
+    strategy = models.DefaultWorldStrategy(
+        identity_generator=id_gen,
+        reward_distribution_strategy=models.EqualContribution(),
+        recruitment_strategy=recruitment,
+        person_action_strategy=action,
+    )
+    seed = framework.WorldSeed[person.PersonSeed](
+        initial_people={person.PersonSeed(selfishness=0.5)},
+        fiscal_length=10,
+        productivity=1.5,
+        initial_individual_wealth=5,
+        daily_salary=1,
+        daily_living_cost=1.1,
+        periodic_recruit_count=2,
+        max_age=150,
+    )
+
+    with pytest.raises(Exception, match="cohort_key"):
+        framework.create_world(seed, strategy, cohorts=True)
+    framework.create_world(seed, strategy)
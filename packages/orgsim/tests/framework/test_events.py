@@ -0,0 +1,113 @@
+import io
+
+import numpy as np
+import pytest
+
+import orgsim
+from orgsim import models
+from orgsim.framework import events
+from orgsim.world.v1.models import v1
+from .factories import create_seed, create_strategy
+
+
+def record(periods: int = 30) -> tuple[events.EventLog, models.DefaultWorldStrategy]:
+    np.random.seed(7)
+    log = events.EventLog(initial_capacity=4)
+    strategy = create_strategy()
+    orgsim.run_world(seed=create_seed(), strategy=strategy, periods=periods, events=log)
+    return log, strategy
+
+
+def test_log_reconstructs_population() -> None:
+    log, strategy = record()
+
+    # The metric is logged when rewards are distributed, before recruitment.
+    population = strategy.metrics.get_fiscal_series("population")
+    before_recruitment = log.population() - log.count_per_period(events.Kind.BIRTH)
+    assert list(before_recruitment[1 : len(population)]) == list(population.iloc[1:])
+
+    deaths = log.count_per_period(events.Kind.DEATH)
+    by_cause = log.count_per_period(
+        events.Kind.DEATH, events.Cause.AGE
+    ) + log.count_per_period(events.Kind.DEATH, events.Cause.WEALTH)
+    assert deaths.sum() > 0
+    assert list(deaths) == list(by_cause)
+    assert sorted(log.traits["selfishness"][:20]) == pytest.approx(
+        np.linspace(0.05, 0.95, 20)
+    )
+
+
+def test_replay_matches_and_regenerates_metrics() -> None:
+    log, strategy = record()
+    buffer = io.BytesIO()
+    log.save(buffer)
+    buffer.seek(0)
+    loaded = events.EventLog.load(buffer)
+    assert loaded.equals(log)
+    assert buffer.getbuffer().nbytes < len(strategy.metrics.data.model_dump_json()) / 10
+
+    np.random.seed(12345)
+    replayed = create_strategy()
+    world = orgsim.replay_world(events=loaded, strategy=replayed)
+
+    assert world.events is not None and world.events.equals(log)
+    for name in ("population", "avg_wealth", "person_bonus"):
+        assert list(replayed.metrics.get_series_in_class(name))[0][0].equals(
+            list(strategy.metrics.get_series_in_class(name))[0][0]
+        )
+
+
+def test_replay_detects_divergence() -> None:
+    log, _ = record(periods=5)
+    strategy = create_strategy()
+    strategy.generate_identity()
+
+    with pytest.raises(Exception, match="diverged"):
+        orgsim.replay_world(events=log, strategy=strategy)
+
+
+def test_world_v1_records_and_replays() -> None:
+    seed = v1.Seed(
+        base=v1.base.BaseWorldSeed(fiscal_length=5),
+        org=v1.OrgSeed(recruit_count_per_period=2),
+        nature=v1.NatureSeed(
+            initial_candidates=[
+                v1.CandidatePrivateData(selfishness=s) for s in (0.1, 0.5, 0.9)
+            ]
+        ),
+        common=v1.CommonSeed(
+            daily_salary=1,
+            daily_living_cost=1,
+            productivity=1,
+            max_age=20,
+            initial_individual_reward=5,
+        ),
+    )
+    np.random.seed(3)
+    log = events.EventLog()
+    metrics = v1.Metrics()
+    world = v1.create_model(seed, metrics, events=log)
+    world.init()
+    for _ in range(10):
+        if world.is_empty():
+            break
+        world.run_period()
+
+    assert log.header["engine"] == "world.v1"
+    assert log.count_per_period(events.Kind.BIRTH)[0] >= 3
+    assert list(log.traits["candidate.private_data.selfishness"][:3]) == [0.1, 0.5, 0.9]
+    assert log.population()[-1] == len(world._config.individuals)
+
+    buffer = io.BytesIO()
+    log.save(buffer)
+    buffer.seek(0)
+    np.random.seed(12345)
+    replayed = v1.Metrics()
+    replay = v1.replay_model(events.EventLog.load(buffer), replayed)
+
+    assert replay.events is not None and replay.events.equals(log)
+    assert list(replayed.get_fiscal_series("population")) == list(
+        metrics.get_fiscal_series("population")
+    )
+    with pytest.raises(Exception, match="replay_model"):
+        orgsim.replay_world(events=log, strategy=create_strategy())
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from orgsim import common, framework, metrics, models
+from .factories import create_world
+
+
+def test_fork_branches_from_current_state() -> None:
+    world, strategy = create_world()
+    for _ in range(3):
+        world.run_period()
+    date = world.state.time.date
+
+    def mutate(w: framework.World[models.person.PersonSeed], i: int) -> None:
+        w.state.seed.daily_living_cost = 1.0 + 5 * i
+
+    branches = world.fork(
+        3,
+        periods=4,
+        mutate=mutate,
+        collect=lambda w: (w.state.time.date, strategy.metrics.data),
+    )
+
+    assert world.state.time.date == date
+    assert world.state.seed.daily_living_cost == 1.2
+    assert branches[0][0] == date + 4 * 5
+    assert branches[2][0] < branches[0][0]
+
+    merged = metrics.Metrics(metrics.merge_branches([m for _, m in branches]))
+    populations = [
+        merged.get_fiscal_series("population", {"branch": str(i)}) for i in range(3)
+    ]
+    assert list(populations[0].index) == list(range(7))
+    assert list(populations[0].iloc[:3]) == list(populations[1].iloc[:3])
+
+
+def test_failed_branches_are_reaped() -> None:
+    def target(i: int) -> int:
+        if i == 0:
+            raise ValueError("branch 0")
+        return i
+
+    with pytest.raises(Exception, match="branch 0"):
+        common.run_forked(3, target)
+    with pytest.raises(ChildProcessError):
+        os.waitpid(-1, os.WNOHANG)
+
+
+def test_output_of_children_is_flushed() -> None:
+    # Through a pipe, stdout is fully buffered (unless told otherwise).
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONUNBUFFERED"}
+    script = (
+        "from orgsim import common; print('before');"
+        " common.run_forked(2, lambda i: print('branch', i), max_workers=1)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.splitlines() == ["before", "branch 0", "branch 1"]
@@ -0,0 +1,80 @@
+import numpy as np
+
+from orgsim import common, framework, models
+from .factories import create_seed, create_strategy
+
+
+class CountingStrategy(models.DefaultWorldStrategy):
+    """Overrides the no-op hooks without marking them, so the World has to call them."""
+
+    def __init__(self, **kwargs: object) -> None:
+        super().__init__(**kwargs)  # type: ignore[arg-type]
+        self.before = 0
+        self.after = 0
+
+    def on_before_person_acts(
+        self, *, state: framework.WorldState, identity: str
+    ) -> None:
+        self.before += 1
+
+    def on_after_person_acts(
+        self, *, state: framework.WorldState, identity: str
+    ) -> None:
+        self.after += 1
+
+
+def run(strategy: models.DefaultWorldStrategy) -> framework.WorldState:
+    np.random.seed(3)
+    initial_people = sorted(create_seed().initial_people, key=lambda p: p.selfishness)
+    world = framework.create_world(
+        create_seed(), strategy, initial_people=initial_people
+    )
+    for _ in range(10):
+        world.run_period()
+    return world.state
+
+
+def test_default_hooks_are_noops() -> None:
+    strategy = create_strategy()
+    assert framework.is_noop(strategy.on_before_person_acts)
+    assert framework.is_noop(strategy.on_after_person_acts)
+    assert not framework.is_noop(strategy.on_end_of_day)
+    assert not framework.is_noop(strategy.person_act)
+
+
+def test_skipping_noops_does_not_change_the_run() -> None:
+    default = create_strategy()
+    id_gen = common.SequentialIdentityGenerator()
+    counting = CountingStrategy(
+        identity_generator=id_gen,
+        reward_distribution_strategy=models.EqualContribution(),
+        recruitment_strategy=models.recruitment.AverageOfEveryone(
+            identity_generator=id_gen
+        ),
+        person_action_strategy=models.person.ConstantSelfishness(),
+    )
+
+    expected = run(default)
+    actual = run(counting)
+
+    assert counting.before > 0
+    assert counting.before == counting.after
+    assert actual.model_dump(exclude={"seed"}) == expected.model_dump(exclude={"seed"})
+
+
+def test_hooks_and_seed_are_read_every_day() -> None:
+    strategy = create_strategy()
+    world = framework.create_world(create_seed(), strategy)
+    world.run_day()
+
+    calls: list[str] = []
+    strategy.on_before_person_acts = (  # type: ignore[method-assign]
+        lambda *, state, identity: calls.append(identity)
+    )
+    world.state.seed = world.state.seed.model_copy(update={"daily_salary": 0.0})
+    wealth = {i: p.wealth for i, p in world.state.people_states.items()}
+    world.run_day()
+
+    assert sorted(calls) == sorted(wealth)
+    for i, p in world.state.people_states.items():
+        assert p.wealth <= wealth[i]
@@ -0,0 +1,32 @@
+import numpy as np
+
+from orgsim import models
+from .factories import create_world
+
+
+def test_recruit_adds_people_in_bulk() -> None:
+    world, _ = create_world()
+    seeds = models.person.PersonSeed.from_arrays(selfishness=np.array([0.2, 0.4, 0.6]))
+
+    identities = world.recruit(seeds)
+
+    assert len(identities) == 3
+    assert len(world.state.people_states) == 7
+    for identity, s in zip(identities, (0.2, 0.4, 0.6)):
+        pstate = world.state.people_states[identity]
+        assert pstate.identity == identity
+        assert pstate.seed.selfishness == s
+        assert pstate.wealth == 10
+        assert pstate.age == 0
+
+
+def test_recruited_people_take_part_in_periods() -> None:
+    world, _ = create_world()
+    identities = world.recruit(
+        models.person.PersonSeed.from_arrays(selfishness=np.array([0.0, 1.0]))
+    )
+    world.run_period()
+
+    assert world.state.time.fiscal_period == 1
+    for identity in identities:
+        assert world.state.people_states[identity].age == 5
@@ -0,0 +1,154 @@
+import typing
+
+import numpy as np
+
+from orgsim import common, framework, models
+from orgsim.framework import chunked
+from orgsim.models import person
+
+
+def strategic() -> person.ExpressionAction:
+    return person.ExpressionAction(
+        "(1 - selfishness)"
+        " * (1 if total_contributions == 0 else clip((c - c * qol) / qol, 0, 1))",
+        definitions={
+            "forecast": "contributions * total_reward / total_contributions",
+            "qol": "(forecast + fiscal_length * daily_salary)"
+            " / (fiscal_length * daily_living_cost)",
+        },
+        constants={"c": 2},
+    )
+
+
+def create_seed() -> framework.WorldSeed[person.PersonSeed]:
+    return framework.WorldSeed[person.PersonSeed](
+        initial_people={
+            person.PersonSeed(selfishness=s) for s in np.linspace(0.05, 0.95, 100)
+        },
+        fiscal_length=10,
+        productivity=1.5,
+        initial_individual_wealth=10,
+        daily_salary=1,
+        daily_living_cost=1.2,
+        periodic_recruit_count=10,
+        max_age=100,
+    )
+
+
+def run_world(action: person.PersonActionStrategy) -> models.metrics.Metrics:
+    np.random.seed(0)
+    id_gen = common.SequentialIdentityGenerator()
+    strategy = models.DefaultWorldStrategy(
+        identity_generator=id_gen,
+        reward_distribution_strategy=models.EqualContribution(),
+        recruitment_strategy=models.recruitment.AverageOfEveryone(
+            identity_generator=id_gen
+        ),
+        person_action_strategy=action,
+    )
+    seed = create_seed()
+    world = framework.create_world(
+        seed,
+        strategy,
+        initial_people=sorted(seed.initial_people, key=lambda p: p.selfishness),
+    )
+    for _ in range(8):
+        world.run_period()
+    return strategy.metrics
+
+
+def run_chunked(
+    action: person.PersonActionStrategy, chunks: int
+) -> chunked.ChunkedWorldState[person.PersonSeed]:
+    strategy = models.BatchDefaultWorldStrategy(
+        reward_distribution_strategy=models.EqualContribution(),
+        recruitment_strategy=models.recruitment.AverageOfEveryone(
+            identity_generator=common.SequentialIdentityGenerator()
+        ),
+        person_action_strategy=action,
+    )
+    w = chunked.create_chunked_world(
+        seed=create_seed(), strategy=strategy, rng_seed=0, chunks=chunks
+    )
+    with w:
+        for _ in range(8):
+            w.run_period()
+    return w.state
+
+
+def test_expressions_match_strategic_selfishness() -> None:
+    expected = run_world(person.StrategicSelfishness())
+    actual = run_world(strategic())
+    for name in ("population", "avg_selfishness", "avg_wealth"):
+        np.testing.assert_allclose(
+            actual.get_fiscal_series(name), expected.get_fiscal_series(name)
+        )
+
+    expected_state = run_chunked(person.StrategicSelfishness(), chunks=1)
+    actual_state = run_chunked(strategic(), chunks=4)
+    np.testing.assert_array_equal(
+        actual_state.population.ids, expected_state.population.ids
+    )
+    np.testing.assert_allclose(
+        actual_state.population.wealth, expected_state.population.wealth
+    )
+
+
+def test_aggregates_do_not_depend_on_chunks() -> None:
+    action = "clip(wealth / max(wealth), 0, 1) * (1 - selfishness)"
+    one = run_chunked(person.ExpressionAction(action), chunks=1)
+    many = run_chunked(person.ExpressionAction(action), chunks=5)
+    assert len(one.population) > 0
+    np.testing.assert_array_equal(one.population.wealth, many.population.wealth)
+
+
+class CountingConstant(person.ConstantSelfishness):
+    def __init__(self, inputs: typing.Optional[frozenset[str]]) -> None:
+        self.inputs = inputs
+        self.calls = 0
+
+    def act(
+        self, *, state: framework.ImmutableWorldState[person.PersonSeed], identity: str
+    ) -> float:
+        self.calls += 1
+        return super().act(state=state, identity=identity)
+
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        return self.inputs
+
+
+def test_pure_actions_are_only_recomputed_when_their_inputs_change() -> None:
+    impure = CountingConstant(None)
+    seed_only = CountingConstant(frozenset())
+    on_wealth = CountingConstant(frozenset({"wealth"}))
+    runs = [run_world(a) for a in (impure, seed_only, on_wealth)]
+
+    for m in runs[1:]:
+        for name in ("population", "avg_selfishness", "avg_wealth"):
+            np.testing.assert_array_equal(
+                m.get_fiscal_series(name), runs[0].get_fiscal_series(name)
+            )
+    # Everybody who ever lived: the initial people and the recruits of 7 periods.
+    assert seed_only.calls == 100 + 7 * 10
+    # Wealth changes every day.
+    assert on_wealth.calls == impure.calls
+
+
+class CountingDays(person.ExpressionAction):
+    def __init__(self, expression: str) -> None:
+        super().__init__(expression)
+        self.days = 0
+
+    def _start_day(
+        self, state: framework.ImmutableWorldState[person.PersonSeed]
+    ) -> typing.Any:
+        self.days += 1
+        return super()._start_day(state)
+
+
+def test_totals_and_aggregates_are_taken_once_a_day() -> None:
+    action = CountingDays("clip(wealth / max(wealth), 0, 1) * (1 - selfishness)")
+    m = run_world(action)
+
+    assert len(m.get_fiscal_series("population")) == 8
+    assert action.days == 8 * create_seed().fiscal_length
@@ -0,0 +1,30 @@
+import numpy as np
+
+from orgsim import framework, metrics, models
+
+
+def test_summarize_matches_separate_reductions() -> None:
+    rng = np.random.default_rng(0)
+    columns = {"wealth": rng.normal(size=1001).tolist(), "age": list(range(1001))}
+
+    summary = models.summarize(columns)
+
+    for name, values in columns.items():
+        assert summary[f"min_{name}"] == float(np.amin(values))
+        assert summary[f"avg_{name}"] == float(np.average(values))
+        assert summary[f"max_{name}"] == float(np.amax(values))
+
+
+def test_summarize_only_computes_the_configured_statistics() -> None:
+    summary = models.summarize({"age": [1, 2, 6]}, statistics=("avg",))
+    assert summary == {"avg_age": 3.0}
+
+
+def test_log_many_writes_every_series() -> None:
+    m = metrics.Metrics(data=metrics.MetricsData(series_classes={}))
+    time = framework.WorldTime(date=12, fiscal_period=3)
+
+    m.log_many(time=time, values={"population": 5, "avg_age": 2.5})
+
+    assert list(m.get_fiscal_series("population").items()) == [(3, 5)]
+    assert list(m.get_fiscal_series("avg_age").items()) == [(3, 2.5)]
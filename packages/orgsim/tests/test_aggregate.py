@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from orgsim import aggregate
+
+
+def replicates(n: int) -> list["pd.Series[float]"]:
+    rng = np.random.default_rng(0)
+    result = []
+    for _ in range(n):
+        length = int(rng.integers(5, 20))
+        result.append(pd.Series(rng.normal(size=length), index=np.arange(length)))
+    return result
+
+
+def test_small_sample_is_exact() -> None:
+    series = replicates(30)
+    agg = aggregate.BandAggregator(quantiles=(0.05, 0.5, 0.95))
+    for s in series:
+        agg.add_series(s)
+    bands = agg.bands()
+
+    frame = pd.concat(series, axis=1)
+    assert bands.index == list(frame.index)
+    assert bands.count == list(frame.count(axis=1))
+    np.testing.assert_allclose(bands.mean, frame.mean(axis=1))
+    np.testing.assert_allclose(bands.std, frame.std(axis=1))
+    for q in (0.05, 0.5, 0.95):
+        expected = [
+            np.quantile(row.dropna(), q, method="inverted_cdf")
+            for _, row in frame.iterrows()
+        ]
+        np.testing.assert_allclose(bands.quantiles[q], expected)
+
+
+def test_large_sample_is_close_and_merges() -> None:
+    rng = np.random.default_rng(1)
+    values = rng.uniform(size=(2000, 3))
+    left = aggregate.BandAggregator(capacity=64)
+    right = aggregate.BandAggregator(capacity=64)
+    for i, row in enumerate(values):
+        (left if i % 2 else right).add_series(pd.Series(row))
+    left.merge(right)
+    bands = left.bands()
+
+    assert bands.count == [2000, 2000, 2000]
+    np.testing.assert_allclose(bands.mean, values.mean(axis=0))
+    np.testing.assert_allclose(bands.std, values.std(axis=0, ddof=1))
+    for q in (0.05, 0.5, 0.95):
+        np.testing.assert_allclose(bands.quantiles[q], q, atol=0.05)
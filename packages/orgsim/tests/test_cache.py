@@ -0,0 +1,138 @@
+import json
+import os
+import pathlib
+
+import pytest
+
+import orgsim
+from orgsim import cache, common, framework, metrics, models
+
+
+class CountingAction(models.person.ConstantSelfishness):
+    calls = 0
+
+    def act(
+        self,
+        *,
+        state: framework.ImmutableWorldState[models.person.PersonSeed],
+        identity: str,
+    ) -> float:
+        CountingAction.calls += 1
+        return super().act(state=state, identity=identity)
+
+
+def world_seed() -> framework.WorldSeed[models.person.PersonSeed]:
+    return framework.WorldSeed[models.person.PersonSeed](
+        initial_people={models.person.PersonSeed(selfishness=s) for s in (0.1, 0.5)},
+        fiscal_length=5,
+        productivity=1.0,
+        initial_individual_wealth=10,
+        daily_salary=1,
+        daily_living_cost=1.5,
+        periodic_recruit_count=1,
+        max_age=30,
+    )
+
+
+def strategy() -> models.DefaultWorldStrategy:
+    id_gen = common.SequentialIdentityGenerator()
+    return models.DefaultWorldStrategy(
+        identity_generator=id_gen,
+        reward_distribution_strategy=models.EqualContribution(),
+        recruitment_strategy=models.recruitment.AverageOfEveryone(
+            identity_generator=id_gen
+        ),
+        person_action_strategy=CountingAction(),
+    )
+
+
+def test_cached_experiment_is_not_simulated_again(tmp_path: pathlib.Path) -> None:
+    results = cache.ResultCache(tmp_path)
+
+    first = orgsim.run_experiment(
+        seed=world_seed(), strategy=strategy(), periods=5, rng_seed=1, cache=results
+    )
+    calls = CountingAction.calls
+    assert calls > 0
+
+    second = orgsim.run_experiment(
+        seed=world_seed(), strategy=strategy(), periods=5, rng_seed=1, cache=results
+    )
+    assert CountingAction.calls == calls
+    assert second.data == first.data
+
+    orgsim.run_experiment(
+        seed=world_seed(), strategy=strategy(), periods=5, rng_seed=2, cache=results
+    )
+    assert CountingAction.calls > calls
+    assert len(results.keys()) == 2
+
+
+def test_invalidate_and_eviction(tmp_path: pathlib.Path) -> None:
+    data = metrics.MetricsData(series_classes={})
+    m = metrics.Metrics(data)
+    m.log(
+        time=framework.WorldTime(date=0, fiscal_period=0),
+        name="population",
+        value=1,
+        labels={"identity": "1"},
+    )
+    size = len(data.model_dump_json())
+
+    results = cache.ResultCache(tmp_path, max_bytes=2 * size)
+    results.put("aa", data)
+    results.put("bb", data)
+    results.get("aa")
+    results.put("cc", data)
+
+    assert sorted(results.keys()) == ["aa", "cc"]
+    assert results.invalidate("aa")
+    assert not results.invalidate("aa")
+    assert results.get("aa") is None
+
+    loaded = results.get("cc")
+    assert loaded is not None
+    assert list(
+        metrics.Metrics(loaded).get_fiscal_series("population", {"identity": "1"})
+    ) == [1]
+
+
+def test_descriptions_are_stable_or_refused() -> None:
+    def action() -> models.person.ExpressionAction:
+        return models.person.ExpressionAction(
+            "k * selfishness", definitions={"k": "2"}, constants={"c": 1}
+        )
+
+    assert cache.describe(action()) == cache.describe(action())
+    assert "0x" not in json.dumps(cache.describe(action()))
+    assert cache.describe({"b", "a"}) == ["a", "b"]
+    with pytest.raises(Exception, match="Cannot describe"):
+        cache.describe(lambda: 1)
+    with pytest.raises(Exception, match="cache_description"):
+        cache.describe(object())
+
+
+def test_keys_are_stable_across_a_run() -> None:
+    s = strategy()
+    before = cache.key_for(seed=world_seed(), strategy=s, rng_seed=1, periods=5)
+    orgsim.run_world(seed=world_seed(), strategy=s, periods=5)
+
+    assert cache.key_for(seed=world_seed(), strategy=s, rng_seed=1, periods=5) == before
+    assert before == cache.key_for(
+        seed=world_seed(), strategy=strategy(), rng_seed=1, periods=5
+    )
+
+
+def test_hits_survive_a_concurrent_eviction(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    data = metrics.MetricsData(series_classes={})
+    results = cache.ResultCache(tmp_path)
+    results.put("aa", data)
+
+    def evicted(path: pathlib.Path) -> None:
+        path.unlink()
+        os.utime(path)
+
+    monkeypatch.setattr(results, "_touch", evicted)
+    assert results.get("aa") == data
@@ -0,0 +1,138 @@
+import typing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from orgsim import derived, metrics
+from orgsim.framework import WorldTime
+
+
+def log_people(m: metrics.Metrics, dates: range) -> None:
+    for date in dates:
+        time = WorldTime(date=date, fiscal_period=date // 10)
+        m.log(time=time, name="population", value=float(date % 4 + 1))
+        for i in range(date % 4 + 1):
+            m.log(
+                time=time,
+                name="person_wealth",
+                value=float(i * date),
+                labels={"identity": str(i)},
+            )
+
+
+def expected(m: metrics.Metrics) -> pd.DataFrame:
+    wealth = pd.concat(
+        df.assign(identity=labels["identity"])
+        for df, labels in m.get_series_in_class("person_wealth")
+    )
+    return wealth.groupby("date").agg(
+        total=("value", "sum"),
+        gini=("value", lambda x: derived.gini(x.to_numpy())),
+    )
+
+
+def test_groups_are_reduced_per_date() -> None:
+    m = metrics.Metrics(metrics.MetricsData(series_classes={}))
+    m.derive(
+        "wealth_per_capita",
+        "wealth / population",
+        groups={"wealth": derived.Group(series="person_wealth")},
+    )
+    m.derive(
+        "wealth_gini",
+        "gini",
+        groups={"gini": derived.Group(series="person_wealth", reduce="gini")},
+    )
+    log_people(m, range(30))
+
+    e = expected(m)
+    population = m.get_fiscal_series("population").to_numpy()
+    np.testing.assert_allclose(
+        m.get_fiscal_series("wealth_per_capita").to_numpy(),
+        e["total"].to_numpy() / population,
+    )
+    ((gini, labels),) = m.get_series_in_class("wealth_gini")
+    assert labels == {}
+    assert list(gini["date"]) == list(range(30))
+    np.testing.assert_allclose(gini["value"], e["gini"].fillna(0))
+
+
+def test_updates_only_read_new_samples() -> None:
+    m = metrics.Metrics(metrics.MetricsData(series_classes={}))
+
+    def read(
+        name: str, filter_labels: derived.Labels
+    ) -> typing.Iterator[tuple[derived.Labels, list[derived.TimeSeriesEntry], int]]:
+        sc = m.data.series_classes.get(
+            name, metrics.TimeSeriesClass(label_mapping={}, series={})
+        )
+        for lid, labels in sc.label_mapping.items():
+            if labels.items() >= filter_labels.items():
+                yield labels, sc.series[lid], len(sc.series[lid])
+
+    incremental = derived.DerivedMetrics(read)
+    incremental.define(
+        "wealth_per_capita",
+        "wealth / population",
+        groups={"wealth": derived.Group(series="person_wealth")},
+    )
+    assert incremental.entries("wealth_per_capita") == []
+
+    for start in range(0, 30, 7):
+        log_people(m, range(start, min(start + 7, 30)))
+        result = incremental.entries("wealth_per_capita")
+        # Cached until something is logged.
+        assert incremental.entries("wealth_per_capita") is result
+
+    # The latest date is provisional until the group moves on: one more member logs at it.
+    time = WorldTime(date=29, fiscal_period=2)
+    m.log(time=time, name="person_wealth", value=100.0, labels={"identity": "9"})
+    full = derived.DerivedMetrics(read)
+    full.define(
+        "wealth_per_capita",
+        "wealth / population",
+        groups={"wealth": derived.Group(series="person_wealth")},
+    )
+    assert incremental.entries("wealth_per_capita") == (
+        full.entries("wealth_per_capita")
+    )
+
+
+def test_rows_need_every_input() -> None:
+    m = metrics.Metrics(metrics.MetricsData(series_classes={}))
+    m.derive("churn", "(killed + suicides) / population")
+    m.derive("relative", "population / max(population)")
+    for date in range(10):
+        time = WorldTime(date=date, fiscal_period=0)
+        m.log(time=time, name="population", value=float(date + 1))
+        # Logged again at the same date: the first value counts.
+        m.log(time=time, name="population", value=0.0)
+        m.log(time=time, name="killed", value=1.0)
+        if date % 2 == 0:
+            m.log(time=time, name="suicides", value=1.0)
+
+    churn = next(iter(m.get_series_in_class("churn")))[0]
+    assert list(churn["date"]) == [0, 2, 4, 6, 8]
+    np.testing.assert_allclose(churn["value"], [2 / (d + 1) for d in range(0, 10, 2)])
+
+    np.testing.assert_allclose(
+        m.get_fiscal_series("relative"), [(d + 1) / 10 for d in range(10)]
+    )
+    time = WorldTime(date=10, fiscal_period=1)
+    m.log(time=time, name="population", value=20.0)
+    assert m.get_fiscal_series("relative").iloc[0] == 1 / 20
+
+
+def test_definitions_are_checked() -> None:
+    m = metrics.Metrics(metrics.MetricsData(series_classes={}))
+    m.log(time=WorldTime(date=0, fiscal_period=0), name="population", value=1.0)
+    m.derive("double", "2 * population")
+    with pytest.raises(Exception, match="already logged"):
+        m.derive("population", "1")
+    with pytest.raises(Exception, match="logged series"):
+        m.derive("quadruple", "2 * double")
+    with pytest.raises(Exception, match="not used"):
+        m.derive("x", "population", groups={"y": derived.Group(series="z")})
+    with pytest.raises(ValueError, match="Unknown reduction"):
+        derived.Group(series="person_wealth", reduce="mode")
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from orgsim import expr
+
+
+def test_expressions_work_on_scalars_and_arrays() -> None:
+    e = expr.Expression(
+        "(1 - s) * clip((c - c * q) / q, 0, 1) if t > 0 else 1 - s",
+        definitions={"q": "w / mean(w)"},
+    )
+    assert e.names == {"s", "c", "w", "t"}
+
+    np.testing.assert_allclose(
+        e({"s": np.array([0.1, 0.5]), "w": np.array([1.0, 3.0]), "c": 2, "t": 1}),
+        [0.9, 0.0],
+    )
+    np.testing.assert_allclose(
+        e({"s": np.array([0.1, 0.5]), "w": np.array([1.0, 3.0]), "c": 2, "t": 0}),
+        [0.9, 0.5],
+    )
+    # One person at a time, with the aggregates taken over everybody.
+    everybody = {"w": np.array([1.0, 3.0])}
+    assert (
+        e({"s": 0.1, "w": 1.0, "c": 2, "t": 1}, aggregates=e.aggregate(everybody))
+        == 0.9
+    )
+
+
+def test_aggregates_are_weighted() -> None:
+    e = expr.Expression("sum(x) + 10 * mean(x) + 100 * count(x > 1)")
+    x = np.array([1.0, 2.0, 3.0])
+    assert e.aggregate({"x": x}, weights=np.array([1.0, 1.0, 2.0])) == {
+        "__0": 9.0,
+        "__1": 2.25,
+        "__2": 3.0,
+    }
+    assert e({"x": x}) == 6 + 20 + 200
+
+
+def test_division_by_zero_gives_infinities() -> None:
+    assert expr.Expression("1 if x == 0 else 1 / x")({"x": np.float64(0)}) == 1
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "__import__('os')",
+        "x.real",
+        "[x]",
+        "'x'",
+        "f(x)",
+        "sum(sum(x))",
+        "a < b < c",
+        "lambda: 1",
+        "x and y",
+        "_x",
+    ],
+)
+def test_only_the_language_is_allowed(source: str) -> None:
+    with pytest.raises(Exception):
+        expr.Expression(source)
+
+
+def test_aggregates_cannot_use_definitions() -> None:
+    with pytest.raises(Exception, match="definitions"):
+        expr.Expression("y", definitions={"y": "sum(z)", "z": "2 * x", "w": "sum(z)"})
+
+
+def test_unknown_names_are_reported() -> None:
+    with pytest.raises(Exception, match="Unknown name y"):
+        expr.Expression("x + y")({"x": 1.0})
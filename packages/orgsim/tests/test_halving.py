@@ -0,0 +1,96 @@
+import multiprocessing
+
+import pytest
+
+from orgsim import halving, sweep
+
+EXPERIMENT = sweep.ExperimentSpec.model_validate(
+    {
+        "world": {
+            "fiscal_length": 5,
+            "productivity": 1.0,
+            "initial_individual_wealth": 10,
+            "daily_salary": 1,
+            "daily_living_cost": 1.1,
+            "periodic_recruit_count": 2,
+            "max_age": 100,
+        },
+        "population": {"count": 6, "selfishness": [0.2, 0.8]},
+        "strategy": {
+            "reward_distribution": "EqualContribution",
+            "recruitment": {
+                "name": "AverageOfTopContributors",
+                "args": {"percentile": 0.5},
+            },
+        },
+        "periods": 12,
+    }
+)
+
+
+def test_budgets_grow_up_to_the_horizon() -> None:
+    policy = halving.HalvingPolicy(min_periods=3, growth=2)
+
+    assert policy.budgets(12) == [3, 6, 12]
+    assert policy.budgets(20) == [3, 6, 12, 20]
+    assert policy.budgets(2) == [2]
+
+
+def test_extinct_configurations_rank_last() -> None:
+    policy = halving.HalvingPolicy(outcome="avg_wealth")
+    outcomes = [
+        {"extinct": 1.0, "avg_wealth": 100.0},
+        {"extinct": 0.0, "avg_wealth": float("nan")},
+        {"extinct": 0.0, "avg_wealth": 5.0},
+        {"extinct": 0.0, "avg_wealth": 7.0},
+    ]
+
+    assert policy.rank(outcomes) == [3, 2, 1, 0]
+    assert halving.HalvingPolicy(maximize=False, outcome="avg_wealth").rank(
+        outcomes
+    ) == [2, 3, 1, 0]
+    with pytest.raises(ValueError):
+        halving.HalvingPolicy(outcome="median_wealth")
+
+
+def test_survivors_end_where_full_runs_do() -> None:
+    configurations = [
+        {"daily_living_cost": c, "periodic_recruit_count": r}
+        for c in (0.5, 1.0, 1.5, 2.5)
+        for r in (0, 3)
+    ]
+    policy = halving.HalvingPolicy(min_periods=3, keep=0.5, growth=2)
+
+    points = halving.run_halving(
+        EXPERIMENT, configurations, policy=policy, rng_seed=1, max_workers=3
+    )
+
+    assert [p.params for p in points] == configurations
+    assert sorted(p.rung for p in points) == [0, 0, 0, 0, 1, 1, 2, 2]
+    for p in points:
+        assert p.periods == policy.budgets(EXPERIMENT.periods)[p.rung]
+
+    # The survivors of every rung were the best of the one before.
+    for rung in (1, 2):
+        entered = [p for p in points if p.rung >= rung - 1]
+        survivors = [p for p in points if p.rung >= rung]
+        assert all(
+            p.outcomes["final_population"] >= q.outcomes["final_population"]
+            for p in survivors
+            for q in entered
+            if q.rung == rung - 1
+        )
+
+    for p in points:
+        if p.rung == 2:
+            assert p.outcomes == sweep.run_point(EXPERIMENT, p.params, rng_seed=1)
+
+
+def test_failed_workers_are_cleaned_up() -> None:
+    configurations = [{"daily_living_cost": 1.0}, {"fiscal_length": 0.5}]
+
+    with pytest.raises(Exception, match="Halving worker failed"):
+        halving.run_halving(
+            EXPERIMENT, configurations, policy=halving.HalvingPolicy(), max_workers=2
+        )
+    assert multiprocessing.active_children() == []
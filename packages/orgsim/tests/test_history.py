@@ -0,0 +1,100 @@
+import pathlib
+import typing
+
+import numpy as np
+import pytest
+
+from orgsim import framework, history, models
+from .framework.factories import create_seed, create_strategy
+
+
+def record(
+    directory: pathlib.Path, periods: int
+) -> tuple[history.History[typing.Any, typing.Any], dict[int, dict[str, typing.Any]]]:
+    np.random.seed(1)
+    world = framework.create_world(seed=create_seed(), strategy=create_strategy())
+    h = history.History(
+        directory=directory,
+        adapter=history.WorldStateAdapter(models.person.PersonSeed),
+        keyframe_interval=4,
+        capacity=8,
+    )
+    expected = {0: world.state.model_dump(exclude={"seed"})}
+    h.record(world.state)
+    for _ in range(periods):
+        world.run_period()
+        expected[world.state.time.fiscal_period] = world.state.model_dump(
+            exclude={"seed"}
+        )
+        h.record(world.state)
+    h.flush()
+    return h, expected
+
+
+def test_state_at_any_period(tmp_path: pathlib.Path) -> None:
+    h, expected = record(tmp_path, 13)
+
+    assert h.periods() == list(range(14))
+    for period in (0, 3, 4, 5, 11, 13):
+        assert h.state_at(period).model_dump(exclude={"seed"}) == expected[period]
+
+    with pytest.raises(Exception, match="not been recorded"):
+        h.state_at(14)
+
+
+def test_reopened_history_continues(tmp_path: pathlib.Path) -> None:
+    record(tmp_path, 5)
+    h = history.History(
+        directory=tmp_path,
+        adapter=history.WorldStateAdapter(models.person.PersonSeed),
+    )
+    assert len(h) == 6
+    assert h.keyframe_interval == 4
+
+    state = h.state_at(5)
+    with pytest.raises(Exception, match="already been recorded"):
+        h.record(state)
+
+
+def test_periods_are_indexed_as_they_are_recorded(tmp_path: pathlib.Path) -> None:
+    np.random.seed(1)
+    world = framework.create_world(seed=create_seed(), strategy=create_strategy())
+    h = history.History(
+        directory=tmp_path,
+        adapter=history.WorldStateAdapter(models.person.PersonSeed),
+        keyframe_interval=4,
+    )
+    for _ in range(6):
+        h.record(world.state)
+        world.run_period()
+    expected = h.state_at(5).model_dump(exclude={"seed"})
+
+    # Never flushed, and the last line was cut short.
+    with open(tmp_path / "index.jsonl", "a") as f:
+        f.write('{"period": 6, "sta')
+    reopened = history.History(
+        directory=tmp_path,
+        adapter=history.WorldStateAdapter(models.person.PersonSeed),
+    )
+    assert reopened.periods() == list(range(6))
+    assert reopened.state_at(5).model_dump(exclude={"seed"}) == expected
+
+    reopened.record(world.state)
+    assert reopened.state_at(6).model_dump(exclude={"seed"}) == (
+        world.state.model_dump(exclude={"seed"})
+    )
+
+
+def test_field_over_period_range(tmp_path: pathlib.Path) -> None:
+    h, expected = record(tmp_path, 10)
+
+    wealth = h.field("wealth", start=3, stop=6)
+
+    assert sorted(set(wealth.periods.tolist())) == [3, 4, 5]
+    for period in (3, 4, 5):
+        people = expected[period]["people_states"]
+        selected = wealth.periods == period
+        assert dict(
+            zip(wealth.identities[selected].tolist(), wealth.values[selected].tolist())
+        ) == {i: p["wealth"] for i, p in people.items()}
+    assert len(h.field("age", start=20).values) == 0
@@ -0,0 +1,74 @@
+import os
+import pathlib
+import subprocess
+import sys
+import typing
+
+SIMULATION_MODULES = (
+    "orgsim",
+    "orgsim.framework",
+    "orgsim.framework.chunked",
+    "orgsim.models",
+    "orgsim.v1.game",
+    "orgsim.world.v1.models.v1",
+)
+
+HEAVY_MODULES = ("pandas", "matplotlib", "seaborn", "asyncio")
+
+# What importing the simulation may take on top of numpy and pydantic, which take most of it.
+IMPORT_BUDGET = 0.1
+
+# numpy, and pydantic up to the point where models can be defined.
+BASELINE = "import numpy, pydantic\nclass Model(pydantic.BaseModel):\n    x: int"
+
+
+def run_python(code: str, env: typing.Optional[dict[str, str]] = None) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout
+
+
+def test_simulation_does_not_import_heavy_dependencies() -> None:
+    loaded = run_python(
+        f"import sys\nfor m in {SIMULATION_MODULES!r}: __import__(m)\n"
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    assert loaded.split() == []
+
+
+def test_heavy_dependencies_load_on_first_use() -> None:
+    loaded = run_python(
+        "import sys\n"
+        "import orgsim\n"
+        "from orgsim import framework\n"
+        "m = orgsim.metrics.Metrics(orgsim.metrics.MetricsData(series_classes={}))\n"
+        "m.log(time=framework.WorldTime(date=0, fiscal_period=0), name='x', value=1)\n"
+        "print(len(m.get_fiscal_series('x')), orgsim.v1.game.Game.__name__)\n"
+        "print('pandas' in sys.modules, 'matplotlib' in sys.modules)"
+    )
+    assert loaded.split() == ["1", "Game", "True", "False"]
+
+
+def test_import_time_budget(tmp_path: pathlib.Path) -> None:
+    # Timed with bytecode cached, as it is once installed, but away from the source tree.
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    env["PYTHONPYCACHEPREFIX"] = str(tmp_path)
+
+    def elapsed(code: str) -> float:
+        return float(
+            run_python(
+                f"import time\nt = time.perf_counter()\n{code}\n"
+                "print(time.perf_counter() - t)",
+                env,
+            )
+        )
+
+    simulation = f"for m in {SIMULATION_MODULES!r}: __import__(m)"
+    elapsed(simulation)
+    timings = [(elapsed(BASELINE), elapsed(simulation)) for _ in range(3)]
+    baseline = min(b for b, _ in timings)
+    assert min(s for _, s in timings) - baseline < IMPORT_BUDGET
@@ -0,0 +1,67 @@
+import math
+
+import pytest
+
+from orgsim import replicates, sweep
+
+EXPERIMENT = sweep.ExperimentSpec.model_validate(
+    {
+        "world": {
+            "fiscal_length": 5,
+            "productivity": 1.0,
+            "initial_individual_wealth": 10,
+            "daily_salary": 1,
+            "daily_living_cost": 1.1,
+            "periodic_recruit_count": 2,
+            "max_age": 100,
+        },
+        "population": {"count": 6},
+        "periods": 6,
+    }
+)
+
+
+def test_t_quantile() -> None:
+    assert replicates.t_quantile(0.975, 1) == pytest.approx(12.706, abs=1e-3)
+    assert replicates.t_quantile(0.975, 2) == pytest.approx(4.303, abs=1e-3)
+    assert replicates.t_quantile(0.975, 3) == pytest.approx(3.182, abs=1e-3)
+    assert replicates.t_quantile(0.995, 4) == pytest.approx(4.604, abs=1e-3)
+    assert replicates.t_quantile(0.025, 5) == pytest.approx(-2.571, abs=1e-3)
+    assert replicates.t_quantile(0.975, 10) == pytest.approx(2.228, abs=2e-3)
+    assert replicates.t_quantile(0.975, 30) == pytest.approx(2.042, abs=1e-3)
+    assert replicates.t_quantile(0.975, 10_000) == pytest.approx(1.960, abs=1e-3)
+
+
+def test_noisy_configurations_get_more_replicates() -> None:
+    policy = replicates.ReplicatePolicy(
+        targets={"final_population": 0.5}, min_replicates=3, max_replicates=12
+    )
+    # Everybody survives without living costs; with high ones, who survives depends on the
+    # selfishness drawn for the initial population.
+    noisy, stable = replicates.run_replicates(
+        EXPERIMENT,
+        [{"daily_living_cost": 2.5}, {"daily_living_cost": 0}],
+        policy=policy,
+        max_workers=2,
+    )
+
+    assert stable.n == 3
+    assert stable.converged
+    assert stable.half_width["final_population"] == 0
+    assert noisy.n > 3
+    assert noisy.converged == (noisy.half_width["final_population"] <= 0.5)
+    assert noisy.converged or noisy.n == 12
+    assert not math.isnan(noisy.mean["final_population"])
+
+
+def test_stable_configuration_stops_at_the_minimum() -> None:
+    policy = replicates.ReplicatePolicy(
+        targets={"extinct": 0.1}, min_replicates=3, max_replicates=10
+    )
+    (summary,) = replicates.run_replicates(
+        EXPERIMENT, [{"daily_living_cost": 0}], policy=policy, max_workers=2
+    )
+
+    assert summary.n == 3
+    assert summary.mean["extinct"] == 0.0
+    assert summary.converged
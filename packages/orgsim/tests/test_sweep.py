@@ -0,0 +1,59 @@
+import pathlib
+
+import numpy as np
+
+from orgsim import sweep
+
+SPEC = """
+experiment:
+  world: {fiscal_length: 5, productivity: 1.0, initial_individual_wealth: 10,
+          daily_salary: 1, daily_living_cost: 1.1, periodic_recruit_count: 2,
+          max_age: 100}
+  population: {count: 6, selfishness: [0.2, 0.8]}
+  strategy:
+    reward_distribution: EqualContribution
+    recruitment: {name: AverageOfTopContributors, args: {percentile: 0.5}}
+  periods: 6
+parameters:
+  daily_living_cost: {low: 0.5, high: 3.0}
+  periodic_recruit_count: {low: 0, high: 5, integer: true}
+outcome: extinct
+design: {samples: 6, rounds: 1, refine_samples: 3}
+"""
+
+
+def test_latin_hypercube_fills_every_stratum() -> None:
+    points = sweep.latin_hypercube(20, 3, np.random.default_rng(0))
+
+    assert points.shape == (20, 3)
+    for k in range(3):
+        assert sorted((points[:, k] * 20).astype(int)) == list(range(20))
+
+
+def test_refinement_targets_sharp_changes() -> None:
+    rng = np.random.default_rng(0)
+    points = sweep.latin_hypercube(40, 2, rng)
+    values = (points[:, 0] > 0.6).astype(float)
+
+    new = sweep.refine(points, values, n=20, neighbours=4, rng=rng)
+
+    assert new.shape == (20, 2)
+    assert np.all((new >= 0) & (new < 1))
+    assert np.median(np.abs(new[:, 0] - 0.6)) < 0.1
+
+
+def test_sweep_from_yaml(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "spec.yaml"
+    path.write_text(SPEC)
+    spec = sweep.load_spec(str(path))
+
+    points = sweep.run_sweep(spec, max_workers=2)
+
+    assert [p.round for p in points] == [0] * 6 + [1] * 3
+    for p in points:
+        assert 0.5 <= p.params["daily_living_cost"] <= 3.0
+        assert p.params["periodic_recruit_count"] == round(
+            p.params["periodic_recruit_count"]
+        )
+        assert set(p.outcomes) == set(sweep.OUTCOMES)
+        assert p.outcomes["extinct"] in (0.0, 1.0)
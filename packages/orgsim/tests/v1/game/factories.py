@@ -0,0 +1,56 @@
+"""Seeds, a factory and games shared by the tests of the v1 game."""
+
+import typing
+
+import pydantic
+
+from orgsim.v1.game import Factory, Game, IndividualStats, IndividualStrategy, Seed
+
+
+class IndividualSeed(pydantic.BaseModel):
+    """The index of the Individual's strategy, and its initial wealth (by default 1000 times
+    its number)."""
+
+    policy: int = 0
+    wealth: typing.Optional[float] = None
+
+
+class FactoryImpl(Factory[IndividualSeed]):
+    def __init__(self, strategies: typing.Sequence[IndividualStrategy]) -> None:
+        self._strategies = strategies
+        self._identity_counter = 0
+
+    def create_individual(
+        self, seed: IndividualSeed
+    ) -> tuple[str, IndividualStats, IndividualStrategy]:
+        self._identity_counter += 1
+        return (
+            str(self._identity_counter),
+            IndividualStats(
+                score=0,
+                wealth=(
+                    seed.wealth
+                    if seed.wealth is not None
+                    else 1000 * self._identity_counter
+                ),
+                unit_production=10_000,
+                salary=300_000,
+                cost_of_living=200_000,
+            ),
+            self._strategies[seed.policy],
+        )
+
+
+def create_game(strategy: IndividualStrategy, n: int = 6) -> Game[IndividualSeed]:
+    """A short game of `n` Individuals playing `strategy`."""
+
+    seed = Seed[IndividualSeed](
+        periods=3,
+        days_in_period=5,
+        initial_individuals=[IndividualSeed() for _ in range(n)],
+        initial_org_wealth=1_000_000,
+        org_productivity=2.0,
+        production_to_value_coef=0.1,
+        max_invest_coef=1.0,
+    )
+    return Game.from_seed(seed, FactoryImpl([strategy]))
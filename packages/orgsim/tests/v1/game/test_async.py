@@ -0,0 +1,84 @@
+import asyncio
+import sys
+
+import numpy as np
+
+from orgsim.v1.game import AsyncIndividualStrategy, IndividualStrategyStateView
+from orgsim.v1.variants.individual import PipeAgent, Slave
+from .factories import create_game
+
+
+class AsyncSlave(AsyncIndividualStrategy):
+    def __init__(self) -> None:
+        self.requests = 0
+
+    async def compute_work_coefficient_async(
+        self, state: IndividualStrategyStateView
+    ) -> float:
+        self.requests += 1
+        await asyncio.sleep(0)
+        return 0.9
+
+
+class Rendezvous(AsyncIndividualStrategy):
+    """Only answers once `n` requests are waiting, so it needs them to be concurrent."""
+
+    def __init__(self, n: int) -> None:
+        self._n = n
+        self._waiting = 0
+        self._ready = asyncio.Event()
+
+    async def compute_work_coefficient_async(
+        self, state: IndividualStrategyStateView
+    ) -> float:
+        self._waiting += 1
+        if self._waiting == self._n:
+            self._waiting = 0
+            self._ready.set()
+            self._ready = asyncio.Event()
+        else:
+            await self._ready.wait()
+        return 0.5
+
+
+def test_async_game_matches_sync_game() -> None:
+    sync = create_game(Slave())
+    expected = sync.play()
+    strategy = AsyncSlave()
+    game = create_game(strategy)
+
+    results = asyncio.run(game.play_async())
+
+    assert results == expected
+    assert strategy.requests > 0
+    for (a, _), (b, _) in zip(
+        sync.metrics.get_series_in_class("individual_wealth"),
+        game.metrics.get_series_in_class("individual_wealth"),
+    ):
+        np.testing.assert_allclose(a["value"], b["value"])
+
+
+def test_games_share_one_event_loop() -> None:
+    strategy = Rendezvous(n=4 * 3)
+    games = [create_game(strategy, n=3) for _ in range(4)]
+
+    async def play_all() -> list[object]:
+        return await asyncio.wait_for(
+            asyncio.gather(*(g.play_async() for g in games)), timeout=10
+        )
+
+    assert len(asyncio.run(play_all())) == 4
+
+
+def test_pipe_agent() -> None:
+    program = "import sys\nfor line in sys.stdin:\n    print(0.9, flush=True)\n"
+
+    async def play() -> tuple[object, int]:
+        agent = await PipeAgent.start(sys.executable, "-c", program)
+        results = await create_game(agent).play_async()
+        return results, await agent.close()
+
+    results, code = asyncio.run(play())
+
+    assert results == create_game(Slave()).play()
+    assert code == 0
@@ -0,0 +1,85 @@
+import numpy as np
+
+from orgsim.v1.game import (
+    Game,
+    IndividualStats,
+    IndividualStrategy,
+    IndividualStrategyStateView,
+    Seed,
+)
+from orgsim.v1.game.individual import features_of
+from orgsim.v1.variants.individual import MLP, ExpressionPolicy
+from .factories import FactoryImpl, IndividualSeed
+
+
+class Unbatched(IndividualStrategy):
+    def __init__(self, policy: MLP) -> None:
+        self._policy = policy
+
+    def compute_work_coefficient(self, state: IndividualStrategyStateView) -> float:
+        return self._policy.compute_work_coefficient(state)
+
+
+def play(batched: bool) -> Game[IndividualSeed]:
+    rng = np.random.default_rng(0)
+    policies = [MLP.random(hidden=[8, 4], rng=rng) for _ in range(3)]
+    seed = Seed[IndividualSeed](
+        periods=5,
+        days_in_period=10,
+        initial_individuals=[IndividualSeed(policy=i % 3) for i in range(12)],
+        initial_org_wealth=1_000_000,
+        org_productivity=2.0,
+        production_to_value_coef=0.1,
+        max_invest_coef=1.0,
+    )
+    strategies: list[IndividualStrategy] = (
+        list(policies) if batched else [Unbatched(p) for p in policies]
+    )
+    game = Game.from_seed(seed, FactoryImpl(strategies))
+    game.play()
+    return game
+
+
+def test_batched_policies_match_individual_evaluation() -> None:
+    batched = play(batched=True)
+    unbatched = play(batched=False)
+
+    for name in ("individual_wealth", "individual_score", "individual_contribution"):
+        for (a, labels_a), (b, labels_b) in zip(
+            batched.metrics.get_series_in_class(name),
+            unbatched.metrics.get_series_in_class(name),
+        ):
+            assert labels_a == labels_b
+            np.testing.assert_allclose(a["value"], b["value"])
+
+
+def test_expression_policies_are_batched() -> None:
+    policy = ExpressionPolicy(
+        "k * wealth / max(wealth) + (1 - k) * 0.5", constants={"k": 0.5}
+    )
+    features = features_of(
+        [
+            IndividualStats(
+                score=0,
+                wealth=w,
+                unit_production=1,
+                salary=1,
+                cost_of_living=1,
+            )
+            for w in (0, 50, 100)
+        ]
+    )
+    np.testing.assert_allclose(
+        policy.compute_work_coefficients(features), [0.25, 0.5, 0.75]
+    )
+    assert policy.cohort_key() is None
+    assert ExpressionPolicy("0.9").cohort_key() is not None
+
+
+def test_contributions_add_up_over_the_game() -> None:
+    game = play(batched=True)
+
+    # The payroll starts every period over, but the series is the total so far.
+    for df, _ in game.metrics.get_series_in_class("individual_contribution"):
+        assert (df["value"].diff().dropna() >= 0).all()
+        assert df["value"].iloc[-1] > 0
@@ -0,0 +1,60 @@
+import numpy as np
+
+from orgsim.v1.game import Game, IndividualStrategy, PayrollPolicy, Seed
+from orgsim.v1.variants.individual import MLP, Slave
+from .factories import FactoryImpl, IndividualSeed
+
+
+def play(cohorts: bool) -> Game[IndividualSeed]:
+    policies: list[IndividualStrategy] = [
+        Slave(),
+        MLP.random(hidden=[4], rng=np.random.default_rng(0)),
+    ]
+    # Three cohorts (10 slaves, 5 and 4 MLPs with different wealth) and one loner.
+    individuals = (
+        [IndividualSeed(policy=0, wealth=0) for _ in range(10)]
+        + [IndividualSeed(policy=1, wealth=1000) for _ in range(5)]
+        + [IndividualSeed(policy=1, wealth=2000) for _ in range(4)]
+        + [IndividualSeed(policy=1, wealth=3000)]
+    )
+    seed = Seed[IndividualSeed](
+        periods=6,
+        days_in_period=30,
+        initial_individuals=individuals,
+        initial_org_wealth=3_000_000,
+        org_productivity=2.0,
+        production_to_value_coef=0.1,
+        max_invest_coef=1.0,
+        payroll=PayrollPolicy(bonus_share=0.5, salary_raise_coef=0.5),
+    )
+    game = Game.from_seed(seed, FactoryImpl(policies), cohorts=cohorts)
+    game.play()
+    return game
+
+
+def test_cohorts_are_played_once_with_the_same_outcome() -> None:
+    full = play(cohorts=False)
+    compressed = play(cohorts=True)
+
+    assert len(compressed.snapshot().individual_states.d) == 4
+    np.testing.assert_allclose(
+        list(compressed._game.calculate_results().model_dump().values()),
+        list(full._game.calculate_results().model_dump().values()),
+    )
+    np.testing.assert_array_equal(
+        compressed.metrics.get_fiscal_series("population"),
+        full.metrics.get_fiscal_series("population"),
+    )
+
+    counts = {
+        labels["identity"]: df["value"].iloc[-1]
+        for df, labels in compressed.metrics.get_series_in_class("individual_count")
+    }
+    assert counts == {"1": 10, "11": 5, "16": 4}
+    for name in ("individual_wealth", "individual_score", "individual_contribution"):
+        for identity in ("1", "11", "16", "20"):
+            labels = {"identity": identity}
+            np.testing.assert_allclose(
+                next(compressed.metrics.get_series_in_class(name, labels))[0]["value"],
+                next(full.metrics.get_series_in_class(name, labels))[0]["value"],
+            )
@@ -0,0 +1,35 @@
+import numpy as np
+
+from orgsim import metrics
+from orgsim.v1.game import Game, Seed
+from orgsim.v1.variants.individual import MLP
+from .factories import FactoryImpl, IndividualSeed
+
+
+def test_fork_plays_out_the_remaining_periods() -> None:
+    rng = np.random.default_rng(0)
+    policies = [MLP.random(hidden=[4], rng=rng) for _ in range(2)]
+    seed = Seed[IndividualSeed](
+        periods=4,
+        days_in_period=5,
+        initial_individuals=[IndividualSeed(policy=i % 2) for i in range(6)],
+        initial_org_wealth=1_000_000,
+        org_productivity=2.0,
+        production_to_value_coef=0.1,
+        max_invest_coef=1.0,
+    )
+    game = Game.from_seed(seed, FactoryImpl(policies))
+    game.play_period()
+    before = game.snapshot()
+
+    branches = game.fork(2, collect=lambda g: (g.results(), g.metrics.data))
+
+    assert game.snapshot() == before
+    assert branches[0][0] == branches[1][0] == game.play()
+
+    merged = metrics.Metrics(metrics.merge_branches([m for _, m in branches]))
+    population = [
+        merged.get_fiscal_series("population", {"branch": str(i)}) for i in range(2)
+    ]
+    assert list(population[0]) == list(population[1])
+    assert list(population[0]) == list(game.metrics.get_fiscal_series("population"))
@@ -0,0 +1,39 @@
+import pathlib
+
+import numpy as np
+
+from orgsim import history
+from orgsim.v1.game import Game, Seed
+from orgsim.v1.game.history import SnapshotAdapter
+from orgsim.v1.variants.individual import MLP
+from .factories import FactoryImpl, IndividualSeed
+
+
+def test_game_snapshots_round_trip(tmp_path: pathlib.Path) -> None:
+    rng = np.random.default_rng(0)
+    policies = [MLP.random(hidden=[4], rng=rng) for _ in range(2)]
+    seed = Seed[IndividualSeed](
+        periods=6,
+        days_in_period=5,
+        initial_individuals=[IndividualSeed(policy=i % 2) for i in range(8)],
+        initial_org_wealth=1_000_000,
+        org_productivity=2.0,
+        production_to_value_coef=0.1,
+        max_invest_coef=1.0,
+    )
+    game = Game.from_seed(seed, FactoryImpl(policies))
+
+    h = history.History(
+        directory=tmp_path, adapter=SnapshotAdapter(), keyframe_interval=3
+    )
+    expected = {}
+    for period in range(seed.periods):
+        expected[period] = game.snapshot().model_dump()
+        h.record(game.snapshot())
+        game.play_period()
+
+    for period in (0, 2, 4, 5):
+        assert h.state_at(period).model_dump() == expected[period]
+    assert len(h.field("stats.wealth", start=0).values) == sum(
+        len(e["individual_states"]["d"]) for e in expected.values()
+    )
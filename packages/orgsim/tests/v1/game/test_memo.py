@@ -0,0 +1,72 @@
+import typing
+
+import numpy as np
+import numpy.typing as npt
+
+from orgsim.v1.game import Game, IndividualStrategy, IndividualStrategyStateView, Seed
+from orgsim.v1.variants.individual import MLP, Slave
+from .factories import FactoryImpl, IndividualSeed
+
+
+class CountingSlave(Slave):
+    def __init__(self, pure: bool) -> None:
+        self.pure = pure
+        self.calls = 0
+
+    def compute_work_coefficient(self, state: IndividualStrategyStateView) -> float:
+        self.calls += 1
+        return super().compute_work_coefficient(state)
+
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        return super().pure_inputs() if self.pure else None
+
+
+class CountingMLP(MLP):
+    pure = True
+    rows = 0
+
+    def compute_work_coefficients(
+        self, features: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        self.rows += len(features)
+        return super().compute_work_coefficients(features)
+
+    def pure_inputs(self) -> typing.Optional[frozenset[str]]:
+        return super().pure_inputs() if self.pure else None
+
+
+def play(strategies: list[IndividualStrategy]) -> Game[IndividualSeed]:
+    individuals = [IndividualSeed(policy=0, wealth=0) for _ in range(5)] + [
+        IndividualSeed(policy=1, wealth=1000 * i) for i in range(5)
+    ]
+    seed = Seed[IndividualSeed](
+        periods=4,
+        days_in_period=30,
+        initial_individuals=individuals,
+        initial_org_wealth=3_000_000,
+        org_productivity=2.0,
+        production_to_value_coef=0.1,
+        max_invest_coef=1.0,
+    )
+    game = Game.from_seed(seed, FactoryImpl(strategies))
+    game.play()
+    return game
+
+
+def test_pure_strategies_are_only_asked_again_when_their_inputs_change() -> None:
+    results = {}
+    counters = {}
+    for pure in (False, True):
+        slave = CountingSlave(pure)
+        mlp = CountingMLP.random(hidden=[4], rng=np.random.default_rng(0))
+        mlp.pure = pure
+        game = play([slave, mlp])
+        results[pure] = game._game.calculate_results()
+        counters[pure] = (slave.calls, mlp.rows)
+        assert game.metrics.get_fiscal_series("population").iloc[-1] == 10
+
+    assert results[True] == results[False]
+    assert counters[False] == (5 * 120, 5 * 120)
+    # The slaves are asked once; the MLP only when self-improvement changed some stats.
+    assert counters[True][0] == 5
+    assert counters[True][1] < counters[False][1]
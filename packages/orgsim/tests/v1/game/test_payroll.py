@@ -0,0 +1,39 @@
+import numpy as np
+
+from orgsim.v1.game import payroll
+
+
+def sheet() -> payroll.PayrollSheet:
+    return payroll.PayrollSheet.from_rows(
+        [
+            (100, 50, 120, 0, 10, 10),
+            (100, 0, 50, 3, 15, 10),
+            (200, 10, 100, 1, 10, 5),
+        ]
+    )
+
+
+def test_insufficient_org_wealth_scales_salaries() -> None:
+    result = payroll.run_payroll(
+        org_wealth=200, sheet=sheet(), policy=payroll.PayrollPolicy()
+    )
+
+    np.testing.assert_allclose(result.paid, [50, 50, 100])
+    np.testing.assert_allclose(result.bonus, 0)
+    np.testing.assert_allclose(result.wealth, [-20, 0, 10])
+    np.testing.assert_allclose(result.salary, [100, 100, 200])
+    assert result.org_wealth == 0
+    assert list(result.dead) == [True, False, False]
+
+
+def test_bonuses_and_raises() -> None:
+    policy = payroll.PayrollPolicy(
+        bonus_share=0.5, skill_bonus_share=0.5, salary_raise_coef=0.1
+    )
+    result = payroll.run_payroll(org_wealth=1400, sheet=sheet(), policy=policy)
+
+    # 1000 is left after salaries: 250 split by gains (0, 5, 5), 250 by contributions (0, 3, 1)
+    np.testing.assert_allclose(result.bonus, [0, 125 + 187.5, 125 + 62.5])
+    assert result.org_wealth == 500
+    np.testing.assert_allclose(result.salary, [100, 105, 220])
+    assert not result.dead.any()
@@ -0,0 +1,152 @@
+import asyncio
+import multiprocessing
+import pathlib
+import subprocess
+import sys
+import threading
+import time
+import typing
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from multiprocessing import shared_memory
+
+from orgsim.v1.game import remote
+from orgsim.v1.variants.individual import MLP, RemotePolicy
+from .factories import create_game
+
+
+def serve(policy: remote.Policy) -> remote.PolicyServer:
+    server = remote.PolicyServer(policy)
+    threading.Thread(target=server.serve, daemon=True).start()
+    return server
+
+
+def test_client_round_trip() -> None:
+    server = serve(lambda features: features[:, 0] * 2)
+    try:
+        with remote.PolicyClient(server.address, capacity=2) as client:
+            features = np.arange(5 * 5, dtype=np.float64).reshape(5, 5)
+            # Bigger than the buffer, which has to grow.
+            assert list(client.compute(features)) == [0, 10, 20, 30, 40]
+            assert list(client.compute(features[:1])) == [0]
+    finally:
+        server.close()
+
+    assert server.calls == 2
+
+
+def double_first(features: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    return features[:, 0] * 2
+
+
+def serve_in_process(addresses: "multiprocessing.Queue[typing.Any]") -> None:
+    server = remote.PolicyServer(double_first)
+    addresses.put(server.address)
+    server.serve()
+
+
+def round_trip_with_a_server_process() -> None:
+    context = multiprocessing.get_context("spawn")
+    addresses: "multiprocessing.Queue[typing.Any]" = context.Queue()
+    process = context.Process(target=serve_in_process, args=(addresses,))
+    process.start()
+    try:
+        names = []
+        with remote.PolicyClient(addresses.get(timeout=30), capacity=2) as client:
+            features = np.arange(5 * 5, dtype=np.float64).reshape(5, 5)
+            names.append(client._shm.name if client._shm else "")
+            assert list(client.compute(features)) == [0, 10, 20, 30, 40]
+            names.append(client._shm.name if client._shm else "")
+            assert list(client.compute(features[:1])) == [0]
+    finally:
+        process.terminate()
+        process.join()
+
+    # Both buffers, the first one and the one it grew into, are gone.
+    assert names[0] != names[1]
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_round_trip_with_a_server_process() -> None:
+    # In a fresh interpreter, whose resource tracker reports leaked or doubly unlinked buffers
+    # on its stderr when it exits.
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"from {__package__} import test_remote;"
+            " test_remote.round_trip_with_a_server_process()",
+        ],
+        cwd=pathlib.Path(__file__).parents[3],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stderr == ""
+
+
+def test_games_batch_their_requests() -> None:
+    policy = MLP.random(hidden=[4], rng=np.random.default_rng(0))
+    seen: list[int] = []
+
+    def compute(features: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        seen.append(len(features))
+        return policy.compute_work_coefficients(features)
+
+    server = serve(compute)
+    try:
+        with remote.PolicyClient(server.address) as client:
+            strategy = RemotePolicy(client)
+            games = [create_game(strategy, n=4) for _ in range(3)]
+
+            async def play_all() -> list[typing.Any]:
+                return await asyncio.gather(*(g.play_async() for g in games))
+
+            results = asyncio.run(play_all())
+    finally:
+        server.close()
+
+    expected = create_game(policy, n=4).play()
+    assert all(r == expected for r in results)
+    # One call per day for the individuals of all three games.
+    assert len(seen) >= 5
+    assert seen == [12] * len(seen)
+
+
+def test_the_event_loop_runs_during_calls() -> None:
+    policy = MLP.random(hidden=[4], rng=np.random.default_rng(0))
+
+    def compute(features: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        time.sleep(0.02)
+        return policy.compute_work_coefficients(features)
+
+    server = serve(compute)
+    try:
+        with remote.PolicyClient(server.address) as client:
+            game = create_game(RemotePolicy(client), n=2)
+            ticks = 0
+
+            async def tick() -> None:
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.001)
+                    ticks += 1
+
+            async def play() -> None:
+                ticker = asyncio.create_task(tick())
+                await game.play_async()
+                ticker.cancel()
+
+            asyncio.run(play())
+    finally:
+        server.close()
+
+    # The ticker kept running while the game waited for the server.
+    assert ticks >= 5 * server.calls
@@ -0,0 +1,23 @@
+"""Seeds shared by the tests of world.v1."""
+
+from orgsim.world.v1 import base
+from orgsim.world.v1.models import v1
+
+
+def create_seed() -> v1.Seed:
+    return v1.Seed(
+        base=base.BaseWorldSeed(fiscal_length=5),
+        org=v1.OrgSeed(recruit_count_per_period=3),
+        nature=v1.NatureSeed(
+            initial_candidates=[
+                v1.CandidatePrivateData(selfishness=s) for s in (0.5, 0.6, 0.7)
+            ]
+        ),
+        common=v1.CommonSeed(
+            daily_salary=1,
+            daily_living_cost=0.5,
+            productivity=1,
+            max_age=1000,
+            initial_individual_reward=5,
+        ),
+    )
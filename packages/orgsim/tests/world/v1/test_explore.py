@@ -0,0 +1,57 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from orgsim.world.v1 import base, explore
+from orgsim.world.v1.models import v1
+
+
+def test_downsample_keeps_extremes() -> None:
+    values = np.sin(np.linspace(0, 20, 100_000))
+    values[31_337] = 5.0
+    values[77_777] = -5.0
+    series = pd.Series(values, index=np.arange(len(values)) // 30)
+
+    result = explore.downsample(series, 500)
+
+    assert len(result) <= 500
+    assert result.max() == 5.0
+    assert result.min() == -5.0
+    assert result.iloc[0] == series.iloc[0]
+    assert result.iloc[-1] == series.iloc[-1]
+    assert list(result.index) == sorted(result.index)
+
+
+def test_downsample_short_series_is_untouched() -> None:
+    series = pd.Series([1.0, 2.0, 3.0])
+    assert explore.downsample(series, 500) is series
+
+
+def test_downsample_to_few_points() -> None:
+    series = pd.Series(np.arange(100.0))
+    for max_points in range(4):
+        result = explore.downsample(series, max_points)
+        assert len(result) == max_points
+    assert list(explore.downsample(series, 3)) == [0.0, 50.0, 99.0]
+
+
+def test_render_world_summaries(tmp_path: pathlib.Path) -> None:
+    runs = {}
+    for r in range(2):
+        metrics = v1.Metrics()
+        state = base.BaseWorldState.from_seed(base.BaseWorldSeed(fiscal_length=1))
+        for d in range(50):
+            state.date = d
+            state.fiscal_period = d
+            for name in explore.SUMMARY_SERIES:
+                metrics.log(state=state, name=name, value=float(d + r))
+        runs[f"run {r}"] = metrics
+
+    index = explore.render_world_summaries(
+        runs=runs, directory=str(tmp_path), max_workers=2
+    )
+
+    assert index.exists()
+    assert len(list(tmp_path.glob("*.png"))) == 2
+    assert "run 1" in index.read_text()
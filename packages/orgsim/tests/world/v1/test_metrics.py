@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from orgsim.world.v1 import base
+from orgsim.world.v1.models import v1
+from .factories import create_seed
+
+
+def log_days(metrics: v1.Metrics, days: int, per_period: int) -> None:
+    state = base.BaseWorldState.from_seed(base.BaseWorldSeed(fiscal_length=per_period))
+    for d in range(days):
+        state.date = d
+        state.fiscal_period = d // per_period
+        metrics.log(state=state, name="population", value=float(d))
+
+
+def test_retained_series_keeps_the_most_recent_points() -> None:
+    metrics = v1.Metrics(
+        base.MetricsConfig(
+            daily=True,
+            fiscal=True,
+            series={"population": base.SeriesConfig(retain=7)},
+        )
+    )
+    log_days(metrics, 100, 10)
+
+    series = metrics.get_fiscal_series("population")
+    assert list(series) == [float(d) for d in range(93, 100)]
+    assert list(series.index) == [9] * 7
+    assert metrics.get_rollups("population").empty
+
+
+def test_evicted_points_are_rolled_up_per_period() -> None:
+    metrics = v1.Metrics(
+        base.MetricsConfig(
+            daily=True,
+            fiscal=True,
+            series={"population": base.SeriesConfig(retain=5, rollup=True)},
+        )
+    )
+    log_days(metrics, 25, 10)
+
+    rollups = metrics.get_rollups("population")
+    assert list(rollups["period"]) == [0, 1]
+    assert list(rollups["count"]) == [10, 10]
+    assert list(rollups["min"]) == [0.0, 10.0]
+    assert list(rollups["max"]) == [9.0, 19.0]
+    assert list(rollups["mean"]) == [4.5, 14.5]
+    assert len(metrics.get_fiscal_series("population")) == 5
+    assert metrics.data.series_classes["population"].series == {
+        hash(frozenset()): [(d, d // 10, float(d)) for d in range(20, 25)]
+    }
+
+
+def test_daily_and_fiscal_points_are_rolled_up_apart() -> None:
+    metrics = v1.Metrics(
+        base.MetricsConfig(
+            daily=True,
+            fiscal=True,
+            series={"population": base.SeriesConfig(retain=5, rollup=True)},
+        )
+    )
+    world = v1.create_model(create_seed(), metrics)
+    world.init()
+    for _ in range(6):
+        world.run_period()
+
+    daily = metrics.get_rollups("population")
+    fiscal = metrics.get_rollups("population", fiscal=True)
+    # The last period is still partly in the buffer.
+    assert list(daily["count"].iloc[:-1]) == [5] * (len(daily) - 1)
+    assert list(fiscal["count"]) == [1] * len(fiscal)
+    assert daily["count"].sum() + fiscal["count"].sum() == 6 * 5 + 6 - 5
+
+
+def test_daily_series_are_sampled() -> None:
+    metrics = v1.Metrics(
+        base.MetricsConfig(
+            daily=True,
+            fiscal=False,
+            series={
+                "population": base.SeriesConfig(daily_interval=3),
+                "suicides": base.SeriesConfig(daily_interval=0),
+            },
+        )
+    )
+    world = v1.create_model(create_seed(), metrics)
+    world.init()
+    for _ in range(4):
+        world.run_period()
+
+    ((population, _),) = metrics.get_series_in_class("population")
+    assert list(population["date"]) == list(range(0, 20, 3))
+    assert len(metrics.get_fiscal_series("killed")) == 20
+    assert "suicides" not in metrics.data.series_classes
+
+
+def test_churn_of_bounded_series() -> None:
+    metrics = v1.Metrics(
+        base.MetricsConfig(
+            daily=True,
+            fiscal=False,
+            series={
+                name: base.SeriesConfig(retain=8)
+                for name in (base.Metrics.POPULATION, base.Metrics.KILLED)
+            },
+        )
+    )
+    metrics.derive("churn", "(killed + suicides) / population")
+    world = v1.create_model(create_seed(), metrics)
+    world.init()
+    churn = []
+    for _ in range(4):
+        world.run_period()
+        churn.append(metrics.get_fiscal_series("churn"))
+
+    assert "churn" in metrics.series_names()
+    # Derived series keep every row, including those whose inputs are no longer retained.
+    assert list(churn[-1].index) == [d // 5 for d in range(20)]
+    killed = metrics.get_fiscal_series(base.Metrics.KILLED).to_numpy()
+    suicides = metrics.get_fiscal_series(base.Metrics.SUICIDES).to_numpy()[-8:]
+    population = metrics.get_fiscal_series(base.Metrics.POPULATION).to_numpy()
+    np.testing.assert_allclose(
+        churn[-1].to_numpy()[-8:], (killed + suicides) / population
+    )
+
+
+def test_derived_series_refuse_dropped_entries() -> None:
+    metrics = v1.Metrics(
+        base.MetricsConfig(
+            daily=True,
+            fiscal=False,
+            series={base.Metrics.POPULATION: base.SeriesConfig(retain=8)},
+        )
+    )
+    metrics.derive("double", "2 * population")
+    state = base.BaseWorldState.from_seed(base.BaseWorldSeed(fiscal_length=10))
+    for d in range(20):
+        state.date = d
+        metrics.log(state=state, name=base.Metrics.POPULATION, value=float(d))
+        if d == 5:
+            assert len(metrics.get_fiscal_series("double")) == 6
+
+    with pytest.raises(Exception, match="dropped 6 entries"):
+        metrics.get_fiscal_series("double")
@@ -0,0 +1,95 @@
+import pathlib
+
+import pytest
+from PIL import Image
+
+from orgsim.world.v1 import base, timeline
+from orgsim.world.v1.models import v1
+from .factories import create_seed
+
+
+def test_render_finished_run(tmp_path: pathlib.Path) -> None:
+    metrics = v1.Metrics()
+    state = base.BaseWorldState.from_seed(base.BaseWorldSeed(fiscal_length=10))
+    for d in range(600):
+        state.date = d
+        state.fiscal_period = d // 10
+        metrics.log(state=state, name=base.Metrics.POPULATION, value=float(d % 97))
+        metrics.log(state=state, name=base.Metrics.KILLED, value=float(d % 5))
+
+    filepath = tmp_path / "run.gif"
+    renderer = timeline.render_timeline(
+        metrics=metrics, filepath=str(filepath), frame_interval=10
+    )
+
+    assert renderer.frames == 61
+    # Full redraws only happen when the axes grow.
+    assert renderer.redraws <= 12
+    with Image.open(filepath) as gif:
+        assert gif.n_frames == renderer.frames
+        assert gif.info["duration"] == 40
+
+
+def test_live_timeline(tmp_path: pathlib.Path) -> None:
+    filepath = tmp_path / "live.gif"
+    renderer = timeline.TimelineRenderer(
+        filepath=str(filepath), frame_interval=5, max_individuals=4
+    )
+    metrics = v1.Metrics()
+    live = timeline.LiveTimeline(
+        metrics=metrics,
+        renderer=renderer,
+        individuals=lambda: {i: s.age for i, s in world.state.individuals.items()},
+    )
+    world = v1.create_model(create_seed(), live)
+    world.init()
+    for _ in range(6):
+        world.run_period()
+    live.close()
+
+    assert renderer.frames >= 6
+    assert len(renderer.traced) == 4
+    assert filepath.exists()
+
+
+def test_sample_is_stable() -> None:
+    identities = [str(i) for i in range(100)]
+    sample = timeline.sample_individuals(identities, 10)
+
+    assert len(sample) == 10
+    assert timeline.sample_individuals(reversed(identities), 10) == sample
+    kept = set(sample) & set(timeline.sample_individuals(identities[:50], 10))
+    assert kept == {i for i in sample if int(i) < 50}
+
+
+def test_envelope_keeps_extremes() -> None:
+    envelope = timeline.Envelope(max_points=64)
+    for d in range(1000):
+        envelope.add(d, 100.0 if d == 517 else float(d % 7))
+
+    xs, ys = envelope.points()
+    assert len(xs) <= 65
+    assert xs == sorted(xs)
+    assert (517, 100.0) in zip(xs, ys)
+    assert min(ys) == 0.0
+    assert (xs[-1], ys[-1]) == (999, 999 % 7)
+
+
+def test_unwritable_path_fails_early(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        timeline.TimelineRenderer(filepath=str(tmp_path / "missing" / "x.gif"))
+
+
+def test_failed_encoder_does_not_block_the_renderer(tmp_path: pathlib.Path) -> None:
+    directory = tmp_path / "out"
+    directory.mkdir()
+    filepath = directory / "x.gif"
+    renderer = timeline.TimelineRenderer(filepath=str(filepath))
+    # The encoder opens the file again when the first frame comes in.
+    filepath.unlink()
+    directory.rmdir()
+
+    with pytest.raises(Exception, match="encoder"):
+        for d in range(200):
+            renderer.add(timeline.Frame(date=d, values={base.Metrics.POPULATION: d}))
+        renderer.close()